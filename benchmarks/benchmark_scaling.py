@@ -0,0 +1,130 @@
+import os
+import json
+import math
+import time
+import logging
+import argparse
+import tempfile
+
+from benchmarks.generate_event import EventGenerator
+from controllers.onedaycontroller import OneDayController
+from controllers.multidayscontroller import MultiDaysController
+
+'''
+Mesure le temps de chaque étape du calcul d'une journée (voir OneDayController.create_pipeline) sur des événements synthétiques de taille croissante,
+et l'exposant d'échelle de chaque étape entre deux tailles : 1 pour une étape linéaire en le nombre d'équipes, 2 pour une étape quadratique.
+
+Exemple : python -m benchmarks.benchmark_scaling --sizes 100 1000 10000 50000 --days 3
+'''
+
+
+# Logger propre au benchmark : les logs de chaque équipe (logger racine) sont limités aux warnings pour ne pas fausser les mesures
+logger = logging.getLogger('benchmark')
+
+# Regroupement des étapes du graphe comme dans l'ancien déroulé de run() : initialize(), calculate_times(), puis notation
+STAGE_GROUPS = {
+    'initialize()': ['input_keys', 'epreuves', 'courses_parameters', 'actis_parameters', 'badgeuses', 'teams', 'doigts', 'runned', 'actis'],
+    'calculate_times()': ['times'],
+    'calculate_scores()': ['scoring', 'totals'],
+}
+
+
+def time_day(day_repository: str, day_num: int) -> dict[str, float]:
+    """Calcule une journée et renvoie le temps (en s) de chaque étape."""
+
+    odc = OneDayController(day_repository, day_num)
+    timings: dict[str, float] = {}
+
+    def timed(name, run):
+        def timed_run():
+            start = time.perf_counter()
+            run()
+            timings[name] = time.perf_counter() - start
+        return timed_run
+
+    for stage in odc.pipeline.stages.values():
+        stage.run = timed(stage.name, stage.run)
+
+    start = time.perf_counter()
+    input_keys = odc.get_input_keys()
+    timings['input_keys'] = time.perf_counter() - start
+    odc.pipeline.run(input_keys)
+
+    for group, stages in STAGE_GROUPS.items():
+        timings[group] = sum(timings.get(stage, 0.0) for stage in stages)
+    return timings
+
+
+def run_benchmark(sizes: list[int], nb_days: int, workers: int, seed: int) -> dict[int, dict[str, float]]:
+    """Génère un événement par taille et mesure chaque étape de la première journée, puis le traitement de toutes les journées."""
+
+    results = {}
+    for nb_teams in sizes:
+        with tempfile.TemporaryDirectory() as event_directory:
+            start = time.perf_counter()
+            EventGenerator(nb_teams=nb_teams, nb_days=nb_days, seed=seed).generate(event_directory)
+            logger.info(f"{nb_teams} équipes : événement généré en {time.perf_counter() - start:.1f}s.")
+
+            timings = time_day(os.path.join(event_directory, 'J1') + '/', 1)
+
+            start = time.perf_counter()
+            MultiDaysController(event_directory).process_days(workers=workers)
+            timings['multi_days'] = time.perf_counter() - start
+
+        results[nb_teams] = timings
+        logger.info(f"{nb_teams} équipes : " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items()))
+    return results
+
+
+def get_scaling_exponents(results: dict[int, dict[str, float]]) -> dict[str, list[float|None]]:
+    """Exposant d'échelle de chaque étape entre deux tailles consécutives : log(t2/t1) / log(n2/n1)."""
+
+    sizes = sorted(results)
+    exponents = {}
+    for name in results[sizes[0]]:
+        exponents[name] = []
+        for small, large in zip(sizes, sizes[1:]):
+            t_small, t_large = results[small].get(name, 0.0), results[large].get(name, 0.0)
+            # Temps trop courts pour être significatifs
+            exponents[name].append(math.log(t_large/t_small) / math.log(large/small) if min(t_small, t_large) > 1e-3 else None)
+    return exponents
+
+
+def format_report(results: dict[int, dict[str, float]]) -> str:
+    """Tableau des temps (en s) de chaque étape pour chaque taille, suivi des exposants d'échelle."""
+
+    sizes = sorted(results)
+    exponents = get_scaling_exponents(results)
+    names = list(results[sizes[0]])
+
+    header = f"{'étape':<20}" + "".join(f"{nb_teams:>12}" for nb_teams in sizes) + "".join(f"{f'α {small}→{large}':>20}" for small, large in zip(sizes, sizes[1:]))
+    lines = [header, "-"*len(header)]
+    for name in names:
+        line = f"{name:<20}" + "".join(f"{results[nb_teams].get(name, 0.0):>12.3f}" for nb_teams in sizes)
+        line += "".join(f"{exponent:>20.2f}" if exponent is not None else f"{'-':>20}" for exponent in exponents[name])
+        lines.append(line)
+    return "\n".join(lines)
+
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mesure l'évolution du temps de chaque étape avec le nombre d'équipes.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000], help="Nombres d'équipes à mesurer.")
+    parser.add_argument('--days', type=int, default=2, help="Nombre de journées de chaque événement (pour la mesure multi-journées).")
+    parser.add_argument('--workers', type=int, default=1, help="Nombre de processus de MultiDaysController.process_days.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Écrit les temps et exposants en JSON dans ce fichier.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING, format='[%(levelname)s]: %(message)s')
+    logger.setLevel(logging.INFO)
+
+    results = run_benchmark(args.sizes, args.days, args.workers, args.seed)
+    logger.info("\n" + format_report(results))
+
+    if args.output is not None:
+        with open(args.output, 'w') as json_file:
+            json.dump({'timings': results, 'scaling_exponents': get_scaling_exponents(results)}, json_file, indent=4)
@@ -0,0 +1,278 @@
+import os
+import json
+import random
+import argparse
+import datetime
+import pandas as pd
+
+'''
+Génère un événement synthétique (une ou plusieurs journées), dans le même format que DAYS/J1 :
+teams.csv, epreuves.csv, badgeuses.csv, datas_graid.csv, classeur des actis et initialisation.json.
+
+Exemple : python -m benchmarks.generate_event SYNTHETIC --teams 5000 --days 3
+'''
+
+
+# Colonnes de l'export graid avant les colonnes 'Record x CN/DOW/time'
+GRAID_COLUMNS = ['No', 'Read on', 'SIID', 'Start no', 'Clear CN', 'Clear DOW', 'Clear time', 'Clear_r CN', 'Clear_r DOW', 'Clear_r time',
+                 'Check CN', 'Check DOW', 'Check time', 'Start CN', 'Start DOW', 'Start time', 'Start_r CN', 'Start_r DOW', 'Start_r time',
+                 'Finish CN', 'Finish DOW', 'Finish time', 'Finish_r CN', 'Finish_r DOW', 'Finish_r time', 'Class', 'First name', 'Last name',
+                 'Club', 'Country', 'Email', 'Date of birth', 'Sex', 'Phone', 'Street', 'ZIP', 'City', 'Hardware version', 'Software version',
+                 'Battery date', 'Battery voltage', 'Clear count', 'Character set', 'SEL_FEEDBACK', 'No. of records']
+DOWS = ['Mo', 'Tu', 'We', 'Th', 'Fr', 'Sa', 'Su']
+FIRST_DAY = datetime.date(2024, 2, 10)  # Un samedi
+MASS_START = '05:26:12'
+MIXITES = ['h', 'mixte', 'f']
+
+
+class EventGenerator:
+    """
+    Générateur d'événement synthétique cohérent : chaque badgeuse des parcours est bipée dans l'ordre, aux heures de parcours des équipes.
+
+    Les 3 premières courses sont des Oblis courues par toutes les équipes (la première en mass start, sans badgeuse de départ),
+    les suivantes des BO courues chacune par une partie des équipes. Les équipes et leurs puces sont les mêmes chaque journée.
+
+    Attributes:
+        nb_teams (int): Nombre d'équipes.
+        nb_courses (int): Nombre de courses par journée.
+        badgeuses_per_course (int): Nombre de badgeuses par course : départ, paires gel/degel, fin (arrondi au pair supérieur).
+            1 pour une course dont le départ et l'arrivée sont sur la même badgeuse, comme les BO de J1.
+        nb_mg (int): Nombre d'Oblis avec une portion meilleur grimpeur (il faut au moins 4 badgeuses par course).
+        missed_bip_rate (float): Probabilité qu'un bip (hors départ et fin) manque. Au-delà de 0, la journée s'arrête sur MissingBipsError,
+            sauf en mode impute_missing_bips (voir OneDayController).
+        nb_days (int): Nombre de journées.
+        nb_actis (int): Nombre d'actis par journée.
+        bo_participation, acti_participation (float): Part des équipes qui courent chaque BO, qui participent à chaque acti.
+        seed (int): Graine du générateur aléatoire.
+    """
+
+    def __init__(self, nb_teams: int = 140, nb_courses: int = 10, badgeuses_per_course: int = 4, nb_mg: int = 1, missed_bip_rate: float = 0.0,
+                 nb_days: int = 1, nb_actis: int = 10, bo_participation: float = 0.3, acti_participation: float = 0.3, seed: int = 0):
+        self.nb_teams = nb_teams
+        self.nb_courses = nb_courses
+        self.badgeuses_per_course = badgeuses_per_course
+        self.nb_mg = nb_mg
+        self.missed_bip_rate = missed_bip_rate
+        self.nb_days = nb_days
+        self.nb_actis = nb_actis
+        self.bo_participation = bo_participation
+        self.acti_participation = acti_participation
+        self.random = random.Random(seed)
+
+        self.teams = self.create_teams()
+
+
+    def generate(self, output_directory: str) -> list[str]:
+        """Écrit chaque journée dans output_directory/J<n>/ et renvoie les dossiers des journées."""
+
+        days_repositories = []
+        for day_num in range(1, self.nb_days+1):
+            day_repository = os.path.join(output_directory, f'J{day_num}')
+            os.makedirs(day_repository, exist_ok=True)
+            self.generate_day(day_repository, day_num)
+            days_repositories.append(day_repository)
+        return days_repositories
+
+
+    def generate_day(self, day_repository: str, day_num: int):
+        """Écrit les fichiers d'une journée."""
+
+        files = {
+            'teams_excel': os.path.join(day_repository, 'teams.csv'),
+            'doigts_csv': os.path.join(day_repository, 'datas_graid.csv'),
+            'actis_excel': os.path.join(day_repository, 'actis.xlsx'),
+            'epreuves_excel': os.path.join(day_repository, 'epreuves.csv'),
+            'badgeuses_excel': os.path.join(day_repository, 'badgeuses.csv')
+        }
+
+        courses = self.create_courses()
+        actis = self.create_actis()
+
+        pd.DataFrame(self.teams).to_csv(files['teams_excel'], index=False)
+        self.write_epreuves(files['epreuves_excel'], courses, actis)
+        self.write_badgeuses(files['badgeuses_excel'], courses)
+        self.write_datas_graid(files['doigts_csv'], courses, day_num)
+        self.write_actis(files['actis_excel'], actis)
+
+        with open(os.path.join(day_repository, 'initialisation.json'), 'w') as json_file:
+            json.dump({'activated': True, 'mass_start': MASS_START, **files}, json_file, indent=4)
+
+
+    def create_teams(self) -> list[dict]:
+        teams = []
+        for dossard in range(1, self.nb_teams+1):
+            teams.append({
+                'Dossard': dossard,
+                'Puce': 2000000 + dossard,
+                'Nom': f"Equipe {dossard}",
+                'Contact': f"equipe{dossard}@example.com",
+                'Prenom Conc 1': f"Prenom{2*dossard-1}", 'Nom Conc 1': f"Nom{2*dossard-1}",
+                'Prenom Conc 2': f"Prenom{2*dossard}", 'Nom Conc 2': f"Nom{2*dossard}",
+                'Mixite': self.random.choice(MIXITES),
+                'Entreprise': int(self.random.random() < 0.1)
+            })
+        return teams
+
+
+    def create_courses(self) -> list[dict]:
+        """Crée les courses de la journée et leurs parcours (listes de (signaleur, badgeuse, fonction))."""
+
+        courses = []
+        next_badgeuse = 1
+        next_signaleur = 0
+        # Temps de référence réduits quand il y a beaucoup de courses, pour que toute la journée tienne avant minuit
+        time_scale = min(1.0, 10/max(self.nb_courses, 1))
+
+        for course_idx in range(self.nb_courses):
+            is_obli = course_idx < 3
+            course_type = self.random.choice(['trail', 'vtt'])
+            name = f"Obli {course_idx+1} {course_type}" if is_obli else f"BO{course_idx-2} {course_type}"
+            has_mg = is_obli and course_idx < self.nb_mg and self.badgeuses_per_course >= 4
+
+            parcours = []
+            if self.badgeuses_per_course <= 1 and not is_obli:
+                parcours += [(f'S{next_signaleur}', next_badgeuse, 'depart'), (f'S{next_signaleur+1}', next_badgeuse, 'fin')]
+                next_signaleur += 2
+                next_badgeuse += 1
+            else:
+                nb_pairs = max(0, (self.badgeuses_per_course - 1)//2)
+                roles = ['depart'] + ['gel', 'degel']*nb_pairs + ['fin']
+                for role in roles:
+                    # Départ en mass start pour la première course : badgeuse -1
+                    badgeuse = -1 if (course_idx == 0 and role == 'depart') else next_badgeuse
+                    parcours.append((f'S{next_signaleur}', badgeuse, role))
+                    if badgeuse != -1: next_badgeuse += 1
+                    next_signaleur += 1
+
+                    # Portion MG du premier degel jusqu'au poinçon suivant (gel ou fin), sur une badgeuse en plus
+                    if has_mg and role == 'degel' and not any(poincon[2] == 'mg_debut' for poincon in parcours):
+                        parcours.append((parcours[-1][0], parcours[-1][1], 'mg_debut'))
+                        parcours.append((f'S{next_signaleur}', next_badgeuse, 'mg_fin'))
+                        next_badgeuse += 1
+                        next_signaleur += 1
+
+            courses.append({
+                'name': name,
+                'type': course_type,
+                'is_obli': is_obli,
+                'points': 0 if is_obli else self.random.choice([20, 40]),
+                'reference_time': round(self.random.uniform(40, 130)*time_scale),
+                'gain_per_minute': round(self.random.uniform(0.8, 2.0), 2),
+                'mg': {'reference_time': round(self.random.uniform(5, 15)*time_scale), 'gain_per_minute': round(self.random.uniform(4, 8), 2)} if has_mg else None,
+                'parcours': parcours
+            })
+        return courses
+
+
+    def create_actis(self) -> list[dict]:
+        return [{'name': f"Acti {acti_idx+1}", 'points': self.random.choice([5, 10, 20]),
+                 'or': self.random.choice([5, 8, 10]), 'argent': self.random.choice([2, 4, 6]), 'bronze': self.random.choice([0, 1, 2])}
+                for acti_idx in range(self.nb_actis)]
+
+
+    def write_epreuves(self, csv_file: str, courses: list[dict], actis: list[dict]):
+        rows = []
+        for course in courses:
+            rows.append({'nom': course['name'], 'points': course['points'], 'temps_ref': course['reference_time'], 'points_gain_min': course['gain_per_minute'],
+                         'points_perte_min': 0, 'type': course['type'], 'or': 0, 'argent': 0, 'bronze': 0})
+        for course in courses:
+            if course['mg']:
+                rows.append({'nom': course['name']+" meilleur grimpeur", 'points': 0, 'temps_ref': course['mg']['reference_time'],
+                             'points_gain_min': course['mg']['gain_per_minute'], 'points_perte_min': 0, 'type': course['type'], 'or': 0, 'argent': 0, 'bronze': 0})
+        for acti in actis:
+            rows.append({'nom': acti['name'], 'points': acti['points'], 'temps_ref': None, 'points_gain_min': None, 'points_perte_min': None,
+                         'type': 'acti', 'or': acti['or'], 'argent': acti['argent'], 'bronze': acti['bronze']})
+        pd.DataFrame(rows).to_csv(csv_file, index=False)
+
+
+    def write_badgeuses(self, csv_file: str, courses: list[dict]):
+        rows = [{'epreuve': course['name'], 'signaleur': signaleur, 'numero': badgeuse, 'fonction': role, 'points': 0}
+                for course in courses for signaleur, badgeuse, role in course['parcours']]
+        pd.DataFrame(rows).to_csv(csv_file, index=False)
+
+
+    def write_datas_graid(self, csv_file: str, courses: list[dict], day_num: int):
+        """Écrit l'export graid : une ligne par doigt, avec ses bips dans l'ordre chronologique."""
+
+        dow = DOWS[(DOWS.index('Sa') + day_num - 1) % 7]
+        read_on = (FIRST_DAY + datetime.timedelta(days=day_num-1)).isoformat()
+        mass_start_seconds = sum(int(part)*factor for part, factor in zip(MASS_START.split(':'), (3600, 60, 1)))
+
+        rows = []
+        for row_idx, team in enumerate(self.teams):
+            speed = self.random.uniform(0.7, 1.4)   # > 1 : plus lente que le temps de référence
+            clock = mass_start_seconds
+            records = []
+
+            for course in courses:
+                if not course['is_obli'] and self.random.random() >= self.bo_participation:
+                    continue
+                parcours = course['parcours']
+                nb_segments = sum(1 for _, _, role in parcours[:-1] if role not in ('gel', 'fin', 'mg_debut'))
+                segment_time = course['reference_time']*60*speed / max(nb_segments, 1)
+
+                for poincon_idx, (_, badgeuse, role) in enumerate(parcours):
+                    if role == 'mg_debut':  # Même bip que le degel qui précède
+                        continue
+                    if poincon_idx > 0:
+                        previous_role = parcours[poincon_idx-1][2]
+                        # Temps neutralisé entre un gel et le degel suivant, temps de course sinon
+                        clock += self.random.randint(300, 1800) if previous_role == 'gel' else max(1, int(segment_time*self.random.uniform(0.8, 1.2)))
+                    if badgeuse == -1:
+                        continue
+                    if role not in ('depart', 'fin') and self.random.random() < self.missed_bip_rate:
+                        continue
+                    records.append((badgeuse, min(clock, 86399)))
+
+                clock += self.random.randint(300, 1200)     # Transition vers la course suivante
+
+            row = {'No': row_idx+1, 'Read on': f"{read_on} {self.random.randint(18, 22):02d}:{self.random.randint(0, 59):02d}:00", 'SIID': team['Puce'],
+                   'No. of records': len(records)}
+            for record_idx, (badgeuse, bip_time) in enumerate(records, start=1):
+                row[f'Record {record_idx} CN'] = badgeuse
+                row[f'Record {record_idx} DOW'] = dow
+                row[f'Record {record_idx} time'] = f"{bip_time//3600:02d}:{bip_time//60 % 60:02d}:{bip_time % 60:02d}"
+            rows.append(row)
+
+        nb_records_max = max((row['No. of records'] for row in rows), default=0)
+        columns = GRAID_COLUMNS + [f'Record {record_idx} {field}' for record_idx in range(1, nb_records_max+1) for field in ('CN', 'DOW', 'time')]
+        pd.DataFrame(rows, columns=columns).to_csv(csv_file, sep=';', index=False, encoding='latin-1')
+
+
+    def write_actis(self, excel_file: str, actis: list[dict]):
+        """Écrit le classeur des actis : une feuille par acti, avec les dossards participants et leur médaille."""
+
+        with pd.ExcelWriter(excel_file) as writer:
+            for acti in actis:
+                dossards = [team['Dossard'] for team in self.teams if self.random.random() < self.acti_participation]
+                medals = [self.random.choice(['OR', 'ARGENT', 'BRONZE']) for _ in dossards]
+                # Nom et points de l'acti sur la première ligne seulement, comme dans le classeur de J1
+                first_row_only = lambda value: [value] + [None]*(len(dossards)-1) if dossards else []
+                sheet = pd.DataFrame({'Nom acti': first_row_only(acti['name']),
+                                      'Points Participation': first_row_only(acti['points']),
+                                      'Points Or': first_row_only(acti['or']),
+                                      'Points Argent': first_row_only(acti['argent']),
+                                      'Points Bronze': first_row_only(acti['bronze']),
+                                      'Dossard': dossards,
+                                      'Medaille': medals})
+                sheet.to_excel(writer, sheet_name=acti['name'], index=False)
+
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Génère un événement synthétique au format des dossiers de journées.")
+    parser.add_argument('output_directory', help="Dossier où écrire les journées (J1, J2...).")
+    parser.add_argument('--teams', type=int, default=140)
+    parser.add_argument('--courses', type=int, default=10)
+    parser.add_argument('--badgeuses-per-course', type=int, default=4)
+    parser.add_argument('--mg', type=int, default=1, help="Nombre d'Oblis avec une portion meilleur grimpeur.")
+    parser.add_argument('--missed-bip-rate', type=float, default=0.0)
+    parser.add_argument('--days', type=int, default=1)
+    parser.add_argument('--actis', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    EventGenerator(args.teams, args.courses, args.badgeuses_per_course, args.mg, args.missed_bip_rate, args.days, args.actis, seed=args.seed).generate(args.output_directory)
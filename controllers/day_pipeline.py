@@ -0,0 +1,139 @@
+import hashlib
+import logging
+from typing import Callable
+
+from utils.instrumentation import instrumentation
+
+
+class Stage:
+    """
+    Étape du calcul d'une journée.
+
+    Attributes:
+        name (str): Nom de l'étape.
+        inputs (list[str]): Noms des entrées (clés de fichiers ou de paramètres) lues par l'étape.
+        dependencies (list[str]): Noms des étapes dont l'étape utilise les résultats.
+        run (Callable[[], None]): Exécute l'étape. Les résultats sont gardés sur le OneDayController.
+    """
+
+    def __init__(self, name: str, inputs: list[str], dependencies: list[str], run: Callable[[], None]):
+        self.name = name
+        self.inputs = inputs
+        self.dependencies = dependencies
+        self.run = run
+
+    def __repr__(self):
+        return f"Stage({self.name})"
+
+
+class DayPipeline:
+    """
+    Graphe des étapes du calcul d'une journée, dont les résultats sont mémorisés avec la clé des entrées qui les ont produits.
+
+    La clé d'une étape est le hash des clés de ses entrées et des clés des étapes dont elle dépend.
+    À chaque run(), seules les étapes dont la clé a changé depuis leur dernière exécution sont relancées,
+    ainsi, par transitivité, que toutes les étapes qui en dépendent. Les autres gardent leurs résultats.
+
+    Chaque exécution d'étape est mesurée par l'instrumentation (utils.instrumentation), si elle est activée.
+
+    Attributes:
+        name (str): Nom du graphe, repris dans les mesures de ses étapes (par exemple la journée).
+        stages (dict[str, Stage]): Les étapes, par nom.
+        stage_keys (dict[str, str]): Clé de la dernière exécution réussie de chaque étape.
+    """
+
+    def __init__(self, stages: list[Stage], name: str = ''):
+        self.name = name
+        self.stages: dict[str, Stage] = {stage.name: stage for stage in stages}
+        self.stage_keys: dict[str, str] = {}
+        self._order: list[str] = self._get_topological_order()
+
+
+    def run(self, input_keys: dict[str, str], targets: list[str]|None = None) -> list[str]:
+        """
+        Exécute les étapes dont les entrées ont changé, dans l'ordre des dépendances, et renvoie les noms des étapes exécutées.
+
+        Args:
+            input_keys (dict[str, str]): Clé de chaque entrée (hash du fichier, valeur d'un paramètre...).
+            targets (list[str]|None): Étapes à mettre à jour, avec les étapes dont elles dépendent. None pour toutes les étapes.
+        """
+
+        needed = self._get_ancestors(targets) if targets is not None else set(self.stages)
+        keys: dict[str, str] = {}
+        executed: list[str] = []
+
+        for name in self._order:
+            if name not in needed:
+                continue
+            stage = self.stages[name]
+            key = self._get_stage_key(stage, input_keys, keys)
+            keys[name] = key
+
+            if self.stage_keys.get(name) == key:
+                logging.debug(f"Étape {name} inchangée : résultat mémorisé conservé.")
+                continue
+
+            logging.info(f"Étape {name}...")
+            # Invalide l'étape avant de la lancer : si elle échoue, elle sera relancée au prochain run()
+            self.stage_keys.pop(name, None)
+            with instrumentation.measure(name, pipeline=self.name):
+                stage.run()
+            self.stage_keys[name] = key
+            executed.append(name)
+
+        return executed
+
+
+    def _get_stage_key(self, stage: Stage, input_keys: dict[str, str], keys: dict[str, str]) -> str:
+        stage_hash = hashlib.sha256(stage.name.encode())
+        for input_name in stage.inputs:
+            stage_hash.update(f"|{input_name}={input_keys[input_name]}".encode())
+        for dependency in stage.dependencies:
+            stage_hash.update(f"|{dependency}:{keys[dependency]}".encode())
+        return stage_hash.hexdigest()
+
+
+    def _get_ancestors(self, targets: list[str]) -> set[str]:
+        """Renvoie les étapes targets et toutes celles dont elles dépendent."""
+
+        ancestors = set()
+        to_visit = list(targets)
+        while to_visit:
+            name = to_visit.pop()
+            if name not in ancestors:
+                ancestors.add(name)
+                to_visit.extend(self.stages[name].dependencies)
+        return ancestors
+
+
+    def _get_topological_order(self) -> list[str]:
+        """Ordonne les étapes pour que chacune vienne après celles dont elle dépend, en gardant sinon l'ordre de déclaration."""
+
+        order: list[str] = []
+        visiting: set[str] = set()
+
+        def visit(name: str):
+            if name in order:
+                return
+            if name in visiting:
+                raise StageCycleError(name)
+            visiting.add(name)
+            for dependency in self.stages[name].dependencies:
+                visit(dependency)
+            visiting.remove(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+
+
+#########################
+### Classes d'Erreurs ###
+#########################
+
+class StageCycleError(Exception):
+    def __init__(self, stage_name, *args, **kwargs):
+        message = f"L'étape {stage_name} dépend d'elle-même (cycle dans le graphe des étapes)."
+        super().__init__(message, *args, **kwargs)
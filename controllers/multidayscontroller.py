@@ -1,25 +1,220 @@
 import os
+import re
+import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 from controllers.onedaycontroller import OneDayController
+from data_collectors.parsed_inputs_cache import ParsedInputsCache
+from data_collectors.shared_rosters import SharedRosters
+from models.results import DayResult
+from models.cumulative import CumulativeStandings
+from models.what_if import ParameterScenario, RankStability
+from utils.instrumentation import instrumentation, StageMeasure
+
+
+# Dossier d'une journée : J suivi du numéro de la journée
+DAY_FOLDER_PATTERN = re.compile(r'J(\d+)')
+
+# Fichiers d'équipes lus dans ce processus par process_day(), partagés par toutes les journées qu'un même processus de calcul traite
+worker_rosters = SharedRosters()
 
 
 class MultiDaysController:
 
-    def __init__(self, days_repository: str) -> None:
+    def __init__(self, days_repository: str, cache_directory: str|None = None, impute_missing_bips: bool = False) -> None:
         self.days_repository = days_repository
+        self.cache_directory = cache_directory  # Dossier du cache des fichiers d'entrée lus (voir ParsedInputsCache). None pour tout relire.
+        self.impute_missing_bips = impute_missing_bips  # Estime les heures des bips manquants au lieu d'arrêter la journée (voir OneDayController)
+        # Journées déjà créées, dans l'ordre de création. Une journée n'est créée qu'au moment d'être traitée, et ses fichiers ne sont lus qu'à son calcul.
         self.odc_list: list[OneDayController] = []
+        # Fichiers d'équipes lus, partagés par les journées traitées dans ce processus.
+        # Avec plusieurs processus de calcul, chacun a les siens (worker_rosters) : le fichier d'équipes est lu une fois par processus, pas une fois en tout
+        self.rosters = SharedRosters()
+        # Classement cumulé, alimenté par process_days() et rescore_day()
+        self.cumulative = CumulativeStandings()
 
 
-    def create_onedaycontrollers(self):
+    def create_onedaycontrollers(self, day_nums: list[int]|None = None) -> list[OneDayController]:
         """
-        Crée la liste des OneDayController permettant de gérer chaque journée.
+        Crée (sans les calculer) les OneDayController des journées activées, ou des journées day_nums, et les renvoie dans l'ordre des journées.
+        Les journées déjà créées sont réutilisées.
         """
         logging.info("RÉCUPÉRATION DES JOURNÉES...")
 
-        for folder in os.listdir(self.days_repository):
-            # Récupération du numéro de la journée correspondant
-            day_num: int = int(folder[1:])
+        return [self.get_onedaycontroller(day_num, day_repository) for day_repository, day_num in self.get_days(day_nums)]
+
+
+    def get_days(self, day_nums: list[int]|None = None) -> list[tuple[str, int]]:
+        """
+        Renvoie les couples (dossier de la journée, numéro de la journée), triés par numéro de journée.\n
+        Seuls les dossiers J<numéro> sont des journées. Sans day_nums, les journées dont initialisation.json indique "activated": false sont écartées ;
+        avec day_nums, seules ces journées sont renvoyées, activées ou non. Seul initialisation.json est lu, pas les fichiers d'entrée.
+
+        Raises:
+            DayNotFoundError: Si une journée de day_nums n'a pas de dossier.
+        """
+
+        days = []
+        for entry in os.scandir(self.days_repository):
+            match = DAY_FOLDER_PATTERN.fullmatch(entry.name)
+            if match is None or not entry.is_dir():
+                continue
+            days.append((self.days_repository+'/'+entry.name+'/', int(match.group(1))))
+        days.sort(key=lambda day: day[1])
+
+        if day_nums is not None:
+            missing_day_nums = set(day_nums) - {day_num for _, day_num in days}
+            if missing_day_nums:
+                raise DayNotFoundError(min(missing_day_nums))
+            return [day for day in days if day[1] in day_nums]
+
+        activated_days = []
+        for day_repository, day_num in days:
+            if is_day_activated(day_repository):
+                activated_days.append((day_repository, day_num))
+            else:
+                logging.info(f"Journée J{day_num} désactivée dans son initialisation.json : ignorée.")
+        return activated_days
+
+
+    def process_days(self, workers: int|None = 1, day_nums: list[int]|None = None) -> list[DayResult]:
+        """
+        Charge, initialise et note chaque journée activée, ou seulement les journées day_nums, puis renvoie les résultats de chaque journée dans l'ordre des journées.
+
+        Args:
+            workers (int|None): Nombre de processus de calcul. 1 traite les journées l'une après l'autre dans ce processus (et remplit odc_list),
+                plus de 1 les traite en parallèle, chacune dans son processus. None utilise autant de processus que de journées, dans la limite du nombre de CPU.
+                En parallèle, chaque processus lit lui-même le fichier d'équipes (une fois pour toutes les journées qu'il traite, voir worker_rosters)
+                et le classement cumulé est fait ici, à partir des DayResult renvoyés.
+            day_nums (list[int]|None): Journées à traiter (voir get_days). Le classement cumulé ne compte alors que les journées traitées.
+        """
+
+        if workers == 1:
+            day_results = [day.run() for day in self.create_onedaycontrollers(day_nums)]
+            for day_result in day_results:
+                self.cumulative.set_day(day_result)
+            return day_results
+
+        days = self.get_days(day_nums)
+        if not days:
+            return []
+        if workers is None:
+            workers = min(len(days), os.cpu_count() or 1)
+        logging.info(f"Traitement de {len(days)} journées sur {workers} processus...")
+
+        # Les journées sont indépendantes : chaque processus lit et calcule la sienne, seuls les DayResult reviennent au processus principal
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            if not instrumentation.enabled:
+                day_results = [future.result() for future in [executor.submit(process_day, day_repository, day_num, self.cache_directory, self.impute_missing_bips) for day_repository, day_num in days]]
+            else:
+                # Les mesures de chaque journée sont faites dans son processus et renvoyées avec ses résultats
+                futures = [executor.submit(process_day_measured, day_repository, day_num, self.cache_directory, self.impute_missing_bips, instrumentation.traces_memory) for day_repository, day_num in days]
+                day_results = []
+                for future in futures:
+                    day_result, measures = future.result()
+                    day_results.append(day_result)
+                    instrumentation.measures.extend(measures)
+
+        for day_result in day_results:
+            self.cumulative.set_day(day_result)
+
+        logging.info("Toutes les journées ont été traitées.\n" + "-"*50)
+        return day_results
+
+
+    def rescore_day(self, day_num: int) -> DayResult:
+        """
+        Recalcule une seule journée, puis remplace sa contribution au classement cumulé sans toucher aux autres journées.
+        Si la journée a déjà été calculée dans ce processus, seules les étapes dont un fichier d'entrée a changé sont relancées (voir DayPipeline).
+        """
+
+        day_result = self.get_onedaycontroller(day_num).run()
+        self.cumulative.set_day(day_result)
+        return day_result
+
+
+    def what_if(self, day_num: int, scenarios: list[ParameterScenario], k: int = 10) -> tuple[dict[str, list[tuple[int, float]]], RankStability]:
+        """
+        Renote la journée day_num avec chaque scénario de paramètres, sans recalculer les temps.
+        Renvoie le classement général de chaque scénario et la stabilité des classements par rapport aux paramètres de la journée.
+        """
+
+        odc = self.get_onedaycontroller(day_num)
+        odc.run()   # Ne relance rien si la journée est déjà calculée et ses fichiers inchangés
+        scorer = odc.get_what_if_scorer()
+        return scorer.get_rankings(scenarios), scorer.get_rank_stability(scenarios, k)
+
+
+    def get_onedaycontroller(self, day_num: int, day_repository: str|None = None) -> OneDayController:
+        """Renvoie le OneDayController de la journée day_num (dans day_repository s'il est connu), créé (sans être calculé) s'il n'existe pas encore."""
+
+        odc = next((day for day in self.odc_list if day.day_num == day_num), None)
+        if odc is None:
             logging.info("="*50 + f"\nRécupération de la journée J{day_num}...\n" + "-"*50)
+            cache = ParsedInputsCache(self.cache_directory) if self.cache_directory is not None else None
+            odc = OneDayController(day_repository or self.get_day_repository(day_num), day_num, cache, self.impute_missing_bips, self.rosters)
+            self.odc_list.append(odc)
+        return odc
+
+
+    def get_day_repository(self, day_num: int) -> str:
+        """Renvoie le dossier de la journée day_num, activée ou non."""
+        return self.get_days([day_num])[0][0]
+
+
+    def watch_day(self, day_num: int, interval: float = 1.0):
+        """Calcule la journée day_num puis surveille son datas_graid.csv pour recalculer les équipes au fil des déchargements de doigts."""
+
+        odc = self.get_onedaycontroller(day_num)
+        odc.run()
+
+        def log_updated_teams(updated_teams):
+            for team in updated_teams:
+                if team.dossard in odc.standings.entries_by_dossard:
+                    logging.info("%s : %.2f points, %se au général.", team, team.total_points, odc.standings.get_rank(team.dossard))
+            self.cumulative.set_day(odc.get_day_result())
+
+        odc.watch(interval, on_update=log_updated_teams)
+
+
+
+def is_day_activated(day_repository: str) -> bool:
+    """Renvoie la valeur de "activated" dans l'initialisation.json de la journée (True si absente, comme l'ACTIVATED de l'ancien initialisation.py)."""
+
+    with open(day_repository+'initialisation.json') as json_file:
+        return bool(json.load(json_file).get('activated', True))
+
+
+def process_day(day_repository: str, day_num: int, cache_directory: str|None = None, impute_missing_bips: bool = False) -> DayResult:
+    """
+    Traite entièrement une journée. Fonction de module pour pouvoir être exécutée dans un processus de calcul.
+    Les équipes lues sont partagées avec les autres journées traitées par le même processus (worker_rosters).
+    Les fichiers de la journée sont lus l'un après l'autre (concurrent_loading=False) : les processus de calcul se partagent déjà les cœurs.
+    """
+
+    logging.info("="*50 + f"\nRécupération de la journée J{day_num}...\n" + "-"*50)
+    cache = ParsedInputsCache(cache_directory) if cache_directory is not None else None
+    return OneDayController(day_repository, day_num, cache, impute_missing_bips, worker_rosters, concurrent_loading=False).run()
+
+
+def process_day_measured(day_repository: str, day_num: int, cache_directory: str|None = None, impute_missing_bips: bool = False,
+                         trace_memory: bool = True) -> tuple[DayResult, list[StageMeasure]]:
+    """Traite entièrement une journée avec l'instrumentation activée, et renvoie ses résultats et les mesures de ses étapes."""
+
+    instrumentation.enable(trace_memory)
+    # Un processus de calcul peut traiter plusieurs journées : seules les mesures de celle-ci sont renvoyées
+    instrumentation.reset()
+    day_result = process_day(day_repository, day_num, cache_directory, impute_missing_bips)
+    return day_result, instrumentation.measures
+
+
+
+#########################
+### Classes d'Erreurs ###
+#########################
 
-            self.odc_list.append(OneDayController(self.days_repository+'/'+folder+'/', day_num))
\ No newline at end of file
+class DayNotFoundError(Exception):
+    def __init__(self, day_num, *args, **kwargs):
+        message = f"Aucun dossier de journée ne correspond à J{day_num}."
+        super().__init__(message, *args, **kwargs)
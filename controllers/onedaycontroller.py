@@ -1,107 +1,431 @@
+import os
 import json
+import time
 import logging
-import pandas as pd
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from data_collectors.datas_graid_collector import DatasGraidCollector
 from data_collectors.teams_gen_collector import TeamsGenCollector
 from data_collectors.polis_parcours_collector import PolisParcoursCollector
 from data_collectors.polis_badgeuses_collector import PolisBadgeusesCollector
 from data_collectors.data_actis_collector import DataActisCollector
+from data_collectors.parsed_inputs_cache import ParsedInputsCache
+from data_collectors.shared_rosters import SharedRosters
 
 from models.team import Team
 from models.epreuve import EpreuveCourse, EpreuveActi
 from models.poincon import Poincon
+from models.results import CourseResult, ActiResult, DayResult
+from models.registry import Registry
+from models.segmentation import SegmentationEngine
+from models.scoring import CourseScoringParameters, score_courses
+from models.standings import Standings
+from models.what_if import WhatIfScorer
+from models.imputation import MissingBipsImputer
+from models.segment_statistics import SegmentStatisticsAccumulator
+from models.results import ImputedBip
+from controllers.day_pipeline import DayPipeline, Stage
+from models.bips_table import BipsTable, parse_hms_to_seconds
+from utils.instrumentation import instrumentation
 
 
 class OneDayController:
 
-    def __init__(self, day_repository: str, day_num: int) -> None:
+    # Collecteur de chaque fichier d'entrée lu par une étape du graphe (le fichier d'épreuves est lu par get_input_keys())
+    COLLECTORS = {'teams': TeamsGenCollector, 'badgeuses': PolisBadgeusesCollector, 'doigts': DatasGraidCollector, 'actis': DataActisCollector}
+    # Attribut qui garde le collecteur de chacun de ces fichiers
+    COLLECTOR_ATTRIBUTES = {'teams': 'teams_gen', 'badgeuses': 'polis_badgeuses', 'doigts': 'datas_graid', 'actis': 'data_actis'}
+
+    def __init__(self, day_repository: str, day_num: int, cache: ParsedInputsCache|None = None, impute_missing_bips: bool = False,
+                 rosters: SharedRosters|None = None, concurrent_loading: bool = True) -> None:
         self.day_repository = day_repository
         self.day_num = day_num
+        self.cache = cache  # Si défini, les fichiers inchangés depuis la dernière lecture ne sont pas relus
+        self.rosters = rosters  # Si défini, fichiers d'équipes partagés avec les autres journées : un fichier de même contenu n'est lu qu'une fois
+        # Si True, les heures des poinçons non bipés sont estimées (voir MissingBipsImputer) au lieu d'arrêter la journée sur MissingBipsError
+        self.impute_missing_bips = impute_missing_bips
+        # Si True, les fichiers d'entrée modifiés sont lus en parallèle dans des threads (voir start_loading).
+        # False dans les processus de calcul de MultiDaysController, déjà un par journée : pas de lectures parallèles imbriquées
+        self.concurrent_loading = concurrent_loading
+
+        # Chemins des fichiers d'entrée et mass start, lus dans initialisation.json par read_initialisation()
+        self.input_files: dict[str, str] = {}
+        self.mass_start: str|None = None
+        self.mass_start_seconds: int|None = None    # Heure du mass start en secondes depuis minuit, convertie une seule fois
+        self.read_initialisation()
+
+        # Collecteurs, créés par l'étape qui lit leur fichier (voir create_pipeline)
+        self.datas_graid: DatasGraidCollector|None = None
+        # Bips de la journée : ceux lus par datas_graid, avec le mass start et les doigts déchargés depuis (update_from_new_doigts).
+        # Le collecteur garde les bips du fichier tels que lus, pour être repris tel quel si le fichier n'a pas changé (voir get_collector)
+        self.bips: BipsTable|None = None
+        self.data_actis: DataActisCollector|None = None
+        self.teams_gen: TeamsGenCollector|None = None
+        self.polis_parcours: PolisParcoursCollector|None = None
+        self.polis_badgeuses: PolisBadgeusesCollector|None = None
+
+        self.all_teams: list[Team] = []     # Toutes les équipes du fichier d'équipes
+        self.teams_list: list[Team] = []    # Les équipes dont le doigt a été déchargé
+        self.epreuves_list: list[EpreuveCourse|EpreuveActi] = []
+        self.epreuves_courses_list: list[EpreuveCourse] = []
+        self.epreuves_actis_list: list[EpreuveActi] = []
+
+        # Index des équipes (par dossard et par puce) et des épreuves (par nom)
+        self.registry = Registry(self.teams_list, self.epreuves_list)
+        # Équipes sans doigt déchargé, retirées de teams_list par clean_teams_not_running(), par puce
+        # ou, en mode incrémental, dont le dernier doigt déchargé n'a pas toutes les badgeuses de ses épreuves
+        self.ignored_teams: dict[int, Team] = {}
+        # Classement de la journée, rempli par run() puis tenu à jour par update_from_new_doigts()
+        self.standings = Standings()
+        # Statistiques des temps entre poinçons consécutifs, alimentées équipe par équipe par calculate_times() en mode impute_missing_bips
+        # (leur seul usage dans le calcul), et par calculate_mean_times_for_each_segment() quand des bips manquent
+        self.segment_statistics = SegmentStatisticsAccumulator()
+        # Mode impute_missing_bips : heures de bip estimées, à faire relire
+        self.imputed_bips: list[ImputedBip] = []
+
+        # Étapes du calcul, relancées seulement si leurs entrées ont changé depuis le dernier run()
+        self.pipeline = self.create_pipeline()
+        self.pipeline_input_keys: dict[str, str] = {}   # Clés des entrées au dernier get_input_keys()
+        # Lectures des fichiers d'entrée lancées par start_loading() : nom de l'entrée -> (clé du fichier lu, lecture en cours)
+        self.loading: dict[str, tuple[str, Future]] = {}
+        # Clé (hash) du fichier lu par le collecteur actuel de chaque entrée, voir get_collector()
+        self.collector_keys: dict[str, str|None] = {}
+
+
+    def __repr__(self) -> str:
+        return f"ODC(J{self.day_num})"
+
+
+    def create_pipeline(self) -> DayPipeline:
+        """
+        Graphe des étapes de la journée. Chaque étape n'est relancée que si une de ses entrées a changé :
+        par exemple, changer les paramètres de points des courses dans le fichier d'épreuves ne relance que la notation et les totaux,
+        changer le fichier des actis ne relance que l'ajout des actis et les totaux.
+        """
+
+        return DayPipeline([
+            Stage('epreuves', ['epreuves_structure'], [], self.create_epreuves),
+            Stage('courses_parameters', ['courses_parameters'], ['epreuves'], lambda: self.polis_parcours.update_epreuves_parameters(self.epreuves_list, actis=False)),
+            Stage('actis_parameters', ['actis_parameters'], ['epreuves'], lambda: self.polis_parcours.update_epreuves_parameters(self.epreuves_list, actis=True)),
+            Stage('badgeuses', ['badgeuses'], ['epreuves'], self.add_badgeuses_to_epreuves),
+            Stage('teams', ['teams'], [], self.create_teams),
+            Stage('doigts', ['doigts', 'mass_start'], ['teams'], self.add_doigts_to_teams),
+            Stage('runned', ['impute_missing_bips'], ['doigts', 'badgeuses'], self.add_runned_epreuves_to_teams),
+            Stage('actis', ['actis'], ['teams', 'actis_parameters'], self.add_actis_to_teams),
+            Stage('times', ['impute_missing_bips'], ['runned'], self.calculate_times),
+            Stage('scoring', [], ['times', 'courses_parameters'], self.calculate_scores),
+            Stage('totals', [], ['scoring', 'actis'], self.calculate_totals),
+        ], name=f"J{self.day_num}")
+
+
+    def read_initialisation(self):
+        """Lit initialisation.json : chemins des fichiers d'entrée et horaire du mass start."""
 
-        # Récupération de toutes les données d'initialisation
         with open(self.day_repository+'initialisation.json') as json_file:
             data = json.load(json_file)
 
-        self.datas_graid = DatasGraidCollector(data['doigts_csv'])
-        self.data_actis = DataActisCollector(data['actis_excel'])
-        self.teams_gen = TeamsGenCollector(data['teams_excel'])
-        self.polis_parcours = PolisParcoursCollector(data['epreuves_excel'])
-        self.polis_badgeuses = PolisBadgeusesCollector(data['badgeuses_excel'])
+        self.input_files = {
+            'doigts': data['doigts_csv'],
+            'actis': data['actis_excel'],
+            'teams': data['teams_excel'],
+            'epreuves': data['epreuves_excel'],
+            'badgeuses': data['badgeuses_excel']
+        }
+        self.mass_start = data['mass_start']
+        self.mass_start_seconds = self.parse_mass_start()
 
-        self.mass_start: str|None = data['mass_start']
 
-        self.teams_list: list[Team] = self.teams_gen.create_teams()
-        self.epreuves_list: list[EpreuveCourse|EpreuveActi] = self.polis_parcours.create_epreuves()
+    def get_input_keys(self) -> dict[str, str]:
+        """
+        Relit initialisation.json et renvoie la clé de chaque entrée du graphe d'étapes : hash de chaque fichier et horaire du mass start.
+        Le fichier d'épreuves a trois clés (structure, paramètres des courses, paramètres des actis), pour ne relancer que les étapes concernées.
+        """
 
-        self.epreuves_courses_list: list[EpreuveCourse] = [course for course in self.epreuves_list if isinstance(course, EpreuveCourse)]
-        self.epreuves_actis_list: list[EpreuveActi] = [acti for acti in self.epreuves_list if isinstance(acti, EpreuveActi)]
+        with instrumentation.measure('input_keys', pipeline=self.pipeline.name):
+            self.read_initialisation()
 
+            input_keys = {name: ParsedInputsCache.get_file_hash(file_path) for name, file_path in self.input_files.items()}
+            input_keys['mass_start'] = str(self.mass_start)
+            input_keys['impute_missing_bips'] = str(self.impute_missing_bips)
+            # Les fichiers modifiés sont lus pendant la lecture du fichier d'épreuves et l'exécution des premières étapes
+            self.start_loading(input_keys)
 
-    def __repr__(self) -> str:
-        return f"ODC(J{self.day_num})"
+            if self.polis_parcours is None or self.pipeline_input_keys.get('epreuves') != input_keys['epreuves']:
+                self.polis_parcours = PolisParcoursCollector(self.input_files['epreuves'], self.cache, input_keys['epreuves'])
+            input_keys['epreuves_structure'] = self.polis_parcours.get_structure_key()
+            input_keys['courses_parameters'] = self.polis_parcours.get_parameters_key(actis=False)
+            input_keys['actis_parameters'] = self.polis_parcours.get_parameters_key(actis=True)
 
+        self.pipeline_input_keys = input_keys
+        return input_keys
 
-    def initialize(self):
 
-        self.add_badgeuses_to_epreuves()
-        self.add_datas_doigts_to_teams()
+    def start_loading(self, input_keys: dict[str, str]):
+        """
+        Lance en parallèle la lecture de chaque fichier d'entrée (voir COLLECTORS) dont le contenu a changé depuis le dernier get_input_keys() :
+        une journée attend alors le fichier le plus long à lire plutôt que la somme des temps de lecture. Chaque étape n'attend que son propre fichier (voir get_collector).\n
+        Toutes les lectures se font dans des threads, y compris celle du classeur des actis (openpyxl, en Python pur, qui garde le GIL) :
+        pas de processus créé par fork depuis un processus qui a déjà des threads. Le classeur n'est relu que s'il a changé, sinon il vient du cache.
 
-        self.add_mass_start()
+        Rien n'est lancé sur un seul cœur, où les lectures ne feraient que se disputer le processeur, ni sans concurrent_loading : chaque étape lit alors son fichier elle-même.
+        """
 
-        self.add_runned_epreuves_to_teams()
-        self.add_actis_to_teams()
+        if not self.concurrent_loading or (os.cpu_count() or 1) < 2:
+            return
+
+        to_load = [name for name in self.COLLECTORS
+                   if input_keys[name] != self.pipeline_input_keys.get(name) and self.loading.get(name, (None,))[0] != input_keys[name]]
+        if to_load:
+            executor = ThreadPoolExecutor(max_workers=len(to_load), thread_name_prefix=f"J{self.day_num}-lecture")
+            for name in to_load:
+                self.loading[name] = (input_keys[name], executor.submit(self.load_collector, name, input_keys[name]))
+            executor.shutdown(wait=False)
+
+
+    def get_collector(self, name: str):
+        """
+        Renvoie le collecteur du fichier d'entrée name pour le contenu actuel du fichier :
+        - le collecteur actuel, si le fichier n'a pas changé depuis sa lecture (étape relancée seulement par une de ses dépendances) ;
+        - celui dont start_loading() a lancé la lecture, une fois lu ;
+        - un nouveau, lu maintenant, sinon.
+        """
+
+        file_hash = self.pipeline_input_keys.get(name)
+        current = getattr(self, self.COLLECTOR_ATTRIBUTES[name])
+        if current is not None and file_hash is not None and self.collector_keys.get(name) == file_hash:
+            return current
+
+        loading = self.loading.pop(name, None)
+        if loading is None or loading[0] != file_hash:
+            collector = self.load_collector(name, file_hash)
+        else:
+            collector = loading[1].result()
+        self.collector_keys[name] = file_hash
+        return collector
+
+
+    def load_collector(self, name: str, file_hash: str|None = None):
+        """Lit le fichier d'entrée name (voir COLLECTORS) et renvoie son collecteur. Le fichier d'équipes est repris d'une autre journée s'il a déjà été lu (voir SharedRosters)."""
+
+        if name == 'teams' and self.rosters is not None:
+            return self.rosters.get_roster(self.input_files[name], file_hash, self.cache)
+        return self.COLLECTORS[name](self.input_files[name], self.cache, file_hash)
+
+
+    def initialize(self):
+        """Lit les fichiers d'entrée, puis rattache les badgeuses aux épreuves, les doigts, les épreuves courues et les actis aux équipes."""
+        self.pipeline.run(self.get_input_keys(), targets=['runned', 'actis'])
     
 
+    def run(self) -> DayResult:
+        """
+        Met à jour la journée (temps, points, classement) et renvoie les résultats de chaque équipe.
+        Seules les étapes dont un fichier d'entrée a changé depuis le dernier run() sont relancées.
+        """
+
+        executed_stages = self.pipeline.run(self.get_input_keys())
+        logging.info(f"J{self.day_num} : étapes recalculées : {', '.join(executed_stages) or 'aucune'}.")
+
+        return self.get_day_result()
+
+
+    def get_day_result(self) -> DayResult:
+        """Renvoie les résultats de la journée sous une forme picklable (voir MultiDaysController.process_days)."""
+        return DayResult(self.day_num, [team.get_day_result() for team in self.teams_list], list(self.imputed_bips))
+
+
     def calculate_times(self):
-        """Calcule les temps mis par chaque équipe sur chaque épreuve."""
+        """Calcule les temps mis par chaque équipe sur chaque épreuve, après estimation des bips manquants en mode impute_missing_bips."""
         logging.info("Calcul des temps courus par chaque équipe sur chaque épreuve...")
 
         for team in self.teams_list:
-            for epreuve_course in self.epreuves_courses_list:
-                team.aggregate_transit_times_by_epreuve(epreuve_course)
-                team.calculate_epreuve_course_times(epreuve_course)
+            team.aggregate_transit_times_by_epreuves(self.segmentation_engine)
+        if self.impute_missing_bips:
+            self.collect_segment_statistics()
+            self.impute_teams_missing_bips()
+
+        # Chaque équipe ne parcourt que ses propres courses courues, déjà segmentées
+        for team in self.teams_list:
+            team.calculate_courses_times()
+        instrumentation.count(teams=len(self.teams_list))
         logging.info("Temps calculés.\n" + "-"*50)
 
 
+    def collect_segment_statistics(self):
+        """
+        Refait les statistiques des temps entre poinçons consécutifs (segment_statistics) à partir des courses segmentées de toutes les équipes.
+        Seules les courses complètes comptent : une course où l'équipe a sauté un poinçon (missing_bips) fausserait les temps de référence des estimations.
+        """
+
+        self.segment_statistics.reset()
+        for team in self.teams_list:
+            for course_result in team.runned_epreuve_courses_list:
+                if course_result.epreuve_course not in team.missing_bips:
+                    self.segment_statistics.add_course_result(course_result)
+
+
+    def impute_teams_missing_bips(self):
+        """
+        Estime les heures des poinçons non bipés de chaque équipe à partir des temps moyens de chaque segment sur toutes les équipes (segment_statistics, voir MissingBipsImputer).
+        Les heures estimées sont gardées dans imputed_bips, pour le rapport de relecture.
+        """
+
+        imputer = MissingBipsImputer(self.segment_statistics)
+
+        self.imputed_bips = []
+        for team in self.teams_list:
+            team.imputed_bips = imputer.impute_team(team)
+            self.imputed_bips.extend(team.imputed_bips)
+
+        if self.imputed_bips:
+            nb_teams = len({imputed_bip.dossard for imputed_bip in self.imputed_bips})
+            logging.warning(f"J{self.day_num} : {len(self.imputed_bips)} heure(s) de bip estimée(s) pour {nb_teams} équipe(s), à faire relire.")
+
+
+    def calculate_scores(self):
+        """
+        Calcule les points de chaque équipe sur chaque course en une seule opération vectorisée (voir score_courses).
+        Les points totaux sont calculés ensuite par calculate_totals().
+        """
+        logging.info("Calcul des points de chaque équipe...")
+
+        total_times, mg_times, bip_points, has_run, teams_columns = self.get_scoring_matrices()
+        course_points = score_courses(total_times, mg_times, bip_points, has_run, CourseScoringParameters.from_epreuves(self.epreuves_courses_list))
+
+        for row, team in enumerate(self.teams_list):
+            team.store_courses_points(course_points, row, teams_columns[row])
+        instrumentation.count(teams=len(self.teams_list))
+
+        logging.info("Points calculés.\n" + "-"*50)
+
+
+    def get_scoring_matrices(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[list[int]]]:
+        """
+        Renvoie les matrices (équipes de teams_list x courses de epreuves_courses_list) en entrée de score_courses :
+        temps totaux, temps MG, points des bips et courses courues, ainsi que les colonnes des courses courues par chaque équipe.
+        """
+
+        nb_teams, nb_courses = len(self.teams_list), len(self.epreuves_courses_list)
+        total_times = np.zeros((nb_teams, nb_courses))
+        mg_times = np.zeros((nb_teams, nb_courses))
+        bip_points = np.zeros((nb_teams, nb_courses))
+        has_run = np.zeros((nb_teams, nb_courses), dtype=bool)
+
+        # Colonne de chaque course courue, pour chaque équipe
+        teams_columns: list[list[int]] = []
+        for row, team in enumerate(self.teams_list):
+            columns = [self.segmentation_engine.get_epreuve_idx(course_result.epreuve_course) for course_result in team.runned_epreuve_courses_list]
+            total_times[row, columns], mg_times[row, columns], bip_points[row, columns] = team.get_courses_scoring_inputs()
+            has_run[row, columns] = True
+            teams_columns.append(columns)
+
+        return total_times, mg_times, bip_points, has_run, teams_columns
+
+
+    def get_what_if_scorer(self) -> WhatIfScorer:
+        """Renvoie un WhatIfScorer qui renote la journée avec d'autres paramètres, à partir des temps déjà calculés. À appeler après run()."""
+
+        total_times, mg_times, bip_points, has_run, _ = self.get_scoring_matrices()
+        return WhatIfScorer(
+            dossards=[team.dossard for team in self.teams_list],
+            courses_names=[course.name for course in self.epreuves_courses_list],
+            total_times=total_times,
+            mg_times=mg_times,
+            bip_points=bip_points,
+            has_run=has_run,
+            actis_points=[team.actis_points for team in self.teams_list],
+            courses_total_times=[team.courses_total_time for team in self.teams_list],
+            parameters=CourseScoringParameters.from_epreuves(self.epreuves_courses_list)
+        )
+
+
+    def calculate_totals(self):
+        """Calcule les points totaux de chaque équipe (courses et actis) et le classement de la journée."""
+
+        for team in self.teams_list:
+            team.calculate_total_points()
+        instrumentation.count(teams=len(self.teams_list))
+        self.standings = Standings(self.get_day_result().teams)
+
+
     ##################################
     ### Appelées dans initialize() ###
     ##################################
 
+    def create_epreuves(self):
+        """Crée les épreuves à partir du fichier d'épreuves, lu par get_input_keys()."""
+
+        self.epreuves_list = self.polis_parcours.create_epreuves()
+        self.epreuves_courses_list = [course for course in self.epreuves_list if isinstance(course, EpreuveCourse)]
+        self.epreuves_actis_list = [acti for acti in self.epreuves_list if isinstance(acti, EpreuveActi)]
+        self.registry.set_epreuves(self.epreuves_list)
+        instrumentation.count(rows=len(self.epreuves_list))
+
+
+    def create_teams(self):
+        """Lit le fichier d'équipes (ou reprend celui d'une autre journée, voir SharedRosters) et crée les équipes de la journée."""
+
+        self.teams_gen = self.get_collector('teams')
+        self.all_teams = self.teams_gen.create_teams()
+        self.teams_list = list(self.all_teams)
+        self.registry.set_teams(self.teams_list)
+        self.ignored_teams = {}
+        instrumentation.count(teams=len(self.all_teams))
+
+
     def add_badgeuses_to_epreuves(self):
         """Ajoute les badgeuses lues dans le POLIS_badgeuses à l'épreuve correspondante de epreuves_list."""
         logging.info("Ajout des badgeuses aux épreuves...")
 
+        self.polis_badgeuses = self.get_collector('badgeuses')
+        for epreuve in self.epreuves_courses_list:
+            epreuve.badgeuses_list = []
+
         for _, row in self.polis_badgeuses.df.iterrows():
             epreuve: EpreuveCourse = self.get_epreuve(row['epreuve'])
 
-            poincon_to_add = Poincon(epreuve, str(row['signaleur']), int(row['numero']), str(row['fonction']), float(row['points']))
+            poincon_to_add = Poincon(int(row['poincon_id']), epreuve, str(row['signaleur']), int(row['numero']), str(row['fonction']), float(row['points']))
             epreuve.badgeuses_list.append(poincon_to_add)
             
-            logging.info(f"Ajout de la badgeuse {row['numero']} ({row['fonction']}) à {epreuve.name}")
+            logging.info("Ajout de la badgeuse %s (%s) à %s", row['numero'], row['fonction'], epreuve.name)
             
             # Si présence d'un meilleur grimpeur dans l'épreuve, on arrange les poinçons pour qu'il n'y ait pas de doublon
             if epreuve.meilleur_grimpeur and poincon_to_add.role == 'fin':
                 epreuve.clean_meilleur_grimpeur()
         
+        # Index inversé badgeuse -> (épreuve, position), une fois les listes de poinçons définitives
+        self.segmentation_engine = SegmentationEngine(self.epreuves_courses_list)
+        instrumentation.count(rows=len(self.polis_badgeuses.df))
+
         logging.info("Toutes les badgeuses ont été ajoutées aux épreuves correspondantes.\n" + "-"*50)
 
 
-    def add_datas_doigts_to_teams(self):
-        """Attribue à chaque équipe ses temps de passage (transit time)."""
+    def add_doigts_to_teams(self):
+        """Lit le fichier des doigts, attribue ses bips aux équipes et y ajoute le mass start."""
 
-        logging.info("Attribution des données des doigts aux équipes correspondantes...")
+        self.datas_graid = self.get_collector('doigts')
+        self.bips = self.datas_graid.bips
 
-        for _, row in self.datas_graid.df_cleaned.iterrows():
-            team = self.get_team_from_doigt(row)
-            team.transit_times = row.dropna()
+        # Repart de toutes les équipes, sans bips : une équipe ignorée faute de doigt peut en avoir un dans le nouveau fichier
+        empty_bips = np.zeros(0, dtype='int32')
+        for team in self.all_teams:
+            team.set_bips(empty_bips, empty_bips)
+        self.teams_list = list(self.all_teams)
+        self.registry.set_teams(self.teams_list)
+        self.ignored_teams = {}
 
-            # Convertir les colonnes Record x CN en int
-            CN_columns_of_transit_times = [column for column in team.transit_times.keys() if 'CN' in column]
-            team.transit_times[CN_columns_of_transit_times] = team.transit_times[CN_columns_of_transit_times].astype('int64')
+        self.add_datas_doigts_to_teams()
+        self.add_mass_start()
+        instrumentation.count(rows=len(self.bips), teams=len(self.teams_list))
 
-            logging.info(f"Attribution des données à {team.team_name}")
-        
+
+    def add_datas_doigts_to_teams(self):
+        """Attribue à chaque équipe ses bips (vues sur la BipsTable de la journée)."""
+
+        logging.info("Attribution des données des doigts aux équipes correspondantes...")
+
+        self.attach_bips_to_teams()
         self.clean_teams_not_running()
 
         logging.info("Toutes les données des doigts ont été attribuées aux équipes correspondantes.\n" + "-"*50)
@@ -116,103 +440,137 @@ class OneDayController:
             logging.info(f"Pas de mass start pris en compte.\n" + "-"*50)
             return
         
-        # Vérifie le format d'entrée de mass_start
-        self.check_mass_start_time_format()
-        # Ajout du temps de mass_start aux équipes.
-        for team in self.teams_list:
-            mass_start_CN_and_time = pd.Series({'Record 0 CN': -1, 'Record 0 time': self.mass_start})
-            team.transit_times = pd.concat([mass_start_CN_and_time, team.transit_times])
+        # Ajout du temps de mass_start en tête des bips de chaque doigt, en une seule insertion dans la table
+        self.bips = self.bips.with_mass_start(self.mass_start_seconds)
+        self.attach_bips_to_teams(log=False)
         
         logging.info(f"Prise en compte de l'horaire de mass start {self.mass_start}.\n" + "-"*50)
 
 
     def add_runned_epreuves_to_teams(self):
         """
-        Ajoute à chaque équipe les épreuves qu'elle a courues sous la forme {'epreuve_course': EpreuveCourse, 'time': temps en s, 'points': float}.
+        Ajoute à chaque équipe les épreuves qu'elle a courues, sous la forme d'un CourseResult par épreuve.
 
-        Regarde dans les badgeuses présentes dans team.transit_times (index Record x CN) et à quelle épreuve ces badgeuses sont affectées.\n
+        Regarde dans les badgeuses présentes dans team.bips_CN et à quelle épreuve ces badgeuses sont affectées.\n
         Vérifie dans le même temps si pour chaque épreuve courue, toutes les badgeuses sont bien présentes.
         """
         logging.info("Ajout des épreuves courues à chaque équipe...")
 
-        global_missing_bip = False
-
         for team in self.teams_list:
-            # Récupération des badgeuses de l'équipe à partir de team.transit_times
-            team_badgeuses_list = team.get_CN_columns()
+            team.reset_courses_results()
 
-            for epreuve in self.epreuves_courses_list:
-                for poincon in epreuve.badgeuses_list:                    
-                    if poincon.badgeuse in team_badgeuses_list:
-                        team.runned_epreuve_courses_list.append({'epreuve_course': epreuve})
-                        logging.info(f"{team} a couru {epreuve}.")
-                        break
+        global_missing_bip = False
 
-            team_missing_bip = team.check_all_epreuve_badgeuses_are_present()
+        for team in self.teams_list:
+            team_missing_bip = self.add_runned_epreuves_to_team(team)
             if team_missing_bip: global_missing_bip = True
+        instrumentation.count(teams=len(self.teams_list))
         
         logging.info("Chaque équipe a sa liste d'épreuves courues.\n" + "-"*50)
 
         # Stoppe le programme si une équipe n'a pas bipé une badgeuse de l'épreuve, une fois que toutes les badgeuses manquantes de toutes les équipes ont été détectées.
-        if global_missing_bip:
+        # En mode impute_missing_bips, les heures manquantes seront estimées par calculate_times().
+        if global_missing_bip and not self.impute_missing_bips:
             self.calculate_mean_times_for_each_segment()
             raise MissingBipsError()
 
 
+    def add_runned_epreuves_to_team(self, team: Team) -> bool:
+        """
+        Ajoute à une équipe les épreuves qu'elle a courues, en un seul comptage de ses bips par badgeuse (voir SegmentationEngine.get_runned_epreuves_idx).
+        Retourne True si une badgeuse d'une épreuve courue n'a pas été bipée, False sinon.
+        """
+
+        bips_counts = team.get_bips_counts()
+
+        for epreuve_idx in self.segmentation_engine.get_runned_epreuves_idx(bips_counts):
+            epreuve = self.segmentation_engine.epreuves_list[epreuve_idx]
+            team.runned_epreuve_courses_list.append(CourseResult(epreuve))
+            logging.info("%s a couru %s.", team, epreuve)
+
+        return team.check_all_epreuve_badgeuses_are_present(self.segmentation_engine, bips_counts)
+
+
     def add_actis_to_teams(self):
         """
-        Ajoute à chaque équipe les actis auxquelles elle a participé, à partir de data_actis.
+        Ajoute à chaque équipe les actis auxquelles elle a participé, à partir de data_actis.\n
+        La table des résultats de toutes les actis est jointe en une fois à la table des équipes triée par dossard,
+        et les points de chaque résultat sont lus dans des tableaux indexés par acti et par médaille.
+        Les équipes dont le doigt n'est pas (encore) déchargé ont aussi leurs actis, gardées pour quand il le sera.
+
+        Raises:
+            DossardNotFoundError: Pour tous les dossards des actis absents du fichier d'équipes, signalés ensemble.
         """
         logging.info("Ajout des résultats des actis à chaque équipe...")
 
-        # On itère sur les feuilles d'activité de l'Excel
-        for acti in self.data_actis.actis_dict.values():
-            
-            epreuve_acti_object = self.get_epreuve(acti['acti_name'])
-
-            # On itère sur les équipes ayant participé à l'épreuve
-            for participating_team in acti['teams_results']:
-                team_to_add = self.get_team_from_dossard(participating_team['dossard'])
-                team_to_add.epreuve_actis_list.append({'epreuve_acti': epreuve_acti_object,
-                                                       'medal': participating_team['medal'],
-                                                       'participation_points': epreuve_acti_object.participation_points,
-                                                       'ranking_points': epreuve_acti_object.or_argent_bronze[participating_team['medal']]})
-                
-                logging.info(f"{epreuve_acti_object.name}: {participating_team['medal'].upper()} pour [{team_to_add.dossard}] {team_to_add.team_name}")
-        
+        self.data_actis = self.get_collector('actis')
+        for team in self.all_teams:
+            team.epreuve_actis_list = []
+
+        # Une ligne par feuille d'activité de l'Excel
+        epreuves_actis = [self.get_epreuve(acti['acti_name']) for acti in self.data_actis.actis_dict.values()]
+        participation_points = np.array([epreuve_acti.participation_points for epreuve_acti in epreuves_actis], dtype='float64')
+        medal_points = np.array([[epreuve_acti.or_argent_bronze[medal] for medal in DataActisCollector.MEDALS] for epreuve_acti in epreuves_actis],
+                                dtype='float64').reshape(-1, len(DataActisCollector.MEDALS))
+
+        results = self.data_actis.results
+        # Une équipe présente plusieurs fois sur une même acti (plusieurs manches, ou erreur de saisie) : tous ses résultats comptent, signalés pour relecture
+        duplicated = results.duplicated(subset=['acti_idx', 'dossard']).to_numpy()
+        if duplicated.any():
+            logging.warning("Équipes présentes plusieurs fois sur une acti, chaque résultat est compté : %s",
+                            ", ".join(f"[{dossard}] sur {epreuves_actis[acti].name}" for acti, dossard in results.loc[duplicated, ['acti_idx', 'dossard']].drop_duplicates().itertuples(index=False)))
+        acti_idx = results['acti_idx'].to_numpy()
+        dossards = results['dossard'].to_numpy()
+        medals = results['medal'].to_numpy()
+
+        # Jointure sur le dossard : table des équipes triée par dossard (première équipe de chaque dossard, comme le registre)
+        teams_dossards, teams_idx = np.unique(np.array([team.dossard for team in self.all_teams], dtype='int64'), return_index=True)
+        positions = np.minimum(np.searchsorted(teams_dossards, dossards), max(len(teams_dossards) - 1, 0))
+        found = teams_dossards[positions] == dossards if len(teams_dossards) else np.zeros(len(dossards), dtype=bool)
+        if not found.all():
+            raise DossardNotFoundError(sorted(set(dossards[~found].tolist())))
+
+        team_positions = teams_idx[positions]
+        for team_position, acti, medal, acti_participation_points, ranking_points in zip(
+                team_positions.tolist(), acti_idx.tolist(), medals.tolist(), participation_points[acti_idx].tolist(), medal_points[acti_idx, medals].tolist()):
+            team, epreuve_acti = self.all_teams[team_position], epreuves_actis[acti]
+            medal_name = DataActisCollector.MEDALS[medal]
+            team.epreuve_actis_list.append(ActiResult(epreuve_acti, medal_name, acti_participation_points, ranking_points))
+            logging.info("%s: %s pour [%s] %s", epreuve_acti.name, medal_name.upper(), team.dossard, team.team_name)
+        instrumentation.count(rows=len(dossards))
+
         logging.info("Tous les résultats d'actis sont ajoutés.\n" + "-"*50)
 
 
     ##################################
 
 
-    def get_team_from_dossard(self, dossard) -> (Team):
-
-        for team in self.teams_list:
-            if team.dossard == dossard:
-                return team
-        
-        raise DossardNotFoundError(dossard)
-
-
     def calculate_mean_times_for_each_segment(self):
+        """Calcule et affiche les statistiques des temps entre poinçons consécutifs de chaque course, sur les équipes qui ont bipé toutes ses badgeuses."""
 
         logging.info("Calcul des temps moyens sur chaque portion d'épreuves...")
 
+        self.segment_statistics.reset()
         for team in self.teams_list:
+            team.aggregate_transit_times_by_epreuves(self.segmentation_engine)
+            for course_result in team.runned_epreuve_courses_list:
+                if course_result.epreuve_course not in team.missing_bips:
+                    self.segment_statistics.add_course_result(course_result)
 
-            for epreuve_course_dict in team.runned_epreuve_courses_list:
-                epreuve_course: EpreuveCourse = epreuve_course_dict['epreuve_course']
-                if epreuve_course not in team.missing_bips:
-                    
-                    team.aggregate_transit_times_by_epreuve(epreuve_course)
-                    team.calculate_epreuve_course_times(epreuve_course)
-                    for elementary_time in epreuve_course_dict['elementary_times']:
-                        epreuve_course.times_between_poincons.append(elementary_time)
-        
         for epreuve_course in self.epreuves_courses_list:
-            epreuve_course.average_elementary_times()
-            logging.info(epreuve_course.name, epreuve_course.mean_times_between_poincons)
+            badgeuses_list = epreuve_course.badgeuses_list
+            for k, (_, statistics) in enumerate(self.segment_statistics.get_epreuve_statistics(epreuve_course)):
+                if statistics is not None:
+                    logging.info("%s : %s-%s %s", epreuve_course.name, badgeuses_list[k].signaleur, badgeuses_list[k+1].signaleur, statistics)
+
+
+    def parse_mass_start(self) -> int|None:
+        """Vérifie le format de mass_start et le convertit en secondes depuis minuit. None si pas de mass start."""
+
+        if self.mass_start == None:
+            return None
+        self.check_mass_start_time_format()
+        return int(parse_hms_to_seconds([self.mass_start])[0])
 
 
     def check_mass_start_time_format(self):
@@ -229,12 +587,26 @@ class OneDayController:
             raise MassStartTimeFormatNotValidError(self.mass_start)
 
 
-    def get_team_from_doigt(self, row) -> Team:
-        """Récupère l'équipe correspondant à la ligne passée en argument."""
-        for team in self.teams_list:
-            if team.puce == row['SIID']:
-                return team
-        logging.warning(f"Le doigt de SIID {row['SIID']} semble n'avoir aucune équipe atitrée !")
+    def get_team_from_doigt(self, siid: int) -> Team:
+        """Récupère l'équipe dont la puce correspond au SIID passé en argument."""
+        team = self.registry.find_team_from_puce(siid)
+        if team is not None:
+            return team
+        logging.warning("Le doigt de SIID %s semble n'avoir aucune équipe atitrée !", siid)
+
+
+    def attach_bips_to_teams(self, log=True):
+        """Donne à chaque équipe les vues sur ses bips dans self.bips."""
+
+        bips = self.bips
+        for siid in bips.siids.tolist():
+            team = self.get_team_from_doigt(siid)
+            if team is None:
+                continue
+            bips_CN, bips_times = bips.get_bips(siid)
+            team.set_bips(bips_CN, bips_times, bips.get_nb_records_declared(siid))
+
+            if log: logging.info("Attribution des données à %s", team.team_name)
 
 
     def get_epreuve(self, epreuve_name: str) -> EpreuveCourse|EpreuveActi:
@@ -245,9 +617,9 @@ class OneDayController:
             Raises:
                 EpreuveInPolisBadgeusesNotFoundError: Si l'épreuve n'est pas trouvée dans la liste des épreuves.
             """
-            for epreuve in self.epreuves_list:
-                if epreuve_name == epreuve.name:
-                    return epreuve
+            epreuve = self.registry.find_epreuve(epreuve_name)
+            if epreuve is not None:
+                return epreuve
             raise EpreuveInPolisBadgeusesNotFoundError(epreuve_name, self.epreuves_list)
 
 
@@ -257,12 +629,130 @@ class OneDayController:
         teams_to_ignore = []
         # Equipe ignorée si elle n'a rien bipée du tout
         for team in self.teams_list:
-            if len(team.transit_times) == 0:
-                logging.warning(f"Doigt {team.puce} de l'équipe [{team.dossard}] {team.team_name} non récupéré. Celle-ci est ignorée.")
+            if len(team.bips_CN) == 0:
+                logging.warning("Doigt %s de l'équipe [%s] %s non récupéré. Celle-ci est ignorée.", team.puce, team.dossard, team.team_name)
                 teams_to_ignore.append(team)
-        for team in teams_to_ignore:
-            self.teams_list.remove(team)
+                # Gardée de côté au cas où son doigt serait déchargé plus tard (voir update_from_new_doigts)
+                self.ignored_teams[team.puce] = team
+        # Passe par le registre pour que les index restent synchronisés avec teams_list
+        self.registry.remove_teams(teams_to_ignore)
+
+
+    ###########################
+    ### Mode incrémental    ###
+    ###########################
 
+    def update_from_new_doigts(self) -> list[Team]:
+        """
+        Lit les doigts déchargés depuis la dernière lecture de datas_graid.csv et ne recalcule que les équipes concernées
+        (bips, épreuves courues, temps et points). À appeler une fois la journée entièrement calculée (initialize, calculate_times, calculate_scores).\n
+        Retourne la liste des équipes mises à jour, dont le rang est mis à jour dans self.standings.
+        Une équipe dont le nouveau doigt n'a pas toutes les badgeuses de ses épreuves (hors mode impute_missing_bips) est retirée du classement
+        et des équipes de la journée, jusqu'au déchargement d'un doigt complet.
+        """
+
+        new_bips = self.datas_graid.read_new_rows()
+        if new_bips is None or len(new_bips.siids) == 0:
+            return []
+
+        if self.mass_start_seconds is not None:
+            new_bips = new_bips.with_mass_start(self.mass_start_seconds)
+        self.bips = self.bips.merge(new_bips)
+
+        updated_teams = []
+        for siid in new_bips.siids.tolist():
+            team = self.registry.find_team_from_puce(siid)
+            if team is None and siid in self.ignored_teams:
+                team = self.ignored_teams.pop(siid)
+                self.registry.add_team(team)
+            if team is None:
+                logging.warning("Le doigt de SIID %s semble n'avoir aucune équipe atitrée !", siid)
+                continue
+
+            bips_CN, bips_times = new_bips.get_bips(siid)
+            team.set_bips(bips_CN, bips_times, new_bips.get_nb_records_declared(siid))
+            updated_teams.append(team)
+
+        completes = [self.segment_team(team) for team in updated_teams]
+        if self.impute_missing_bips and any(completes):
+            # Refaites une fois pour toutes les équipes mises à jour : un doigt redéchargé remplace ses anciens temps au lieu de s'y ajouter
+            self.collect_segment_statistics()
+
+        for team, complete in zip(updated_teams, completes):
+            if complete:
+                self.score_team(team)
+                self.standings.update(team.get_day_result())
+            else:
+                self.remove_incomplete_team(team)
+
+        return updated_teams
+
+
+    def segment_team(self, team: Team) -> bool:
+        """
+        Recalcule les épreuves courues d'une équipe et rattache ses bips à leurs poinçons (voir update_from_new_doigts).
+        Retourne False si l'équipe n'a pas bipé toutes les badgeuses de ses épreuves (hors mode impute_missing_bips) : ses points ne peuvent pas être calculés.
+        """
+        logging.info("Recalcul de %s...", team)
+
+        team.reset_courses_results()
+        if self.add_runned_epreuves_to_team(team) and not self.impute_missing_bips:
+            logging.warning("%s n'a pas bipé toutes les badgeuses de ses épreuves : ses points ne sont pas calculés.", team)
+            return False
+
+        team.aggregate_transit_times_by_epreuves(self.segmentation_engine)
+        return True
+
+
+    def score_team(self, team: Team):
+        """
+        Estime les bips manquants (mode impute_missing_bips, à partir de segment_statistics), puis calcule les temps et les points d'une équipe segmentée par segment_team().
+        Les heures déjà estimées pour les autres équipes ne sont refaites qu'au prochain run().
+        """
+
+        if self.impute_missing_bips:
+            team.imputed_bips = MissingBipsImputer(self.segment_statistics).impute_team(team)
+            self.imputed_bips = [imputed_bip for imputed_bip in self.imputed_bips if imputed_bip.dossard != team.dossard] + team.imputed_bips
+        team.calculate_courses_times()
+        team.calculate_epreuves_course_points()
+        team.calculate_total_points()
+
+
+    def remove_incomplete_team(self, team: Team):
+        """
+        Retire du classement et des équipes de la journée une équipe dont le dernier doigt déchargé n'a pas toutes les badgeuses de ses épreuves,
+        plutôt que d'y laisser ses résultats précédents. Elle est gardée dans ignored_teams, et reprise au prochain déchargement de son doigt.
+        """
+
+        if team.dossard in self.standings.entries_by_dossard:
+            self.standings.remove(team.dossard)
+        self.registry.remove_teams([team])
+        self.ignored_teams[team.puce] = team
+        logging.warning("%s retirée du classement en attendant un doigt complet.", team)
+
+
+    def watch(self, interval: float = 1.0, on_update=None, max_polls: int|None = None):
+        """
+        Surveille datas_graid.csv et recalcule les équipes dont le doigt vient d'être déchargé, jusqu'à interruption (Ctrl+C).
+
+        Args:
+            interval (float): Temps entre deux lectures du fichier, en s.
+            on_update (Callable[[list[Team]], None]|None): Appelée avec les équipes mises à jour, par exemple pour rafraîchir l'affichage du classement.
+            max_polls (int|None): Nombre maximal de lectures du fichier. None pour surveiller sans fin.
+        """
+        logging.info(f"Surveillance de {self.datas_graid.csv_file}...")
+
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                updated_teams = self.update_from_new_doigts()
+                if updated_teams and on_update is not None:
+                    on_update(updated_teams)
+                polls += 1
+                if max_polls is None or polls < max_polls:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            logging.info("Fin de la surveillance.")
 
 
 #########################
@@ -290,13 +780,13 @@ class MissingBipsError(Exception):
     """Gère les exceptions liées à des équipes qui n'ont pas bipé toutes les badgeuses de l'épreuve."""
 
     def __init__(self, *args, **kwargs):
-        msg = f"Erreur : Une ou plusieurs équipes n'ont pas bipé toutes les badgeuses de l'épreuve !"
+        msg = f"Erreur : Une ou plusieurs équipes n'ont pas bipé toutes les badgeuses de l'épreuve ! (--impute-missing-bips pour estimer les heures manquantes)"
         super().__init__(msg, *args, **kwargs)
 
 
 class DossardNotFoundError(Exception):
-    """Gère les exceptions liées à un dossard inexistant. Par exemple si mal entré dans data_actis.xlsx."""
+    """Gère les exceptions liées à des dossards inexistants. Par exemple si mal entrés dans data_actis.xlsx."""
 
-    def __init__(self, dossard, *args, **kwargs):
-        msg = f"Erreur : Le dossard {dossard} n'est pas référencé dans la liste des participants !"
+    def __init__(self, dossards, *args, **kwargs):
+        msg = f"Erreur : Les dossards {dossards} ne sont pas référencés dans la liste des participants !"
         super().__init__(msg, *args, **kwargs)
\ No newline at end of file
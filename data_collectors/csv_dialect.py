@@ -0,0 +1,87 @@
+import io
+import csv
+import codecs
+import functools
+from dataclasses import dataclass
+
+'''
+Détection du format d'un fichier CSV (séparateur, guillemets, encodage, colonnes) à partir d'un court échantillon du début du fichier,
+pour lire ensuite le fichier avec le moteur C de pandas (sep explicite) plutôt qu'avec le sniffer du moteur Python (sep=None), bien plus lent.
+'''
+
+
+# Taille de l'échantillon lu au début du fichier (la ligne d'en-tête de datas_graid.csv fait déjà près de 10 ko)
+SAMPLE_SIZE = 64*1024
+
+
+@dataclass(frozen=True, slots=True)
+class CsvDialect:
+    """
+    Format d'un fichier CSV.
+
+    Attributes:
+        separator (str): Séparateur des colonnes.
+        quotechar (str): Caractère des champs entre guillemets.
+        encoding (str): Encodage du fichier.
+        columns (tuple[str, ...]): Noms des colonnes de la ligne d'en-tête, sans les espaces en tête.
+    """
+
+    separator: str
+    quotechar: str
+    encoding: str
+    columns: tuple[str, ...]
+
+
+    def get_header_line(self) -> str:
+        """Renvoie la ligne d'en-tête (terminée par un retour à la ligne), pour relire des lignes sans en-tête avec les noms de colonnes."""
+        line = io.StringIO()
+        csv.writer(line, delimiter=self.separator, quotechar=self.quotechar, lineterminator='\n').writerow(self.columns)
+        return line.getvalue()
+
+
+def read_csv_sample(file_path: str, size: int = SAMPLE_SIZE) -> bytes:
+    """Renvoie les size premiers octets de file_path."""
+    with open(file_path, 'rb') as file:
+        return file.read(size)
+
+
+def sniff_csv_dialect(sample: bytes, fallback_encoding: str = 'latin-1', delimiters: str = ';,\t') -> CsvDialect:
+    """
+    Détecte le format d'un CSV à partir d'un échantillon de son début (voir read_csv_sample).
+
+    L'encodage est UTF-8 si l'échantillon est de l'UTF-8 valide (utf-8-sig s'il commence par un BOM), fallback_encoding sinon.
+    Le séparateur est cherché parmi delimiters dans la ligne d'en-tête.
+    """
+
+    encoding = detect_encoding(sample, fallback_encoding)
+    end_of_header = sample.find(b'\n')
+    header = sample if end_of_header == -1 else sample[:end_of_header]
+    return _sniff_header(header.rstrip(b'\r'), encoding, delimiters)
+
+
+def detect_encoding(sample: bytes, fallback_encoding: str = 'latin-1') -> str:
+    """Renvoie 'utf-8-sig' ou 'utf-8' si sample est de l'UTF-8 valide, fallback_encoding sinon."""
+
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # L'échantillon peut couper un caractère multi-octets en deux : la fin incomplète n'est pas une erreur
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return fallback_encoding
+    return 'utf-8'
+
+
+# Les journées d'un même événement ont la même ligne d'en-tête : elle n'est analysée qu'une fois
+@functools.lru_cache(maxsize=32)
+def _sniff_header(header: bytes, encoding: str, delimiters: str) -> CsvDialect:
+    text = header.decode(encoding)
+    try:
+        sniffed = csv.Sniffer().sniff(text, delimiters=delimiters)
+        separator, quotechar = sniffed.delimiter, sniffed.quotechar
+    except csv.Error:
+        # Une seule colonne, ou aucun séparateur qui se dégage : le plus fréquent des séparateurs possibles
+        separator, quotechar = max(delimiters, key=text.count), '"'
+
+    columns = next(csv.reader([text], delimiter=separator, quotechar=quotechar, skipinitialspace=True), [])
+    return CsvDialect(separator, quotechar, encoding, tuple(columns))
@@ -1,15 +1,19 @@
 import pandas as pd
 import logging
 
+from data_collectors.parsed_inputs_cache import ParsedInputsCache
+from utils.instrumentation import instrumentation
+
 
 """
 On doit :
 - Récupérer chaque feuille = une acti
 - Dans chaque feuille sont indiqués : le nom de l'acti, les points attribués, nom/prénom d'un membre de l'équipe, médaille obtenue
-- Créer un dictionnaire de clés 'acti_name' (str), 'or_argent_bronze' (dict), 'team_results' (li
+- Créer un dictionnaire de clés 'acti_name' (str), 'participation_points' (float), 'or_argent_bronze' (dict) par feuille
+- Rassembler les résultats des équipes de toutes les feuilles dans une table longue (acti_idx, dossard, medal)
 
 A VERIFIER:
-- Chaque équipe n'est présente qu'une seule fois sur chaque acti
+- Chaque équipe n'est présente qu'une seule fois sur chaque acti (les doublons sont comptés, et signalés par OneDayController.add_actis_to_teams)
 
 /!\ Obligation d'avoir un fichier d'actis même si aucune acti dans la journée ?
 """
@@ -18,20 +22,42 @@ A VERIFIER:
 
 class DataActisCollector:
 
-    def __init__(self, excel_file: str):
-        logging.info(f"Lecture de {excel_file}.")
+    # Médailles possibles, dans l'ordre des codes de la colonne medal de results
+    MEDALS = ('or', 'argent', 'bronze')
+
+    def __init__(self, excel_file: str, cache: ParsedInputsCache|None = None, file_hash: str|None = None):
+        with instrumentation.measure('DataActisCollector', file=excel_file) as measure:
+            logging.info(f"Lecture de {excel_file}.")
+
+            self.excel_file_path = excel_file
+            # Dict of sheets. Reste à None si les actis sont lues depuis le cache.
+            self.excel_file: dict[str, pd.DataFrame]|None = None
+
+            # Paramètres de chaque acti par nom de feuille, et résultats de toutes les actis (voir extract_results)
+            if cache is None:
+                read = self.read_actis()
+            else:
+                read = cache.load_or_parse(excel_file, 'data_actis', self.read_actis, file_hash)
+            self.actis_dict: dict[str, dict] = read[0]
+            self.results: pd.DataFrame = read[1]
+            measure.count(rows=len(self.results))
+
+
+    def read_actis(self) -> tuple[dict[str, dict], pd.DataFrame]:
+        """Lit toutes les feuilles de l'Excel des actis et en extrait les données. Renvoie (actis_dict, results)."""
 
-        # Dict of sheets. "A:H" englobe les huit colonnes utilisées de chaque feuille.
-        self.excel_file = pd.read_excel(excel_file, sheet_name=None, usecols="A:G")
+        # "A:H" englobe les huit colonnes utilisées de chaque feuille.
+        self.excel_file = pd.read_excel(self.excel_file_path, sheet_name=None, usecols="A:G")
 
-        self.actis_dict = {}
+        actis_dict = {}
         for sheet_name, sheet_data in self.excel_file.items():
-            self.actis_dict[sheet_name] = self.extract_data(sheet_data)
+            actis_dict[sheet_name] = self.extract_data(sheet_data)
+        return actis_dict, self.extract_results(self.excel_file)
     
     
     def extract_data(self, sheet: pd.DataFrame) -> dict:
         
-        """Extrait les données d'un sheet."""
+        """Extrait les paramètres de l'acti d'un sheet (première ligne)."""
 
         epreuve_acti_dict = {}
 
@@ -39,9 +65,46 @@ class DataActisCollector:
         epreuve_acti_dict['participation_points'] = float(sheet['Points Participation'].iloc[0])
         epreuve_acti_dict['or_argent_bronze'] = {'or': float(sheet['Points Or'].iloc[0]), 'argent': float(sheet['Points Argent'].iloc[0]), 'bronze': float(sheet['Points Bronze'].iloc[0])}
 
-        # Partie du sheet ne contenant que les scores des différentes équipes
-        dossard_medal_df = sheet[['Dossard', 'Medaille']].dropna(how='all')
-        
-        epreuve_acti_dict['teams_results'] = [{'dossard': int(dossard_medal_df['Dossard'].iloc[row_idx]), 'medal': str(dossard_medal_df['Medaille'].iloc[row_idx]).strip().lower()} for row_idx in dossard_medal_df.index]
-
         return epreuve_acti_dict
+
+
+    def extract_results(self, sheets: dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Rassemble les résultats des équipes de toutes les feuilles en une seule table longue, dans l'ordre des feuilles puis des lignes :
+        acti_idx (position de la feuille, int16), dossard (int32) et medal (position de la médaille dans MEDALS, int8).
+
+        Raises:
+            ActisResultsFormatError: Pour toutes les lignes sans dossard numérique ou dont la médaille n'est pas or, argent ou bronze, signalées ensemble.
+        """
+
+        if not sheets:
+            return pd.DataFrame({'acti_idx': pd.Series(dtype='int16'), 'dossard': pd.Series(dtype='int32'), 'medal': pd.Series(dtype='int8')})
+
+        # Partie de chaque sheet ne contenant que les scores des différentes équipes
+        results = pd.concat([sheet[['Dossard', 'Medaille']].dropna(how='all') for sheet in sheets.values()],
+                            keys=range(len(sheets)), names=['acti_idx', 'row_idx']).reset_index()
+
+        dossards = pd.to_numeric(results['Dossard'], errors='coerce')
+        medals = pd.Categorical(results['Medaille'].astype(str).str.strip().str.lower(), categories=self.MEDALS).codes
+
+        invalid = (dossards.isna() | (medals == -1)).to_numpy()
+        if invalid.any():
+            invalid_rows = results[invalid].assign(feuille=[list(sheets)[acti_idx] for acti_idx in results.loc[invalid, 'acti_idx']],
+                                                   ligne=results.loc[invalid, 'row_idx'] + 2)
+            raise ActisResultsFormatError(invalid_rows[['feuille', 'ligne', 'Dossard', 'Medaille']])
+
+        return pd.DataFrame({'acti_idx': results['acti_idx'].to_numpy(dtype='int16'),
+                             'dossard': dossards.to_numpy(dtype='int32'),
+                             'medal': medals.astype('int8')})
+
+
+
+
+
+
+class ActisResultsFormatError(Exception):
+    """Gère les exceptions liées à des lignes de résultats d'actis illisibles (dossard manquant, médaille inconnue)."""
+
+    def __init__(self, lignes_en_cause, *args, **kwargs):
+        msg = f"Il y a des résultats d'actis illisibles (dossard manquant ou médaille autre que or, argent, bronze) !\n {lignes_en_cause}"
+        super().__init__(msg, *args, **kwargs)
@@ -1,7 +1,14 @@
+import io
+import os
+import re
 import pandas
 import logging
 
 from models.team import Team
+from models.bips_table import BipsTable
+from data_collectors.parsed_inputs_cache import ParsedInputsCache
+from data_collectors.csv_dialect import CsvDialect, SAMPLE_SIZE, sniff_csv_dialect
+from utils.instrumentation import instrumentation
 
 '''
 On doit récupérer les colonnes :
@@ -20,41 +27,119 @@ Vérifications à faire :
 '''
 
 
-class DatasGraidCollector:
-
-    def __init__(self, csv_file: str):
-        #Importation de toutes les données
-        logging.info(f"Lecture de {csv_file}.")
-
-        self.df = pandas.read_csv(csv_file, sep=None, engine='python', skipinitialspace=True, encoding='latin-1')
-        self.csv_file = csv_file
-        self.df_cleaned = self.get_useful_datas_graid_columns()
-
-
-    def get_useful_datas_graid_columns(self) -> pandas.DataFrame:
-        """Ne garde que les colonnes utiles de datas_graid.csv"""
-
-        #Retirer les colonnes sans données
-        df_cleaned = self.df.dropna(axis='columns', how='all')
-
-        useful_columns = ['No', 'SIID', 'No. of records']
-
-        record_idx = 1
-        while f'Record {record_idx} CN' in df_cleaned.columns:
-            useful_columns.append(f'Record {record_idx} CN')
-            useful_columns.append(f'Record {record_idx} DOW')
-            useful_columns.append(f'Record {record_idx} time')
-            record_idx += 1
-        
-        return df_cleaned[useful_columns]
-    
-
-
-
-
+# Colonnes lues (les ~40 autres colonnes de l'export ne sont pas chargées) et leur type
+GRAID_COLUMNS_DTYPES = {'No': 'int32', 'SIID': 'int64', 'No. of records': 'int16'}
+RECORD_COLUMN_PATTERN = re.compile(r'Record \d+ (CN|DOW|time)')
+RECORD_FIELDS_DTYPES = {'CN': 'float32', 'DOW': 'str', 'time': 'str'}
 
 
+class DatasGraidCollector:
 
+    def __init__(self, csv_file: str, cache: ParsedInputsCache|None = None, file_hash: str|None = None):
+        with instrumentation.measure('DatasGraidCollector', file=csv_file) as measure:
+            #Importation de toutes les données
+            logging.info(f"Lecture de {csv_file}.")
+
+            self.csv_file = csv_file
+            # Format large d'origine, réduit aux colonnes utiles. Reste à None si les bips sont lus depuis le cache.
+            self.df: pandas.DataFrame|None = None
+
+            # Table longue (SIID, record_idx, CN, seconds) dans laquelle chaque équipe lit ses bips.
+            # read_offset (position dans le fichier après la dernière ligne lue) et dialect (séparateur, encodage, colonnes de l'en-tête)
+            # servent à lire les lignes ajoutées ensuite (read_new_rows).
+            if cache is None:
+                read = self.read_bips()
+            else:
+                read = cache.load_or_parse(csv_file, 'datas_graid', self.read_bips, file_hash)
+            self.bips: BipsTable = read[0]
+            self.read_offset: int = read[1]
+            self.dialect: CsvDialect = read[2]
+            # Jour de course de la lecture complète, gardé pour les lignes lues ensuite (read_new_rows) : leurs seuls bips ne suffisent pas à le retrouver
+            self.race_day: int|None = self.bips.race_day
+            measure.count(rows=len(self.bips))
+
+
+    def read_bips(self) -> tuple[BipsTable, int, CsvDialect]:
+        """
+        Lit tout datas_graid.csv et le convertit en BipsTable.\n
+        Renvoie (bips, read_offset, dialect).
+        """
+
+        with open(self.csv_file, 'rb') as file:
+            content = file.read()
+        # read_offset s'arrête après la dernière ligne terminée par un retour à la ligne : une dernière ligne sans retour à la ligne
+        # (fin de fichier ou ligne en cours d'écriture) sera relue par read_new_rows() une fois complétée, ses bips remplaçant alors ceux lus ici.
+        read_offset = content.rfind(b'\n') + 1
+
+        # Format détecté sur le début du fichier, puis lecture par le moteur C des seules colonnes utiles
+        dialect = sniff_csv_dialect(content[:SAMPLE_SIZE])
+        self.df = self.parse_rows(content, dialect, header=True)
+
+        return BipsTable.from_datas_graid(self.df), read_offset, dialect
+
+
+    def read_new_rows(self) -> BipsTable|None:
+        """
+        Lit uniquement les lignes complètes ajoutées à datas_graid.csv depuis la dernière lecture (un doigt déchargé = une ligne).\n
+        Renvoie la BipsTable de ces lignes, None si rien de nouveau. Si le fichier a été raccourci (réécrit), tout le fichier est relu et renvoyé.\n
+        Ne modifie pas self.bips : c'est à l'appelant de fusionner les nouveaux bips dans ses propres bips (BipsTable.merge), après un éventuel ajout du mass start.
+        """
+
+        if os.path.getsize(self.csv_file) < self.read_offset:
+            logging.warning(f"{self.csv_file} a été réécrit : relecture complète.")
+            bips, self.read_offset, self.dialect = self.read_bips()
+            self.race_day = bips.race_day
+            return bips
+
+        with open(self.csv_file, 'rb') as file:
+            file.seek(self.read_offset)
+            new_content = file.read()
+
+        new_content = new_content[:new_content.rfind(b'\n') + 1]
+        if not new_content.strip():
+            self.read_offset += len(new_content)
+            return None
+        self.read_offset += len(new_content)
+
+        new_rows = self.parse_rows(new_content, self.dialect, header=False).dropna(how='all')
+        logging.info(f"{len(new_rows)} nouvelle(s) ligne(s) lue(s) dans {self.csv_file}.")
+
+        # Jour de course de la lecture complète : des doigts déchargés après minuit n'ont que des bips du lendemain
+        new_bips = BipsTable.from_datas_graid(new_rows, self.race_day)
+        if self.race_day is None:
+            # Fichier sans aucun bip à la lecture complète (début d'événement) : le jour de course est celui des premiers doigts déchargés
+            self.race_day = new_bips.race_day
+        return new_bips
+
+
+    @staticmethod
+    def parse_rows(content: bytes, dialect: CsvDialect, header: bool) -> pandas.DataFrame:
+        """
+        Lit les lignes de content (tout le fichier si header, des lignes sans en-tête sinon) avec le moteur C de pandas,
+        en ne chargeant que les colonnes No, SIID, No. of records et Record x CN / DOW / time, avec des types compacts.
+        """
+
+        if not header:
+            # Avec usecols, le moteur C n'accepte les lignes plus courtes que l'en-tête (doigts avec moins de records) que si l'en-tête est lu avec elles
+            content = dialect.get_header_line().encode(dialect.encoding) + content
+
+        dtypes = get_useful_columns_dtypes(dialect.columns)
+        return pandas.read_csv(io.BytesIO(content), sep=dialect.separator, quotechar=dialect.quotechar, encoding=dialect.encoding,
+                               # Seules les colonnes lues doivent être décodables : un nom de coureur mal encodé ne bloque pas la lecture des bips
+                               encoding_errors='replace', index_col=False, usecols=list(dtypes), dtype=dtypes, skipinitialspace=True, engine='c')
+
+
+
+def get_useful_columns_dtypes(columns: tuple[str, ...]) -> dict[str, str]:
+    """Renvoie le type de chaque colonne utile de datas_graid.csv présente dans columns, dans l'ordre du fichier."""
+
+    dtypes = {}
+    for column in columns:
+        if column in GRAID_COLUMNS_DTYPES:
+            dtypes[column] = GRAID_COLUMNS_DTYPES[column]
+        elif (match := RECORD_COLUMN_PATTERN.fullmatch(column)) is not None:
+            dtypes[column] = RECORD_FIELDS_DTYPES[match.group(1)]
+    return dtypes
 
 
 class TeamInDatasGraidNotFoundError(Exception):
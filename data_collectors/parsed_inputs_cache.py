@@ -0,0 +1,100 @@
+import os
+import glob
+import pickle
+import hashlib
+import logging
+from typing import Callable, Any
+
+
+class ParsedInputsCache:
+    """
+    Cache disque des données lues dans les fichiers d'entrée, indexé par le hash du contenu de chaque fichier.
+
+    Tant qu'un fichier n'a pas changé, les tables déjà lues et typées (DataFrames, BipsTable...) sont rechargées depuis le cache
+    au lieu de relancer la lecture du fichier (pd.read_excel, sniffer du CSV...).
+    Les entrées sont des pickles binaires (protocole le plus récent) : les colonnes numpy y sont stockées telles quelles.
+
+    Seule la dernière entrée de chaque fichier est gardée pour chaque lecture : en direct, datas_graid.csv change à chaque déchargement de doigt,
+    et chaque nouvelle entrée remplace celle du contenu précédent au lieu de s'y ajouter.
+
+    Attributes:
+        cache_directory (str): Dossier où sont stockées les entrées du cache.
+    """
+
+    # À incrémenter quand la façon de lire un fichier change, pour invalider les entrées existantes
+    FORMAT_VERSION = 5
+
+    def __init__(self, cache_directory: str = 'CACHE'):
+        self.cache_directory = cache_directory
+        os.makedirs(cache_directory, exist_ok=True)
+
+
+    def load_or_parse(self, file_path: str, reader_name: str, parse: Callable[[], Any], file_hash: str|None = None) -> Any:
+        """
+        Renvoie les données de file_path lues par parse(), depuis le cache si le contenu du fichier n'a pas changé.
+
+        Args:
+            file_path (str): Le fichier d'entrée.
+            reader_name (str): Nom de la lecture faite sur le fichier, un même fichier pouvant être lu de plusieurs façons.
+            parse (Callable): Lit le fichier et renvoie les données à mettre en cache.
+            file_hash (str|None): Hash du contenu du fichier s'il est déjà connu (voir OneDayController.get_input_keys), calculé sinon.
+        """
+
+        entry_path = self.get_entry_path(file_path, reader_name, file_hash)
+
+        if os.path.exists(entry_path):
+            try:
+                with open(entry_path, 'rb') as entry_file:
+                    data = pickle.load(entry_file)
+                logging.info(f"{file_path} inchangé : données lues depuis le cache.")
+                return data
+            except Exception as error:
+                logging.warning(f"Entrée de cache {entry_path} illisible ({error}), relecture de {file_path}.")
+
+        data = parse()
+
+        # Écriture dans un fichier temporaire puis renommage, pour qu'un autre processus ne lise jamais une entrée à moitié écrite
+        temporary_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as entry_file:
+            pickle.dump(data, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, entry_path)
+        self.remove_stale_entries(file_path, reader_name, entry_path)
+
+        return data
+
+
+    def get_entry_path(self, file_path: str, reader_name: str, file_hash: str|None = None) -> str:
+        """
+        Renvoie le chemin de l'entrée du cache pour la lecture reader_name de file_path (file_hash : hash du contenu s'il est déjà connu).
+        Le nom de l'entrée commence par celui de la lecture et un hash du chemin du fichier (voir remove_stale_entries).
+        """
+        return os.path.join(self.cache_directory, f"{self.get_entry_prefix(file_path, reader_name)}-v{self.FORMAT_VERSION}-{file_hash or self.get_file_hash(file_path)}.pkl")
+
+
+    def get_entry_prefix(self, file_path: str, reader_name: str) -> str:
+        """Début commun aux noms des entrées de la lecture reader_name de file_path, quel que soit son contenu."""
+        return f"{reader_name}-{hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:16]}"
+
+
+    def remove_stale_entries(self, file_path: str, reader_name: str, entry_path: str):
+        """Supprime les entrées de la lecture reader_name de file_path autres que entry_path : anciens contenus du fichier, anciennes versions du format."""
+
+        for stale_path in glob.glob(os.path.join(glob.escape(self.cache_directory), f"{glob.escape(self.get_entry_prefix(file_path, reader_name))}-v*.pkl")):
+            if stale_path == entry_path:
+                continue
+            try:
+                os.remove(stale_path)
+            except FileNotFoundError:
+                # Déjà supprimée par un autre processus
+                pass
+
+
+    @staticmethod
+    def get_file_hash(file_path: str) -> str:
+        """Renvoie le hash SHA-256 du contenu du fichier."""
+
+        file_hash = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                file_hash.update(block)
+        return file_hash.hexdigest()
@@ -1,6 +1,9 @@
 import pandas as pd
 import logging
 
+from data_collectors.parsed_inputs_cache import ParsedInputsCache
+from utils.instrumentation import instrumentation
+
 '''
 On garde toutes les colonnes
 
@@ -16,12 +19,26 @@ class PolisBadgeusesCollector:
     Classe appelée après PolisParcoursCollector, une fois que toutes les épreuves ont été créées
     """
 
-    def __init__(self, csv_file: str):
-        logging.info(f"Lecture de {csv_file}.")
+    def __init__(self, csv_file: str, cache: ParsedInputsCache|None = None, file_hash: str|None = None):
+        with instrumentation.measure('PolisBadgeusesCollector', file=csv_file) as measure:
+            logging.info(f"Lecture de {csv_file}.")
+
+            # Importation des données
+            self.csv_file = csv_file
+            if cache is None:
+                self.df = self.read_badgeuses()
+            else:
+                self.df: pd.DataFrame = cache.load_or_parse(csv_file, 'polis_badgeuses', self.read_badgeuses, file_hash)
+            measure.count(rows=len(self.df))
+
+
+    def read_badgeuses(self) -> pd.DataFrame:
+        """Lit le fichier des badgeuses."""
 
-        # Importation des données
-        self.df = pd.read_csv(csv_file).dropna(how='all')
-        self.csv_file = csv_file
+        df = pd.read_csv(self.csv_file).dropna(how='all')
+        # Identifiant de chaque poinçon : sa position dans le fichier de badgeuses
+        df['poincon_id'] = range(len(df))
+        return df
     
 
     def check_epreuves_are_defined(self):
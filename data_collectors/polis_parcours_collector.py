@@ -1,7 +1,10 @@
+import hashlib
 import pandas as pd
 import logging
 
 from models.epreuve import Epreuve, EpreuveCourse, EpreuveActi
+from data_collectors.parsed_inputs_cache import ParsedInputsCache
+from utils.instrumentation import instrumentation
 
 '''
 On garde toutes les colonnes
@@ -11,13 +14,26 @@ Vérifications à faire :
 
 
 class PolisParcoursCollector:
+
+    # Colonnes qui définissent quelles épreuves existent (et leurs portions MG). Les autres ne sont que des paramètres de notation.
+    STRUCTURE_COLUMNS = ['nom', 'type']
     
-    def __init__(self, csv_file: str):
-        logging.info(f"Lecture de {csv_file}.")
+    def __init__(self, csv_file: str, cache: ParsedInputsCache|None = None, file_hash: str|None = None):
+        with instrumentation.measure('PolisParcoursCollector', file=csv_file) as measure:
+            logging.info(f"Lecture de {csv_file}.")
+
+            #Importation de toutes les données
+            self.csv_file = csv_file
+            if cache is None:
+                self.df = self.read_epreuves()
+            else:
+                self.df: pd.DataFrame = cache.load_or_parse(csv_file, 'polis_parcours', self.read_epreuves, file_hash)
+            measure.count(rows=len(self.df))
+
 
-        #Importation de toutes les données
-        self.df = pd.read_csv(csv_file).dropna(how='all')
-        self.csv_file = csv_file
+    def read_epreuves(self) -> pd.DataFrame:
+        """Lit le fichier des épreuves."""
+        return pd.read_csv(self.csv_file).dropna(how='all')
         
 
     def create_epreuves(self) -> list[Epreuve]:
@@ -29,7 +45,8 @@ class PolisParcoursCollector:
         for _, row in self.df.iterrows():
 
             if not 'meilleur grimpeur' in row['nom']:
-                new_epreuve: Epreuve = self._create_epreuve_object(row)
+                # Identifiant = position dans la liste des épreuves
+                new_epreuve: Epreuve = self._create_epreuve_object(row, len(epreuves_list))
                 epreuves_list.append(new_epreuve)
             else:
                 self._append_mg_to_epreuve_course(row, epreuves_list)
@@ -38,16 +55,57 @@ class PolisParcoursCollector:
         return epreuves_list
 
 
+    def update_epreuves_parameters(self, epreuves_list: list[Epreuve], actis: bool):
+        """
+        Remet à jour les paramètres de notation (points, temps de référence, gains et pertes par minute, médailles, MG) des épreuves existantes,
+        sans recréer les objets. À n'utiliser que si la structure des épreuves (get_structure_key) n'a pas changé.
+
+        Args:
+            epreuves_list (list[Epreuve]): Les épreuves créées par create_epreuves(), dans le même ordre.
+            actis (bool): True pour mettre à jour les actis, False pour les courses.
+        """
+        logging.info(f"Mise à jour des paramètres des {'actis' if actis else 'courses'} à partir de {self.csv_file}...")
+
+        # Lignes du fichier par nom d'épreuve (portions MG comprises), lues directement dans df sans recréer les épreuves
+        rows_by_name = {str(row['nom']): row for row in self.df.to_dict('records')}
+        for epreuve in epreuves_list:
+            if isinstance(epreuve, EpreuveActi) != actis:
+                continue
+            row = rows_by_name[epreuve.name]
+            epreuve.participation_points = float(row['points'])
+            if isinstance(epreuve, EpreuveActi):
+                epreuve.or_argent_bronze = {'or': float(row['or']), 'argent': float(row['argent']), 'bronze': float(row['bronze'])}
+                continue
+
+            epreuve.reference_time = float(row['temps_ref'])
+            epreuve.gain_per_minute = float(row['points_gain_min'])
+            epreuve.loss_per_minute = float(row['points_perte_min'])
+            mg_row = rows_by_name.get(f"{epreuve.name} meilleur grimpeur")
+            if mg_row is not None:
+                epreuve.meilleur_grimpeur = self._get_mg_parameters(mg_row)
+
+
+    def get_structure_key(self) -> str:
+        """Hash des colonnes de structure des épreuves : change si une épreuve ou une portion MG est ajoutée, retirée, renommée ou déplacée."""
+        return self._hash_rows(self.df[self.STRUCTURE_COLUMNS])
+
+
+    def get_parameters_key(self, actis: bool) -> str:
+        """Hash des lignes des actis (actis=True) ou des courses (actis=False) : change si un de leurs paramètres de notation change."""
+        return self._hash_rows(self.df[(self.df['type'] == 'acti') == actis])
+
+
 
     #######################
     ### PRIVATE METHODS ###
     #######################
 
-    def _create_epreuve_object(self, row: pd.Series) -> Epreuve:
-        """Retourne une sous-classe de Épreuve selon type_epreuve (défini avec la méthode __type_epreuve)."""
+    def _create_epreuve_object(self, row: pd.Series, epreuve_id: int) -> Epreuve:
+        """Retourne une sous-classe de Épreuve selon type_epreuve (défini avec la méthode __type_epreuve), d'identifiant epreuve_id."""
 
         if row['type'] in ['trail', 'vtt']:
             epreuve_object = EpreuveCourse(
+                epreuve_id,
                 str(row['nom']),
                 float(row['points']),
                 float(row['temps_ref']),
@@ -58,20 +116,32 @@ class PolisParcoursCollector:
         
         elif row['type'] == 'acti':
             epreuve_object = EpreuveActi(
+                epreuve_id,
                 str(row['nom']),
                 float(row['points']),
                 {'or':float(row['or']), 'argent':float(row['argent']), 'bronze':float(row['bronze'])}
             )
         
-        logging.info(f"Création de l'épreuve {epreuve_object}")
+        logging.info("Création de l'épreuve %s", epreuve_object)
         return epreuve_object
 
 
+    @staticmethod
+    def _hash_rows(df: pd.DataFrame) -> str:
+        return hashlib.sha256(df.to_csv(index=False).encode()).hexdigest()
+
+
     def _append_mg_to_epreuve_course(self, row: pd.Series, epreuves_list: list[EpreuveCourse]):
         """Modifie l'épreuve contenant un meilleur grimpeur pour l'y intégrer."""
         
         mg_epreuve_name = str(row['nom']).replace(" meilleur grimpeur", '')
         for epreuve in epreuves_list:
             if epreuve.name == mg_epreuve_name:
-                epreuve.meilleur_grimpeur = {'reference_time': float(row['temps_ref']), 'gain_per_minute': float(row['points_gain_min']), 'loss_per_minute': float(row['points_perte_min'])}
-                logging.info(f"Ajout d'une portion meilleur grimpeur à {epreuve.name}.")
\ No newline at end of file
+                epreuve.meilleur_grimpeur = self._get_mg_parameters(row)
+                logging.info("Ajout d'une portion meilleur grimpeur à %s.", epreuve.name)
+
+
+    @staticmethod
+    def _get_mg_parameters(row) -> dict[str, float]:
+        """Paramètres de notation de la portion meilleur grimpeur d'une ligne du fichier d'épreuves."""
+        return {'reference_time': float(row['temps_ref']), 'gain_per_minute': float(row['points_gain_min']), 'loss_per_minute': float(row['points_perte_min'])}
@@ -0,0 +1,45 @@
+import pandas as pd
+import logging
+
+from data_collectors.csv_dialect import read_csv_sample, sniff_csv_dialect
+from models.what_if import ParameterScenario
+
+'''
+Fichier de scénarios pour le mode what-if : une ligne par course modifiée d'un scénario.
+- scenario : nom du scénario (plusieurs lignes pour un même scénario)
+- nom : nom de la course, suivi de " meilleur grimpeur" pour sa portion MG (comme dans le fichier d'épreuves)
+- temps_ref, points_gain_min, points_perte_min, points : nouvelles valeurs. Une case vide garde la valeur de la journée.
+'''
+
+
+class ScenariosCollector:
+
+    def __init__(self, csv_file: str):
+        logging.info(f"Lecture de {csv_file}.")
+
+        self.csv_file = csv_file
+        self.df = self.read_scenarios()
+
+
+    def read_scenarios(self) -> pd.DataFrame:
+        """Lit le fichier de scénarios, avec le séparateur détecté sur sa ligne d'en-tête (voir sniff_csv_dialect)."""
+
+        dialect = sniff_csv_dialect(read_csv_sample(self.csv_file))
+        return pd.read_csv(self.csv_file, sep=dialect.separator, quotechar=dialect.quotechar, encoding=dialect.encoding,
+                           skipinitialspace=True, engine='c').dropna(how='all')
+
+
+    def create_scenarios(self) -> list[ParameterScenario]:
+        """Crée les scénarios, dans l'ordre de première apparition dans le fichier."""
+
+        parameters = [column for column in ParameterScenario.PARAMETERS if column in self.df.columns]
+
+        scenarios: dict[str, ParameterScenario] = {}
+        for _, row in self.df.iterrows():
+            scenario = scenarios.setdefault(str(row['scenario']), ParameterScenario(str(row['scenario'])))
+            for parameter in parameters:
+                if pd.notna(row[parameter]):
+                    scenario.overrides.append((str(row['nom']), parameter, float(row[parameter])))
+
+        logging.info(f"{len(scenarios)} scénario(s) lu(s) dans {self.csv_file}.")
+        return list(scenarios.values())
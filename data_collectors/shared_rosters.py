@@ -0,0 +1,41 @@
+import logging
+
+from data_collectors.teams_gen_collector import TeamsGenCollector
+from data_collectors.parsed_inputs_cache import ParsedInputsCache
+
+
+class SharedRosters:
+    """
+    Fichiers d'équipes lus une seule fois pour toutes les journées d'un même processus, indexés par le hash de leur contenu.
+
+    En pratique chaque journée pointe vers son propre fichier d'équipes, mais leur contenu est le même d'une journée à l'autre :
+    la première journée lit le fichier et crée les identités des équipes (TeamIdentity), les suivantes réutilisent le même TeamsGenCollector.
+    Chaque journée crée toujours ses propres Team (TeamsGenCollector.create_teams), qui portent ses résultats.
+
+    Attributes:
+        rosters (dict[str, TeamsGenCollector]): Les fichiers d'équipes lus, par hash de contenu.
+    """
+
+    def __init__(self):
+        self.rosters: dict[str, TeamsGenCollector] = {}
+
+
+    def get_roster(self, csv_file: str, file_hash: str|None = None, cache: ParsedInputsCache|None = None) -> TeamsGenCollector:
+        """
+        Renvoie le fichier d'équipes csv_file lu, depuis une journée précédente si un fichier de même contenu a déjà été lu.
+
+        Args:
+            csv_file (str): Le fichier d'équipes.
+            file_hash (str|None): Hash du contenu du fichier s'il est déjà connu (clé 'teams' de OneDayController.get_input_keys), calculé sinon.
+            cache (ParsedInputsCache|None): Cache disque utilisé pour la première lecture du fichier.
+        """
+
+        if file_hash is None:
+            file_hash = ParsedInputsCache.get_file_hash(csv_file)
+
+        roster = self.rosters.get(file_hash)
+        if roster is None:
+            roster = self.rosters[file_hash] = TeamsGenCollector(csv_file, cache, file_hash)
+        else:
+            logging.info(f"{csv_file} identique au fichier d'équipes {roster.csv_file} déjà lu : équipes reprises.")
+        return roster
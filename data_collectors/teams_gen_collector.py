@@ -1,7 +1,10 @@
 import pandas as pd
 import logging
 
-from models.team import Team
+from models.team import Team, TeamIdentity
+from data_collectors.parsed_inputs_cache import ParsedInputsCache
+from data_collectors.csv_dialect import read_csv_sample, sniff_csv_dialect
+from utils.instrumentation import instrumentation
 
 '''
 On garde toutes les colonnes
@@ -13,55 +16,76 @@ Vérifications à faire :
 '''
 
 
+# Types des colonnes d'identifiants (entiers qui acceptent les lignes vides, retirées après lecture) ; les noms restent des chaînes telles quelles
+TEAMS_COLUMNS_DTYPES = {'Dossard': 'Int32', 'Puce': 'Int64', 'Nom': 'str', 'Contact': 'str', 'Mixite': 'str'}
+
+
 class TeamsGenCollector:
 
-    def __init__(self, csv_file):
-        #Importation de toutes les données
-        logging.info(f"Lecture de {csv_file}.")
+    def __init__(self, csv_file, cache: ParsedInputsCache|None = None, file_hash: str|None = None):
+        with instrumentation.measure('TeamsGenCollector', file=csv_file) as measure:
+            #Importation de toutes les données
+            logging.info(f"Lecture de {csv_file}.")
 
-        self.df = pd.read_csv(csv_file, encoding='utf-8', sep=None, engine='python', skipinitialspace=True).dropna(how='all')
-        self.csv_file = csv_file
-        self.number_of_runners = self.get_number_of_runners()
+            self.csv_file = csv_file
+            if cache is None:
+                self.df = self.read_teams()
+            else:
+                self.df: pd.DataFrame = cache.load_or_parse(csv_file, 'teams_gen', self.read_teams, file_hash)
+            self.number_of_runners = self.get_number_of_runners()
 
-        self.check_puce_duplicates()
+            self.check_puce_duplicates()
+            # Identités des équipes, créées une seule fois par create_team_identities() même si le fichier sert à plusieurs journées
+            self.team_identities: list[TeamIdentity]|None = None
+            measure.count(rows=len(self.df))
 
     
     def create_teams(self) -> list[Team]:
-        '''Crée la liste d'équipes à partir des données de du fichier d'équipes.'''
+        '''Crée la liste d'équipes (nouvelles, sans résultats) à partir des données de du fichier d'équipes.'''
         logging.info(f"Création des équipes à partir de {self.csv_file}...")
 
         teams_list = []
-
-        for _, row in self.df.iterrows():
-            concs_list = []
-            
-            # Création d'une liste de tuples (nom, prenom) des concurrents
-            for conc_idx in range(1, self.number_of_runners+1):
-                nom = row[f'Nom Conc {conc_idx}']
-                prenom = row[f'Prenom Conc {conc_idx}']
-                concs_list.append((str(nom), str(prenom)))
-
-            # On force le type de chaque élément pour être au clair sur le type des données
-            new_team = Team(
-                int(row['Puce']),
-                int(row['Dossard']),
-                bool(row['Entreprise']),
-                str(row['Mixite']).upper(),
-                str(row['Nom']),
-                concs_list,
-                str(row['Contact'])
-            )
-
-            logging.info(f"Création de l'équipe {new_team}")
+        for identity in self.create_team_identities():
+            new_team = Team.from_identity(identity)
+            logging.info("Création de l'équipe %s", new_team)
             teams_list.append(new_team)
 
         logging.info(f"Toutes les équipes ont bien été implémentées.\n" + "-"*50)
         return teams_list
 
 
+    def create_team_identities(self) -> list[TeamIdentity]:
+        '''Renvoie l'identité de chaque équipe du fichier d'équipes, lue colonne par colonne la première fois puis gardée.'''
+
+        if self.team_identities is not None:
+            return self.team_identities
+
+        # Tuples (nom, prenom) des concurrents de chaque équipe
+        concs_columns = [zip(self.df[f'Nom Conc {conc_idx}'].tolist(), self.df[f'Prenom Conc {conc_idx}'].tolist()) for conc_idx in range(1, self.number_of_runners+1)]
+        concs_lists = zip(*concs_columns) if concs_columns else ((),)*len(self.df)
+
+        # On force le type de chaque élément pour être au clair sur le type des données
+        self.team_identities = [
+            TeamIdentity(int(puce), int(dossard), bool(ent), str(mixite).upper(), str(nom), tuple((str(nom_conc), str(prenom_conc)) for nom_conc, prenom_conc in concs), str(contact))
+            for puce, dossard, ent, mixite, nom, contact, concs in zip(self.df['Puce'].tolist(), self.df['Dossard'].tolist(), self.df['Entreprise'].tolist(),
+                                                                      self.df['Mixite'].tolist(), self.df['Nom'].tolist(), self.df['Contact'].tolist(), concs_lists)
+        ]
+        return self.team_identities
+
+
     ################################
     ### Appelées dans __init__() ###
     ################################
+
+    def read_teams(self) -> pd.DataFrame:
+        """Lit le fichier d'équipes, avec le moteur C de pandas et le séparateur et l'encodage détectés sur son début."""
+
+        dialect = sniff_csv_dialect(read_csv_sample(self.csv_file), fallback_encoding='cp1252')
+        dtypes = {column: dtype for column, dtype in TEAMS_COLUMNS_DTYPES.items() if column in dialect.columns}
+        dtypes.update({column: 'str' for column in dialect.columns if column.startswith(('Nom Conc ', 'Prenom Conc '))})
+        return pd.read_csv(self.csv_file, sep=dialect.separator, quotechar=dialect.quotechar, encoding=dialect.encoding,
+                           dtype=dtypes, skipinitialspace=True, engine='c').dropna(how='all')
+
     
     def get_number_of_runners(self):
         '''Détermine le nombre de concurrents basé sur les colonnes du fichier d'équipes.'''
@@ -1,37 +1,174 @@
+import os
+import queue
+import argparse
 import logging
+import logging.handlers
 import datetime
+import multiprocessing
+import pandas
+from dataclasses import asdict
 
 from controllers.multidayscontroller import MultiDaysController
+from models.standings import Standings
+from models.what_if import RankStability
+from models.results import DayResult
+from models.bips_table import seconds_to_hms
+from data_collectors.scenarios_collector import ScenariosCollector
+from utils.instrumentation import instrumentation
 
 
-def setup_logging():
-    """Définition des paramètres de logging."""
+def setup_logging(level: int = logging.INFO, queued: bool = False, multiprocess: bool = False) -> tuple[str, logging.handlers.QueueListener|None]:
+    """
+    Définition des paramètres de logging. Renvoie le chemin du fichier de logs (sans son extension) et le QueueListener du mode queued, à arrêter en fin de programme.
+
+    Args:
+        level (int): Niveau minimal des messages écrits. Les messages de niveau inférieur ne sont pas mis en forme.
+        queued (bool): Si True, les messages sont mis dans une file et écrits (fichier et console) par un thread dédié : le calcul n'attend plus les écritures.
+        multiprocess (bool): File partagée avec les processus de calcul (MultiDaysController.process_days avec plusieurs processus), pour garder leurs messages.
+    """
     datetimenow = datetime.datetime.now().strftime("%Y-%m-%d %H %M %S")
+    # Dossier des logs et rapports, non versionné
+    os.makedirs("LOGS", exist_ok=True)
+    handlers = [
+        logging.FileHandler("LOGS/"+datetimenow+".log"),
+        logging.StreamHandler()
+    ]
+
+    if not queued:
+        logging.basicConfig(level=level, encoding='utf-8', format='[%(levelname)s]: %(message)s', handlers=handlers)
+        return "LOGS/"+datetimenow, None
+
+    formatter = logging.Formatter('[%(levelname)s]: %(message)s')
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # Les processus de calcul créés par fork héritent du QueueHandler : seule une file multiprocessing ramène leurs messages au thread d'écriture
+    log_queue = multiprocessing.Queue() if multiprocess else queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Le message est mis en forme (arguments %) avant d'entrer dans la file ; le niveau est ajouté par les handlers du listener
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    listener.start()
+    return "LOGS/"+datetimenow, listener
+
+
+def parse_args():
+    """Arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Calcul des classements des journées du Night and Day.")
+    parser.add_argument('--days', type=int, nargs='+', metavar='DAY_NUM',
+                        help="Ne traite que ces journées, activées ou non (par défaut : toutes les journées activées dans leur initialisation.json). "
+                             "Le classement cumulé ne compte alors que ces journées.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Nombre de processus pour traiter les journées en parallèle (1 par défaut : une journée après l'autre, 0 : un par journée). "
+                             "Chaque processus lit alors lui-même le fichier d'équipes, une fois pour les journées qu'il traite.")
+    parser.add_argument('--cache-dir', default='CACHE',
+                        help="Dossier du cache des fichiers d'entrée déjà lus ('CACHE' par défaut). Un fichier inchangé n'est pas relu.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Relit tous les fichiers d'entrée sans passer par le cache.")
+    parser.add_argument('--watch', type=int, metavar='DAY_NUM',
+                        help="Après le calcul, surveille le datas_graid.csv de la journée DAY_NUM et recalcule les équipes au fil des déchargements de doigts (Ctrl+C pour arrêter).")
+    parser.add_argument('--watch-interval', type=float, default=1.0,
+                        help="Temps entre deux lectures du fichier surveillé, en s (1 par défaut).")
+    parser.add_argument('--what-if', type=int, metavar='DAY_NUM',
+                        help="Renote la journée DAY_NUM avec chaque scénario de paramètres du fichier --scenarios, sans recalculer les temps.")
+    parser.add_argument('--scenarios', metavar='CSV_FILE',
+                        help="Fichier de scénarios du mode --what-if (colonnes scenario, nom, temps_ref, points_gain_min, points_perte_min, points).")
+    parser.add_argument('--what-if-output', metavar='CSV_FILE',
+                        help="Écrit le rang de chaque équipe (lignes) dans chaque scénario (colonnes) dans ce fichier.")
+    parser.add_argument('--impute-missing-bips', action='store_true',
+                        help="Estime l'heure des badgeuses non bipées à partir des temps moyens des équipes complètes au lieu d'arrêter la journée. "
+                             "Les heures estimées sont écrites dans un rapport à relire, à côté du fichier de logs.")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help="Niveau minimal des messages écrits (INFO par défaut). DEBUG détaille chaque équipe, mais ralentit nettement le calcul d'une journée complète.")
+    parser.add_argument('--queued-logs', action='store_true',
+                        help="Écrit les logs depuis un thread dédié, sans bloquer le calcul sur les écritures en console et dans le fichier.")
+    parser.add_argument('--instrument', action='store_true',
+                        help="Mesure le temps, le pic de mémoire et les lignes et équipes traitées par chaque lecture de fichier et chaque étape, "
+                             "et écrit le rapport en JSON à côté du fichier de logs. Ralentit le calcul.")
+    return parser.parse_args()
+
+
+
+
+def log_podium(title: str, standings: Standings, k: int = 3):
+    """Affiche les k premières équipes du classement au général et dans chaque catégorie."""
 
-    logging.basicConfig(
-        level=logging.DEBUG,
-        encoding='utf-8',
-        format='[%(levelname)s]: %(message)s',
-        handlers=[
-            logging.FileHandler("LOGS/"+datetimenow+".log"),
-            logging.StreamHandler()
-        ]
-    )
+    logging.info("="*50 + f"\nClassement {title}\n" + "-"*50)
+    for mixite, ent in sorted(standings.get_views(), key=lambda view: (view[0] or '', view[1] is not None, view[1] or False)):
+        category = ' / '.join(name for name in (mixite, {True: "entreprise", False: "non entreprise"}.get(ent)) if name) or "général"
+        podium = ", ".join(f"{rank}. [{team.dossard}] {team.team_name} ({team.total_points:.2f} pts)" for rank, team in standings.get_ranking(mixite, ent)[:k])
+        logging.info(f"{category} : {podium}")
 
 
+def log_what_if(day_num: int, rankings: dict[str, list[tuple[int, float]]], stability: RankStability, output_file: str|None = None, k: int = 3):
+    """Affiche le podium de chaque scénario et la stabilité des classements, et écrit les rangs de chaque scénario dans output_file."""
 
+    logging.info("="*50 + f"\nScénarios de la journée J{day_num}\n" + "-"*50)
+    for s, (scenario_name, ranking) in enumerate(rankings.items()):
+        podium = ", ".join(f"{rank}. [{dossard}] ({points:.2f} pts)" for rank, (dossard, points) in enumerate(ranking[:k], start=1))
+        logging.info(f"{scenario_name} : {podium} | Spearman {stability.spearman[s]:.4f}, {stability.changed_ranks[s]} rangs changés "
+                     f"(écart max {stability.max_displacement[s]}), top 10 conservé à {stability.top_k_overlap[s]}/10")
 
-def main():
+    if output_file is not None:
+        ranks = {scenario_name: {dossard: rank for rank, (dossard, _) in enumerate(ranking, start=1)} for scenario_name, ranking in rankings.items()}
+        pandas.DataFrame(ranks).rename_axis('dossard').sort_index().to_csv(output_file)
+        logging.info(f"Rangs de chaque scénario écrits dans {output_file}.")
+
+
+def write_imputation_report(day_results: list[DayResult], output_file: str):
+    """Écrit les heures de bip estimées de chaque journée (une ligne par poinçon) dans output_file, s'il y en a, et en affiche le décompte."""
+
+    rows = [{'journee': day_result.day_num, **asdict(imputed_bip)} for day_result in sorted(day_results, key=lambda day_result: day_result.day_num) for imputed_bip in day_result.imputed_bips]
+    if not rows:
+        logging.info("Aucune heure de bip estimée.")
+        return
+
+    report = pandas.DataFrame(rows)
+    report['heure'] = [seconds_to_hms(bip_time) if pandas.notna(bip_time) else '' for bip_time in report['bip_time']]
+    report.to_csv(output_file, index=False)
+    logging.warning(f"{len(rows)} heure(s) de bip estimée(s) pour {report[['journee', 'dossard']].drop_duplicates().shape[0]} équipe(s) : rapport à relire dans {output_file}.")
+
+
+def main(workers: int = 1, cache_directory: str|None = None, watch_day_num: int|None = None, watch_interval: float = 1.0,
+         what_if_day_num: int|None = None, scenarios_file: str|None = None, what_if_output: str|None = None, imputation_report: str|None = None,
+         day_nums: list[int]|None = None):
     
-    nightnday = MultiDaysController("DAYS")
-    nightnday.create_onedaycontrollers()
+    nightnday = MultiDaysController("DAYS", cache_directory, impute_missing_bips=imputation_report is not None)
+    day_results = nightnday.process_days(workers=workers or None, day_nums=day_nums)
+
+    if imputation_report is not None:
+        write_imputation_report(day_results, imputation_report)
+
+    for day_result in sorted(day_results, key=lambda day_result: day_result.day_num):
+        log_podium(f"de la journée J{day_result.day_num}", Standings(day_result.teams))
+    log_podium("cumulé", nightnday.cumulative.standings)
 
-    for day in nightnday.odc_list:
-        day.initialize()
-        day.calculate_times()
-        # day.calculate_scores()
+    if what_if_day_num is not None:
+        scenarios = ScenariosCollector(scenarios_file).create_scenarios()
+        rankings, stability = nightnday.what_if(what_if_day_num, scenarios)
+        log_what_if(what_if_day_num, rankings, stability, what_if_output)
+
+    if watch_day_num is not None:
+        nightnday.watch_day(watch_day_num, watch_interval)
 
 
 if __name__ == "__main__":
-    setup_logging()
-    main()
\ No newline at end of file
+    args = parse_args()
+    log_file_path, log_listener = setup_logging(getattr(logging, args.log_level), args.queued_logs, multiprocess=args.workers != 1)
+    if args.what_if is not None and args.scenarios is None:
+        raise SystemExit("--what-if nécessite un fichier --scenarios.")
+
+    if args.instrument:
+        instrumentation.enable()
+    try:
+        main(args.workers, None if args.no_cache else args.cache_dir, args.watch, args.watch_interval, args.what_if, args.scenarios, args.what_if_output,
+             log_file_path+".imputations.csv" if args.impute_missing_bips else None, args.days)
+    finally:
+        # Écrit aussi les mesures d'un calcul interrompu (erreur, Ctrl+C du mode --watch)
+        if args.instrument:
+            instrumentation.write_json(log_file_path+".instrumentation.json")
+            logging.info(f"Mesures écrites dans {log_file_path}.instrumentation.json.")
+        # Vide la file des logs avant de quitter
+        if log_listener is not None:
+            log_listener.stop()
@@ -0,0 +1,227 @@
+import numpy as np
+import pandas
+
+
+SECONDS_PER_DAY = 24*3600
+DOW_NUMBERS = {'Mo': 0, 'Tu': 1, 'We': 2, 'Th': 3, 'Fr': 4, 'Sa': 5, 'Su': 6}
+
+
+class BipsTable:
+    """
+    Table longue (une ligne par bip) des données de doigts, triée par SIID puis par numéro de Record.
+
+    Les bips d'un doigt occupent la tranche [offsets[i], offsets[i+1]) des colonnes, où i est la position du SIID dans siids.
+    get_bips() renvoie des vues numpy sur ces tranches : aucune copie n'est faite par équipe.
+
+    Attributes:
+        SIID (np.ndarray[int64]): SIID du doigt, pour chaque bip.
+        record_idx (np.ndarray[int32]): Numéro x de la colonne 'Record x' d'origine (0 pour le mass start).
+        CN (np.ndarray[int32]): Numéro de la badgeuse bipée.
+        seconds (np.ndarray[int32]): Heure du bip en secondes depuis minuit du jour de course. Un bip fait le lendemain (colonne 'Record x DOW')
+            vaut donc plus de 86400 s, ce qui garde les temps croissants pour une course qui passe minuit.
+
+        siids (np.ndarray[int64]): Les SIID distincts, triés.
+        offsets (np.ndarray[int64]): Début de la tranche de chaque SIID, de taille len(siids)+1.
+        nb_records_declared (np.ndarray[int64]): Valeur de 'No. of records' lue pour chaque SIID.
+        race_day (int|None): Jour de la semaine du jour de course (0 pour lundi, voir DOW_NUMBERS), à partir duquel seconds est compté. None si aucun jour lisible.
+    """
+
+    def __init__(self, SIID, record_idx, CN, seconds, siids, offsets, nb_records_declared, race_day: int|None = None):
+        self.SIID = SIID
+        self.record_idx = record_idx
+        self.CN = CN
+        self.seconds = seconds
+
+        self.siids = siids
+        self.offsets = offsets
+        self.nb_records_declared = nb_records_declared
+        self.race_day = race_day
+
+        self._siid_position: dict[int, int] = {int(siid): position for position, siid in enumerate(siids)}
+
+
+    def __len__(self):
+        return len(self.CN)
+
+
+    @classmethod
+    def from_datas_graid(cls, df: pandas.DataFrame, race_day: int|None = None) -> 'BipsTable':
+        """
+        Construit la table longue à partir du format large 'Record x CN / DOW / time' de datas_graid.csv, en une seule passe vectorisée.\n
+        race_day est le jour de course déjà connu (BipsTable.race_day de la lecture complète du fichier) : à passer pour des lignes ajoutées ensuite,
+        dont les jours seuls ne suffisent pas à le retrouver (des doigts déchargés après minuit n'ont que des bips du lendemain). Déduit des jours des bips sinon.
+        """
+
+        # Un doigt lu deux fois : seule la dernière lecture compte. Les lignes gardées, triées par SIID, sont sélectionnées dans chaque matrice
+        # plutôt que par des copies triées du DataFrame entier
+        all_siids = df['SIID'].to_numpy(dtype='int64')
+        kept = np.flatnonzero(~df['SIID'].duplicated(keep='last').to_numpy())
+        order = kept[np.argsort(all_siids[kept], kind='stable')]
+
+        nb_records = 0
+        while f'Record {nb_records+1} CN' in df.columns:
+            nb_records += 1
+
+        CN_matrix = df[[f'Record {x} CN' for x in range(1, nb_records+1)]].to_numpy(dtype='float64', na_value=np.nan)[order]
+        time_matrix = df[[f'Record {x} time' for x in range(1, nb_records+1)]].to_numpy(dtype=object)[order]
+        dow_matrix = df[[f'Record {x} DOW' for x in range(1, nb_records+1)]].to_numpy(dtype=object)[order]
+
+        # np.nonzero parcourt la matrice ligne par ligne : les bips sont déjà triés par SIID puis par Record
+        is_bipped = ~np.isnan(CN_matrix)
+        rows, columns = np.nonzero(is_bipped)
+
+        # Heures ramenées au jour de course : seconds = jours écoulés * 86400 + heure du bip
+        dow_numbers = parse_dow_to_numbers(dow_matrix[rows, columns])
+        if race_day is None:
+            race_day = find_race_day(dow_numbers)
+        days = dow_numbers_to_days(dow_numbers, race_day)
+        seconds = days*SECONDS_PER_DAY + parse_hms_to_seconds(time_matrix[rows, columns])
+
+        siids = all_siids[order]
+        offsets = np.zeros(len(siids)+1, dtype='int64')
+        np.cumsum(is_bipped.sum(axis=1), out=offsets[1:])
+
+        return cls(
+            SIID=siids[rows],
+            record_idx=(columns+1).astype('int32'),
+            CN=CN_matrix[rows, columns].astype('int32'),
+            seconds=seconds.astype('int32'),
+            siids=siids,
+            offsets=offsets,
+            nb_records_declared=df['No. of records'].to_numpy(dtype='int64')[order],
+            race_day=race_day
+        )
+
+
+    def get_bips(self, siid: int) -> tuple[np.ndarray, np.ndarray]|None:
+        """Renvoie les vues (CN, seconds) des bips du doigt siid, None si le doigt n'a pas été lu."""
+
+        position = self._siid_position.get(siid)
+        if position is None:
+            return None
+        start, end = self.offsets[position], self.offsets[position+1]
+        return self.CN[start:end], self.seconds[start:end]
+
+
+    def get_nb_records_declared(self, siid: int) -> int|None:
+        """Renvoie la valeur 'No. of records' du doigt siid, None si le doigt n'a pas été lu."""
+
+        position = self._siid_position.get(siid)
+        if position is None:
+            return None
+        return int(self.nb_records_declared[position])
+
+
+    def merge(self, newer: 'BipsTable') -> 'BipsTable':
+        """Renvoie une nouvelle table avec les bips des deux tables. Pour un SIID présent dans les deux, seuls les bips de newer sont gardés (dernière lecture du doigt)."""
+
+        kept_rows = ~np.isin(self.SIID, newer.siids)
+        kept_siids = ~np.isin(self.siids, newer.siids)
+
+        SIID = np.concatenate([self.SIID[kept_rows], newer.SIID])
+        siids = np.concatenate([self.siids[kept_siids], newer.siids])
+        nb_records_declared = np.concatenate([self.nb_records_declared[kept_siids], newer.nb_records_declared])
+
+        # Tri stable par SIID : l'ordre des bips de chaque doigt est conservé
+        rows_order = np.argsort(SIID, kind='stable')
+        siids_order = np.argsort(siids, kind='stable')
+        siids = siids[siids_order]
+
+        offsets = np.zeros(len(siids)+1, dtype='int64')
+        offsets[1:] = np.searchsorted(SIID[rows_order], siids, side='right')
+
+        return BipsTable(
+            SIID=SIID[rows_order],
+            record_idx=np.concatenate([self.record_idx[kept_rows], newer.record_idx])[rows_order],
+            CN=np.concatenate([self.CN[kept_rows], newer.CN])[rows_order],
+            seconds=np.concatenate([self.seconds[kept_rows], newer.seconds])[rows_order],
+            siids=siids,
+            offsets=offsets,
+            nb_records_declared=nb_records_declared[siids_order],
+            race_day=self.race_day if self.race_day is not None else newer.race_day
+        )
+
+
+    def with_mass_start(self, mass_start_seconds: int) -> 'BipsTable':
+        """Renvoie une nouvelle table où un bip de la badgeuse -1 (Record 0) à l'heure du mass start est inséré en tête de chaque doigt."""
+
+        starts = self.offsets[:-1]
+        nb_siids = len(self.siids)
+
+        return BipsTable(
+            SIID=np.insert(self.SIID, starts, self.siids),
+            record_idx=np.insert(self.record_idx, starts, 0),
+            CN=np.insert(self.CN, starts, -1),
+            seconds=np.insert(self.seconds, starts, mass_start_seconds),
+            siids=self.siids,
+            offsets=self.offsets + np.arange(nb_siids+1, dtype='int64'),
+            nb_records_declared=self.nb_records_declared,
+            race_day=self.race_day
+        )
+
+
+
+def parse_hms_to_seconds(times) -> np.ndarray:
+    """Convertit un tableau de chaînes 'hh:mm:ss' en secondes depuis minuit (int32), de façon vectorisée."""
+
+    if len(times) == 0:
+        return np.zeros(0, dtype='int32')
+
+    times = np.asarray(times, dtype=str)
+    # Cas courant, tout au format 'hh:mm:ss' : lecture directe des codes des caractères, sans passer par des objets Python
+    if (np.char.str_len(times) == 8).all():
+        digits = times.astype('U8', copy=False).view('int32').reshape(-1, 8) - ord('0')
+        hms_digits = digits[:, [0, 1, 3, 4, 6, 7]]
+        # Sinon (espace, lettre...), lecture par pandas, qui lève une erreur sur une valeur illisible au lieu de renvoyer une heure fausse
+        if (digits[:, 2] == ord(':')-ord('0')).all() and (digits[:, 5] == ord(':')-ord('0')).all() and ((hms_digits >= 0) & (hms_digits <= 9)).all():
+            return ((hms_digits[:, 0]*10 + hms_digits[:, 1])*3600 + (hms_digits[:, 2]*10 + hms_digits[:, 3])*60 + hms_digits[:, 4]*10 + hms_digits[:, 5]).astype('int32')
+
+    hms = pandas.Series(times, dtype=str).str.split(':', expand=True).astype('int32').to_numpy()
+    return hms[:, 0]*3600 + hms[:, 1]*60 + hms[:, 2]
+
+
+def parse_dow_to_numbers(dows) -> np.ndarray:
+    """Convertit un tableau de jours de la semaine ('Mo', 'Tu', ..., 'Su') en numéros de jour (voir DOW_NUMBERS, int64). -1 pour un jour illisible."""
+
+    if len(dows) == 0:
+        return np.zeros(0, dtype='int64')
+
+    # Factorisation par hachage des chaînes telles quelles, sans copie en tableau de chaînes numpy (une case vide reste un jour illisible)
+    inverse, uniques = pandas.factorize(np.asarray(dows, dtype=object).reshape(-1), use_na_sentinel=False)
+    unique_numbers = np.array([DOW_NUMBERS.get(str(dow).strip()[:2].capitalize(), -1) for dow in uniques], dtype='int64')
+    return unique_numbers[inverse]
+
+
+def find_race_day(dow_numbers: np.ndarray) -> int|None:
+    """
+    Renvoie le jour de course parmi des numéros de jour (voir parse_dow_to_numbers), None s'il n'y a aucun jour lisible.
+
+    Le jour de course est celui qui suit le plus grand écart entre les jours présents dans la semaine :
+    pour des bips le samedi et le dimanche, c'est le samedi, y compris pour une course qui passe de dimanche à lundi.
+    """
+
+    present = sorted(set(np.unique(dow_numbers).tolist()) - {-1})
+    if not present:
+        return None
+
+    # Jour suivant le plus grand trou dans le cycle de la semaine
+    gaps = [((present[(i+1) % len(present)] - present[i]) % 7 or 7, present[(i+1) % len(present)]) for i in range(len(present))]
+    return max(gaps)[1]
+
+
+def dow_numbers_to_days(dow_numbers: np.ndarray, race_day: int|None) -> np.ndarray:
+    """Renvoie le nombre de jours écoulés depuis race_day pour chaque numéro de jour (int32). Un jour illisible, ou race_day à None, compte pour le jour de course."""
+
+    if race_day is None:
+        return np.zeros(len(dow_numbers), dtype='int32')
+    days = (dow_numbers - race_day) % 7
+    days[dow_numbers == -1] = 0
+    return days.astype('int32')
+
+
+def seconds_to_hms(seconds: int) -> str:
+    """Convertit un nombre de secondes depuis minuit du jour de course en chaîne 'hh:mm:ss' (suffixée de '+j' les jours suivants), pour l'affichage."""
+
+    days, seconds = divmod(int(seconds), SECONDS_PER_DAY)
+    hms = f"{seconds//3600:02d}:{seconds%3600//60:02d}:{seconds%60:02d}"
+    return hms if days == 0 else f"{hms}+{days}"
@@ -0,0 +1,105 @@
+import logging
+
+from models.results import DayResult, TeamDayResult, TeamEventResult
+from models.standings import Standings
+
+
+class CumulativeStandings:
+    """
+    Classement cumulé sur toutes les journées de l'événement.
+
+    Garde la contribution de chaque journée (ses TeamDayResult) et, pour chaque équipe, la somme de ses journées.
+    Recalculer une journée remplace uniquement sa contribution : seuls les cumuls des équipes de cette journée (ancienne ou nouvelle version)
+    sont refaits, en sommant leurs résultats journée par journée, et mis à jour dans le classement.
+
+    Les équipes sont rapprochées d'une journée à l'autre par leur seul dossard : une puce peut être réattribuée à une autre équipe
+    d'une journée à l'autre, la rapprocher par puce fusionnerait deux équipes. Une puce vue sous deux dossards, ou un dossard dont
+    le nom d'équipe change, est signalé pour relecture, sans fusionner les équipes.
+
+    Attributes:
+        days (dict[int, dict[int, TeamDayResult]]): Pour chaque journée, les résultats de chaque équipe, par dossard de l'événement.
+        teams (dict[int, TeamEventResult]): Les cumuls de chaque équipe, par dossard.
+        standings (Standings): Le classement cumulé, avec les mêmes vues que celui d'une journée.
+    """
+
+    def __init__(self, day_results: list[DayResult]|None = None):
+        self.days: dict[int, dict[int, TeamDayResult]] = {}
+        self.teams: dict[int, TeamEventResult] = {}
+        self.standings = Standings()
+        self._dossard_by_puce: dict[int, int] = {}
+        self._team_name_by_dossard: dict[int, str] = {}
+        self._reported_conflicts: set[tuple] = set()     # Pour ne signaler chaque conflit qu'une fois, même si la journée est recalculée
+
+        for day_result in day_results or []:
+            self.set_day(day_result)
+
+
+    def set_day(self, day_result: DayResult):
+        """Ajoute les résultats d'une journée, ou remplace ceux déjà présents pour cette journée."""
+
+        old_day = self.days.get(day_result.day_num, {})
+        new_day: dict[int, TeamDayResult] = {}
+        for team_result in day_result.teams:
+            self._check_identity(team_result)
+            new_day[team_result.dossard] = team_result
+        self.days[day_result.day_num] = new_day
+
+        for dossard in old_day.keys() | new_day.keys():
+            self._recalculate_team(dossard)
+
+        logging.info(f"Classement cumulé mis à jour avec J{day_result.day_num} ({len(new_day)} équipes).")
+
+
+    def remove_day(self, day_num: int):
+        """Retire la contribution d'une journée."""
+
+        old_day = self.days.pop(day_num)
+        for dossard in old_day:
+            self._recalculate_team(dossard)
+
+
+    def _check_identity(self, team_result: TeamDayResult):
+        """Signale une puce déjà vue sous un autre dossard, ou un dossard déjà vu sous un autre nom d'équipe. Les équipes restent cumulées par dossard."""
+
+        dossard = self._dossard_by_puce.setdefault(team_result.puce, team_result.dossard)
+        if dossard != team_result.dossard and ('puce', team_result.puce, team_result.dossard) not in self._reported_conflicts:
+            self._reported_conflicts.add(('puce', team_result.puce, team_result.dossard))
+            logging.warning("[%s] %s porte la puce %s, déjà vue pour l'équipe [%s] : équipes cumulées séparément, à vérifier.",
+                            team_result.dossard, team_result.team_name, team_result.puce, dossard)
+
+        team_name = self._team_name_by_dossard.setdefault(team_result.dossard, team_result.team_name)
+        if team_name != team_result.team_name and ('nom', team_result.dossard, team_result.team_name) not in self._reported_conflicts:
+            self._reported_conflicts.add(('nom', team_result.dossard, team_result.team_name))
+            logging.warning("[%s] %s était nommée %s sur une autre journée : résultats cumulés sous le même dossard, à vérifier.",
+                            team_result.dossard, team_result.team_name, team_name)
+
+
+    def _recalculate_team(self, dossard: int):
+        """Refait le cumul d'une équipe à partir de ses résultats de chaque journée."""
+
+        team_days = [(day_num, day[dossard]) for day_num, day in sorted(self.days.items()) if dossard in day]
+        if not team_days:
+            self.teams.pop(dossard, None)
+            if dossard in self.standings.entries_by_dossard:
+                self.standings.remove(dossard)
+            return
+
+        # Identité de l'équipe lue sur sa dernière journée
+        last = team_days[-1][1]
+        team_event_result = TeamEventResult(
+            dossard=dossard,
+            puce=last.puce,
+            team_name=last.team_name,
+            mixite=last.mixite,
+            ent=last.ent,
+            courses_total_time=sum(result.courses_total_time for _, result in team_days),
+            courses_points=sum(result.courses_points for _, result in team_days),
+            mg_time=sum(result.mg_time for _, result in team_days),
+            mg_points=sum(result.mg_points for _, result in team_days),
+            actis_points=sum(result.actis_points for _, result in team_days),
+            total_points=sum(result.total_points for _, result in team_days),
+            days=[day_num for day_num, _ in team_days],
+            imputed_bips=sum(result.imputed_bips for _, result in team_days)
+        )
+        self.teams[dossard] = team_event_result
+        self.standings.update(team_event_result)
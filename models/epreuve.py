@@ -1,5 +1,5 @@
 from typing import List
-import numpy as np
+import logging
 
 from .poincon import Poincon
 
@@ -19,7 +19,8 @@ Découpement des Epreuves :
 
 
 class Epreuve:
-    def __init__(self, _name, _participation_points, _reference_time, _gain_per_minute, _loss_per_minute, _type, _or_argent_bronze):
+    def __init__(self, _epreuve_id, _name, _participation_points, _reference_time, _gain_per_minute, _loss_per_minute, _type, _or_argent_bronze):
+        self.epreuve_id: int = _epreuve_id    # Identifiant attribué par PolisParcoursCollector, unique dans la journée
         self.name = _name
         self.participation_points = _participation_points
         self.reference_time = _reference_time
@@ -29,15 +30,17 @@ class Epreuve:
         self.or_argent_bronze = _or_argent_bronze
         self.badgeuses_list: List[Poincon] = []    # Est rempli par la methode add_badgeuses_to_epreuves de PolisBadgeusesCollector
         self.badgeuses_sequence = []    # Est rempli par la methode create_badgeuses_sequences de PolisBadgeusesCollector
-        self.mean_times_between_poincons = {}
 
 
     def __eq__(self, other):
-        """Permet de comparer les attributs de deux objets"""
+        """Deux épreuves sont identiques si elles sont de même type et ont le même identifiant. En O(1), quel que soit le nombre de temps déjà stockés."""
         if type(self) == type(other):
-            return vars(self) == vars(other)
+            return self.epreuve_id == other.epreuve_id
         return False
 
+    def __hash__(self):
+        return hash(self.epreuve_id)
+
     def __repr__(self):
         # return f'{type(self).__name__}({self.name}, p_points: {self.participation_points}, ref_time: {self.reference_time}, gain/min: {self.gain_per_minute}, {self.type}, {self.or_argent_bronze})'
         return f'{type(self).__name__}({self.name})'
@@ -60,16 +63,17 @@ class EpreuveCourse(Epreuve):
         is_co (bool): True si l'épreuve est une 'CO', False sinon.
     """
 
-    def __init__(self, name, participation_points, reference_time, gain_per_minute, loss_per_minute, type):
-        super().__init__(_name=name, _participation_points=participation_points, _reference_time=reference_time, _gain_per_minute=gain_per_minute, _loss_per_minute=loss_per_minute, _type=type, _or_argent_bronze={"or":0, "argent":0, "bronze":0})
+    def __init__(self, epreuve_id, name, participation_points, reference_time, gain_per_minute, loss_per_minute, type):
+        super().__init__(_epreuve_id=epreuve_id, _name=name, _participation_points=participation_points, _reference_time=reference_time, _gain_per_minute=gain_per_minute, _loss_per_minute=loss_per_minute, _type=type, _or_argent_bronze={"or":0, "argent":0, "bronze":0})
         self.meilleur_grimpeur = None
         self.is_obli = 'Obli' in name
         self.is_co = 'CO' in name
 
-        self.times_between_poincons = []
-
     def __eq__(self, other):
         return super().__eq__(other)
+
+    def __hash__(self):
+        return super().__hash__()
     
     def __repr__(self):
         return super().__repr__()
@@ -111,22 +115,6 @@ class EpreuveCourse(Epreuve):
             self.badgeuses_list.pop(i)
         
 
-    def average_elementary_times(self):
-        
-        self.mean_times_between_poincons = {elementary_time[1].signaleur+'-'+elementary_time[2].signaleur: [] for elementary_time in self.times_between_poincons}
-
-        for elementary_time in self.times_between_poincons:
-            time, poincon_1, poincon_2 = elementary_time
-            key = poincon_1.signaleur+'-'+poincon_2.signaleur
-            self.mean_times_between_poincons[key].append(time)
-        
-        for key, value in self.mean_times_between_poincons.items():
-            self.mean_times_between_poincons[key] = np.average(value)
-
-
-
-
-
     def check_potential_typo_errors(self):
 
         # Une course n'a pas de temps de ref
@@ -135,7 +123,7 @@ class EpreuveCourse(Epreuve):
 
         # Une Obli a des points de participation non nuls
         if self.is_obli and self.participation_points !=0:
-            print(f"{self.name} a des points de participation non nuls !")
+            logging.warning("%s a des points de participation non nuls !", self.name)
         
         # Une Obli a des points de gain par minute négatifs ou nuls
             
@@ -144,12 +132,15 @@ class EpreuveCourse(Epreuve):
 
 class EpreuveActi(Epreuve):
     
-    def __init__(self, name, participation_points, or_argent_bronze):
-        super().__init__(_name=name, _participation_points=participation_points, _reference_time=0, _gain_per_minute=0, _loss_per_minute=0, _type='ACTI', _or_argent_bronze=or_argent_bronze)
+    def __init__(self, epreuve_id, name, participation_points, or_argent_bronze):
+        super().__init__(_epreuve_id=epreuve_id, _name=name, _participation_points=participation_points, _reference_time=0, _gain_per_minute=0, _loss_per_minute=0, _type='ACTI', _or_argent_bronze=or_argent_bronze)
 
 
     def __eq__(self, other):
         return super().__eq__(other)
+
+    def __hash__(self):
+        return super().__hash__()
     
     def __repr__(self):
         return super().__repr__()
\ No newline at end of file
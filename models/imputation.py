@@ -0,0 +1,105 @@
+import logging
+import numpy as np
+
+from models.results import CourseResult, ImputedBip
+from models.team import Team
+from models.segment_statistics import SegmentStatisticsAccumulator
+
+
+class MissingBipsImputer:
+    """
+    Complète les poinçons non bipés d'une course à partir du temps moyen de chaque segment sur les autres équipes (SegmentStatisticsAccumulator).
+
+    Les poinçons manquants sont regroupés en trous entre deux poinçons bipés :
+    - SEGMENT_MEANS : entre deux poinçons bipés, le temps réel de l'équipe entre eux est réparti au prorata des temps moyens des segments du trou ;
+      avant le premier ou après le dernier poinçon bipé, les temps moyens sont ajoutés (ou retranchés) à l'heure du poinçon bipé le plus proche.
+    - LINEAR : entre deux poinçons bipés, sans temps moyens (un segment de la course n'a aucun temps), le temps est réparti également entre les segments.
+    - ANCHOR : avant le premier ou après le dernier poinçon bipé, sans temps moyens, le poinçon reprend l'heure du poinçon bipé le plus proche.
+    - COURSE_DROPPED : la course n'a aucun bip de l'équipe en dehors du mass start ; elle est retirée des courses courues plutôt qu'inventée.
+
+    Les poinçons estimés sont marqués dans CourseResult.imputed et ne rapportent pas de points de bip.
+    """
+
+    SEGMENT_MEANS = 'segment_means'
+    LINEAR = 'linear'
+    ANCHOR = 'anchor'
+    COURSE_DROPPED = 'course_dropped'
+
+    def __init__(self, statistics: SegmentStatisticsAccumulator):
+        self.statistics = statistics
+
+
+    def impute_team(self, team: Team) -> list[ImputedBip]:
+        """Complète chaque course incomplète de l'équipe et renvoie les heures estimées. Les courses sans aucun bip sont retirées de runned_epreuve_courses_list."""
+
+        imputed_bips: list[ImputedBip] = []
+        for course_result in list(team.runned_epreuve_courses_list):
+            epreuve = course_result.epreuve_course
+            if len(course_result.poincons) == len(epreuve.badgeuses_list):
+                continue
+
+            if all(poincon.badgeuse == -1 for poincon in course_result.poincons):
+                team.runned_epreuve_courses_list.remove(course_result)
+                imputed_bips.extend(ImputedBip(team.dossard, team.team_name, epreuve.name, poincon.signaleur, poincon.badgeuse, None, self.COURSE_DROPPED, self.statistics.get_nb_teams(epreuve))
+                                    for poincon in epreuve.badgeuses_list if poincon not in course_result.poincons)
+                logging.warning("[%s] %s n'a aucun bip sur %s : la course est retirée de ses courses courues.", team.dossard, team.team_name, epreuve.name)
+                continue
+
+            nb_reference_teams = self.statistics.get_nb_teams(epreuve)
+            for position, bip_time, method in self.impute_course(course_result):
+                poincon = epreuve.badgeuses_list[position]
+                imputed_bips.append(ImputedBip(team.dossard, team.team_name, epreuve.name, poincon.signaleur, poincon.badgeuse, bip_time, method, nb_reference_teams))
+                logging.warning("[%s] %s : bip de %s (badgeuse %s) sur %s estimé (%s).", team.dossard, team.team_name, poincon.signaleur, poincon.badgeuse, epreuve.name, method)
+
+        return imputed_bips
+
+
+    def impute_course(self, course_result: CourseResult) -> list[tuple[int, int, str]]:
+        """
+        Remplace les poinçons et heures de bip de course_result par le parcours complet, avec les heures manquantes estimées.\n
+        Renvoie les triplets (position dans badgeuses_list, heure estimée, méthode) des poinçons estimés.
+        """
+
+        epreuve = course_result.epreuve_course
+        nb_poincons = len(epreuve.badgeuses_list)
+        positions = {poincon: position for position, poincon in enumerate(epreuve.badgeuses_list)}
+
+        bip_times = np.full(nb_poincons, np.nan)
+        bip_times[[positions[poincon] for poincon in course_result.poincons]] = course_result.bip_times
+        known = ~np.isnan(bip_times)
+        known_positions = np.flatnonzero(known)
+
+        mean_times = self.statistics.get_mean_times(epreuve)
+        # Heure de passage « moyenne » à chaque poinçon, depuis le départ
+        cumulative_means = np.concatenate(([0.0], np.cumsum(mean_times))) if mean_times is not None else None
+
+        # Pour toutes les positions manquantes à la fois : poinçons bipés qui les encadrent (-1 s'il n'y en a pas)
+        missing_positions = np.flatnonzero(~known)
+        following_idx = np.searchsorted(known_positions, missing_positions)
+        before = np.where(following_idx > 0, known_positions[np.maximum(following_idx - 1, 0)], -1)
+        after = np.where(following_idx < known_positions.size, known_positions[np.minimum(following_idx, known_positions.size - 1)], -1)
+        between = (before >= 0) & (after >= 0)
+        # Hors d'un trou, poinçon bipé le plus proche
+        anchor = np.where(before >= 0, before, after)
+
+        # Entre deux poinçons bipés, part du trou au prorata des positions, ou des temps moyens s'ils sont connus
+        share = (missing_positions - before) / np.where(between, after - before, 1)
+        if cumulative_means is not None:
+            means_span = cumulative_means[after] - cumulative_means[before]
+            use_means = between & (means_span > 0)
+            share = np.where(use_means, (cumulative_means[missing_positions] - cumulative_means[before]) / np.where(use_means, means_span, 1), share)
+            extrapolated = bip_times[anchor] + cumulative_means[missing_positions] - cumulative_means[anchor]
+            methods = np.where(between & ~use_means, self.LINEAR, self.SEGMENT_MEANS)
+        else:
+            extrapolated = bip_times[anchor]
+            methods = np.where(between, self.LINEAR, self.ANCHOR)
+        interpolated = bip_times[before] + share*(bip_times[after] - bip_times[before])
+        estimated_times = np.round(np.where(between, interpolated, extrapolated))
+
+        bip_times[missing_positions] = estimated_times
+        imputed = list(zip(missing_positions.tolist(), estimated_times.astype(int).tolist(), methods.tolist()))
+
+        course_result.poincons = list(epreuve.badgeuses_list)
+        course_result.bip_times = bip_times.astype('int32')
+        course_result.imputed = ~known
+        return imputed
@@ -1,6 +1,9 @@
 class Poincon:
 
-    def __init__(self, epreuve, signaleur: str, badgeuse: int, role: str, bonus_points: float):
+    __slots__ = ('poincon_id', 'epreuve', 'signaleur', 'badgeuse', 'role', 'bonus_points', 'is_debut_mg', 'is_fin_mg')
+
+    def __init__(self, poincon_id: int, epreuve, signaleur: str, badgeuse: int, role: str, bonus_points: float):
+        self.poincon_id = poincon_id    # Identifiant attribué par PolisBadgeusesCollector (ligne du fichier de badgeuses), unique dans la journée
         self.epreuve = epreuve
         self.signaleur = signaleur
         self.badgeuse = badgeuse
@@ -11,11 +14,14 @@ class Poincon:
         self.is_fin_mg = False
     
     def __eq__(self, other):
-        """Compare deux objets Poincon, qui sont considérés comme identiques si ils ont même signaleur. 1 signaleur = 1 poinçonnage."""
+        """Compare deux objets Poincon, qui sont considérés comme identiques s'ils ont le même identifiant."""
 
         if isinstance(self, other.__class__):
-            return self.signaleur == other.signaleur
+            return self.poincon_id == other.poincon_id
         return False
+
+    def __hash__(self):
+        return hash(self.poincon_id)
     
     def __repr__(self):
         if self.is_debut_mg:
@@ -0,0 +1,82 @@
+from models.team import Team
+from models.epreuve import EpreuveCourse, EpreuveActi
+
+
+class Registry:
+    """
+    Référentiel des équipes et des épreuves d'une journée.
+
+    Garde les listes d'équipes et d'épreuves ainsi que des dictionnaires d'index (par dossard, par puce et par nom d'épreuve)
+    pour que les recherches faites à chaque ligne des fichiers d'entrée soient en O(1) plutôt qu'un parcours de liste.
+
+    Attributes:
+        teams_list (list[Team]): La liste des équipes. Toute suppression doit passer par remove_teams() pour garder les index à jour.
+        epreuves_list (list[EpreuveCourse|EpreuveActi]): La liste des épreuves.
+    """
+
+    def __init__(self, teams_list: list[Team], epreuves_list: list[EpreuveCourse|EpreuveActi]):
+        self.set_teams(teams_list)
+        self.set_epreuves(epreuves_list)
+
+
+    def set_teams(self, teams_list: list[Team]):
+        """Remplace la liste des équipes et reconstruit leurs index, sans toucher aux épreuves."""
+
+        self.teams_list = teams_list
+
+        # En cas de doublon, on garde le premier élément de la liste, comme le faisait le parcours de liste
+        self.teams_by_dossard: dict[int, Team] = {}
+        self.teams_by_puce: dict[int, Team] = {}
+        for team in teams_list:
+            self.teams_by_dossard.setdefault(team.dossard, team)
+            self.teams_by_puce.setdefault(team.puce, team)
+
+
+    def set_epreuves(self, epreuves_list: list[EpreuveCourse|EpreuveActi]):
+        """Remplace la liste des épreuves et reconstruit leur index, sans toucher aux équipes."""
+
+        self.epreuves_list = epreuves_list
+
+        self.epreuves_by_name: dict[str, EpreuveCourse|EpreuveActi] = {}
+        for epreuve in epreuves_list:
+            self.epreuves_by_name.setdefault(epreuve.name, epreuve)
+
+
+    def find_team_from_dossard(self, dossard: int) -> Team|None:
+        """Retourne l'équipe de dossard donné, None si elle n'existe pas."""
+        return self.teams_by_dossard.get(dossard)
+
+
+    def find_team_from_puce(self, puce: int) -> Team|None:
+        """Retourne l'équipe dont la puce (SIID du doigt) est donnée, None si elle n'existe pas."""
+        return self.teams_by_puce.get(puce)
+
+
+    def find_epreuve(self, epreuve_name: str) -> EpreuveCourse|EpreuveActi|None:
+        """Retourne l'épreuve de nom donné, None si elle n'existe pas."""
+        return self.epreuves_by_name.get(epreuve_name)
+
+
+    def add_team(self, team: Team):
+        """Ajoute une équipe à teams_list et aux index."""
+
+        self.teams_list.append(team)
+        self.teams_by_dossard.setdefault(team.dossard, team)
+        self.teams_by_puce.setdefault(team.puce, team)
+
+
+    def remove_teams(self, teams_to_remove: list[Team]):
+        """Retire des équipes de teams_list et des index."""
+
+        if not teams_to_remove:
+            return
+
+        ids_to_remove = {id(team) for team in teams_to_remove}
+        # Modification en place : teams_list peut être référencée ailleurs (OneDayController.teams_list)
+        self.teams_list[:] = [team for team in self.teams_list if id(team) not in ids_to_remove]
+
+        for team in teams_to_remove:
+            if self.teams_by_dossard.get(team.dossard) is team:
+                del self.teams_by_dossard[team.dossard]
+            if self.teams_by_puce.get(team.puce) is team:
+                del self.teams_by_puce[team.puce]
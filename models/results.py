@@ -0,0 +1,151 @@
+from dataclasses import dataclass, field
+import numpy as np
+
+from models.epreuve import EpreuveCourse, EpreuveActi
+from models.poincon import Poincon
+
+
+def _empty_int_array() -> np.ndarray:
+    return np.zeros(0, dtype='int32')
+
+
+@dataclass(slots=True)
+class Segment:
+    """Portion de course entre deux poinçons consécutifs, avec le temps mis par l'équipe (en s)."""
+
+    elementary_time: int
+    poincon_1: Poincon
+    poincon_2: Poincon
+
+
+@dataclass(slots=True, eq=False)
+class CourseResult:
+    """
+    Résultat d'une équipe sur une course. Les champs sont remplis au fur et à mesure du calcul :
+    poinçons et heures de bip (aggregate_transit_times_by_epreuves), segments et temps (calculate_course_result_times), puis points (store_courses_points).
+
+    Attributes:
+        epreuve_course (EpreuveCourse): La course.
+        poincons (list[Poincon]): Les poinçons bipés, dans l'ordre du parcours.
+        bip_times (np.ndarray[int32]): L'heure de bip de chaque poinçon, en secondes depuis minuit du jour de course.
+        imputed (np.ndarray[bool]): Pour chaque poinçon, True si son heure a été estimée faute de bip (voir MissingBipsImputer). Vide si aucune heure n'a été estimée.
+        segment_starts (np.ndarray[int32]): Indice dans poincons du premier poinçon de chaque segment (le second est le suivant).
+        elementary_times (np.ndarray[int32]): Le temps mis sur chaque segment, en s.
+        total_time (int): Temps total sur la course, en s.
+        mg_time (int|None): Temps sur la portion meilleur grimpeur, en s. None si la course n'en a pas.
+        points_mg, points_bip, points_participation, points_rapidite (float): Les différents types de points.
+        total_points (float): Points totaux sur la course.
+    """
+
+    epreuve_course: EpreuveCourse
+    poincons: list[Poincon] = field(default_factory=list)
+    bip_times: np.ndarray = field(default_factory=_empty_int_array)
+    imputed: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
+    segment_starts: np.ndarray = field(default_factory=_empty_int_array)
+    elementary_times: np.ndarray = field(default_factory=_empty_int_array)
+    total_time: int = 0
+    mg_time: int|None = None
+    points_mg: float = 0.0
+    points_bip: float = 0.0
+    points_participation: float = 0.0
+    points_rapidite: float = 0.0
+    total_points: float = 0.0
+
+
+    def set_poincons_times(self, poincons_times: list[tuple[Poincon, int]]):
+        """Renseigne les poinçons bipés et leurs heures de bip à partir de couples (poinçon, heure)."""
+        self.poincons = [poincon for poincon, _ in poincons_times]
+        self.bip_times = np.fromiter((bip_time for _, bip_time in poincons_times), dtype='int32', count=len(poincons_times))
+        self.imputed = np.zeros(0, dtype=bool)
+
+
+    def get_bip_points(self) -> float:
+        """Renvoie les points bonus des poinçons bipés. Un poinçon dont l'heure a été estimée ne rapporte pas de points."""
+        if not self.imputed.any():
+            return sum([poincon.bonus_points for poincon in self.poincons])
+        return sum([poincon.bonus_points for poincon, imputed in zip(self.poincons, self.imputed.tolist()) if not imputed])
+
+
+    def get_segments(self) -> list[Segment]:
+        """Renvoie les segments de la course, construits à la demande à partir des tableaux segment_starts et elementary_times."""
+        return [Segment(elementary_time, self.poincons[start], self.poincons[start+1]) for start, elementary_time in zip(self.segment_starts.tolist(), self.elementary_times.tolist())]
+
+
+@dataclass(slots=True)
+class ActiResult:
+    """Résultat d'une équipe sur une acti."""
+
+    epreuve_acti: EpreuveActi
+    medal: str
+    participation_points: float
+    ranking_points: float
+
+
+@dataclass(slots=True)
+class TeamDayResult:
+    """Résultats d'une équipe sur une journée, sans référence aux objets de la journée (picklable, pour être renvoyé par un processus de calcul)."""
+
+    dossard: int
+    puce: int
+    team_name: str
+    mixite: str
+    ent: bool
+    courses_total_time: float
+    courses_points: float
+    mg_time: float
+    mg_points: float
+    actis_points: float
+    total_points: float
+    imputed_bips: int = 0   # Nombre de poinçons dont l'heure a été estimée (ou de la course retirée) faute de bip, à faire relire
+
+
+@dataclass(slots=True)
+class TeamEventResult:
+    """Résultats cumulés d'une équipe sur toutes les journées courues (voir CumulativeStandings)."""
+
+    dossard: int
+    puce: int
+    team_name: str
+    mixite: str
+    ent: bool
+    courses_total_time: float
+    courses_points: float
+    mg_time: float
+    mg_points: float
+    actis_points: float
+    total_points: float
+    days: list[int] = field(default_factory=list)   # Numéros des journées courues
+    imputed_bips: int = 0   # Nombre de poinçons estimés sur toutes les journées
+
+
+@dataclass(slots=True)
+class ImputedBip:
+    """
+    Heure de bip estimée pour un poinçon qu'une équipe n'a pas bipé, à faire relire (voir MissingBipsImputer).
+
+    Attributes:
+        dossard (int), team_name (str): L'équipe.
+        epreuve_name (str): La course.
+        signaleur (str), badgeuse (int): Le poinçon manquant.
+        bip_time (int|None): Heure estimée, en secondes depuis minuit. None si la course a été retirée (method COURSE_DROPPED).
+        method (str): Méthode d'estimation (voir MissingBipsImputer).
+        nb_reference_teams (int): Nombre de temps du segment le moins renseigné de la course, parmi ceux qui ont servi à l'estimation (voir SegmentStatisticsAccumulator.get_nb_teams).
+    """
+
+    dossard: int
+    team_name: str
+    epreuve_name: str
+    signaleur: str
+    badgeuse: int
+    bip_time: int|None
+    method: str
+    nb_reference_teams: int
+
+
+@dataclass(slots=True)
+class DayResult:
+    """Résultats de toutes les équipes sur une journée."""
+
+    day_num: int
+    teams: list[TeamDayResult] = field(default_factory=list)
+    imputed_bips: list[ImputedBip] = field(default_factory=list)    # Heures de bip estimées, à faire relire (mode d'estimation des bips manquants)
@@ -0,0 +1,120 @@
+import numpy as np
+
+from models.epreuve import EpreuveCourse
+
+
+class CourseScoringParameters:
+    """
+    Paramètres de notation des courses, sous forme de vecteurs alignés sur une liste d'épreuves (une valeur par course).
+
+    Attributes:
+        reference_times (np.ndarray): Temps de référence, en min.
+        gains_per_minute (np.ndarray): Points gagnés par minute d'avance sur le temps de référence.
+        losses_per_minute (np.ndarray): Points perdus par minute de retard sur le temps de référence.
+        participation_points (np.ndarray): Points de participation.
+        has_mg (np.ndarray[bool]): True si la course contient une portion meilleur grimpeur.
+        mg_reference_times, mg_gains_per_minute, mg_losses_per_minute (np.ndarray): Paramètres du meilleur grimpeur (0 si pas de MG).
+    """
+
+    def __init__(self, reference_times, gains_per_minute, losses_per_minute, participation_points, has_mg, mg_reference_times, mg_gains_per_minute, mg_losses_per_minute):
+        self.reference_times = np.asarray(reference_times, dtype='float64')
+        self.gains_per_minute = np.asarray(gains_per_minute, dtype='float64')
+        self.losses_per_minute = np.asarray(losses_per_minute, dtype='float64')
+        self.participation_points = np.asarray(participation_points, dtype='float64')
+        self.has_mg = np.asarray(has_mg, dtype=bool)
+        self.mg_reference_times = np.asarray(mg_reference_times, dtype='float64')
+        self.mg_gains_per_minute = np.asarray(mg_gains_per_minute, dtype='float64')
+        self.mg_losses_per_minute = np.asarray(mg_losses_per_minute, dtype='float64')
+
+
+    @classmethod
+    def from_epreuves(cls, epreuves_courses_list: list[EpreuveCourse]) -> 'CourseScoringParameters':
+        """Lit les paramètres de chaque EpreuveCourse, dans l'ordre de la liste."""
+
+        no_mg = {'reference_time': 0.0, 'gain_per_minute': 0.0, 'loss_per_minute': 0.0}
+        mg_list = [epreuve.meilleur_grimpeur or no_mg for epreuve in epreuves_courses_list]
+
+        return cls(
+            reference_times=[epreuve.reference_time for epreuve in epreuves_courses_list],
+            gains_per_minute=[epreuve.gain_per_minute for epreuve in epreuves_courses_list],
+            losses_per_minute=[epreuve.loss_per_minute for epreuve in epreuves_courses_list],
+            participation_points=[epreuve.participation_points for epreuve in epreuves_courses_list],
+            has_mg=[bool(epreuve.meilleur_grimpeur) for epreuve in epreuves_courses_list],
+            mg_reference_times=[mg['reference_time'] for mg in mg_list],
+            mg_gains_per_minute=[mg['gain_per_minute'] for mg in mg_list],
+            mg_losses_per_minute=[mg['loss_per_minute'] for mg in mg_list]
+        )
+
+
+    def copy(self) -> 'CourseScoringParameters':
+        return CourseScoringParameters(**{name: value.copy() for name, value in vars(self).items()})
+
+
+    @classmethod
+    def stack(cls, parameters_list: list['CourseScoringParameters']) -> 'CourseScoringParameters':
+        """
+        Empile plusieurs jeux de paramètres en vecteurs de forme (jeux, 1, courses),
+        pour que score_courses() note toutes les équipes pour tous les jeux en une seule opération (résultats de forme (jeux, équipes, courses)).
+        """
+        return cls(**{name: np.stack([getattr(parameters, name) for parameters in parameters_list])[:, np.newaxis, :] for name in vars(parameters_list[0])})
+
+
+class CoursePoints:
+    """
+    Points de chaque équipe (lignes) sur chaque course (colonnes). Vaut 0 pour une course non courue.
+
+    Attributes:
+        points_rapidite, points_mg, points_bip, points_participation (np.ndarray): Les différents types de points.
+        total_points (np.ndarray): La somme des points ci-dessus.
+    """
+
+    def __init__(self, points_rapidite, points_mg, points_bip, points_participation, total_points):
+        self.points_rapidite = points_rapidite
+        self.points_mg = points_mg
+        self.points_bip = points_bip
+        self.points_participation = points_participation
+        self.total_points = total_points
+
+
+
+def speed_points(times: np.ndarray, reference_times: np.ndarray, gains_per_minute: np.ndarray, losses_per_minute: np.ndarray) -> np.ndarray:
+    """
+    Points de rapidité pour des temps en s, avec des paramètres en min, diffusés sur les colonnes :
+    bonus de gain_per_minute par minute d'avance, malus de loss_per_minute par minute de retard.
+    """
+    ref_times = reference_times*60    # Conversion min -> s
+    bonus = np.where(times < ref_times, (ref_times - times)/60 * gains_per_minute, 0.0)
+    malus = np.where(times > ref_times, (times - ref_times)/60 * losses_per_minute, 0.0)
+    return bonus - malus
+
+
+def score_courses(total_times: np.ndarray, mg_times: np.ndarray, bip_points: np.ndarray, has_run: np.ndarray, parameters: CourseScoringParameters) -> CoursePoints:
+    """
+    Calcule en une opération les points de toutes les équipes sur toutes les courses, à partir de matrices (équipes x courses) :
+    - total_times : temps total sur la course, en s ;
+    - mg_times : temps sur la portion meilleur grimpeur, en s (ignoré pour une course sans MG). NaN si l'équipe n'a pas de temps MG sur une course avec MG :
+      la course n'a alors pas de points MG et ses points de rapidité sont calculés sur le temps total ;
+    - bip_points : somme des points bonus des badgeuses bipées ;
+    - has_run : True si l'équipe a couru la course.
+
+    Pour une course avec MG, les points de rapidité sont calculés sur le temps hors MG et s'ajoutent aux points MG.
+    Les paramètres peuvent avoir des dimensions en plus devant celle des courses (voir CourseScoringParameters.stack) : ils sont diffusés sur les matrices.
+    """
+
+    has_mg_time = parameters.has_mg & ~np.isnan(mg_times)
+    mg_times = np.where(has_mg_time, mg_times, 0.0)
+
+    points_rapidite = speed_points(total_times - mg_times, parameters.reference_times, parameters.gains_per_minute, parameters.losses_per_minute)
+    points_mg = np.where(has_mg_time, speed_points(mg_times, parameters.mg_reference_times, parameters.mg_gains_per_minute, parameters.mg_losses_per_minute), 0.0)
+    points_participation = parameters.participation_points
+
+    # Même ordre de sommation que l'ancien calcul course par course : MG, bips, participation, rapidité
+    total_points = points_mg + bip_points + points_participation + points_rapidite
+
+    return CoursePoints(
+        points_rapidite=np.where(has_run, points_rapidite, 0.0),
+        points_mg=np.where(has_run, points_mg, 0.0),
+        points_bip=np.where(has_run, bip_points, 0.0),
+        points_participation=np.where(has_run, points_participation, 0.0),
+        total_points=np.where(has_run, total_points, 0.0)
+    )
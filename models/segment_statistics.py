@@ -0,0 +1,210 @@
+import math
+import numpy as np
+
+from models.epreuve import EpreuveCourse
+from models.results import CourseResult
+
+
+class P2Quantile:
+    """
+    Estimation d'un quantile au fil de l'eau, en mémoire constante (algorithme P² de Jain et Chlamtac) :
+    cinq marqueurs suivent le minimum, le quantile p/2, le quantile p, le quantile (1+p)/2 et le maximum, ajustés à chaque valeur par interpolation parabolique.
+    Exact tant que moins de cinq valeurs ont été ajoutées.
+    """
+
+    __slots__ = ('p', 'count', 'heights', 'positions', 'increments')
+
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self.heights: list[float] = []
+        self.positions = [0, 1, 2, 3, 4]
+        # Position idéale de chaque marqueur après n valeurs : increments[i]*(n-1)
+        self.increments = (0.0, p/2, p, (1 + p)/2, 1.0)
+
+
+    def add(self, x: float):
+        self.count += 1
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(x)
+            heights.sort()
+            return
+
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= heights[k+1]:
+                k += 1
+
+        positions = self.positions
+        for i in range(k+1, 5):
+            positions[i] += 1
+
+        # Ajuste les trois marqueurs intermédiaires s'ils se sont éloignés d'au moins une position de leur position idéale
+        last = self.count - 1
+        for i in (1, 2, 3):
+            d = self.increments[i]*last - positions[i]
+            if (d >= 1 and positions[i+1] - positions[i] > 1) or (d <= -1 and positions[i-1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolic = heights[i] + d/(positions[i+1] - positions[i-1]) * (
+                    (positions[i] - positions[i-1] + d)*(heights[i+1] - heights[i])/(positions[i+1] - positions[i])
+                    + (positions[i+1] - positions[i] - d)*(heights[i] - heights[i-1])/(positions[i] - positions[i-1]))
+                if heights[i-1] < parabolic < heights[i+1]:
+                    heights[i] = parabolic
+                else:
+                    heights[i] += d*(heights[i+d] - heights[i])/(positions[i+d] - positions[i])
+                positions[i] += d
+
+
+    def value(self) -> float:
+        """Renvoie l'estimation du quantile, nan sans valeur."""
+
+        heights = self.heights
+        if not heights:
+            return math.nan
+        if len(heights) < 5:
+            # Interpolation linéaire sur les valeurs triées, comme np.quantile
+            rank = self.p*(len(heights) - 1)
+            low = int(rank)
+            return heights[low] + (rank - low)*(heights[min(low+1, len(heights)-1)] - heights[low])
+        return heights[2]
+
+
+class SegmentStatistics:
+    """
+    Statistiques des temps (en s) d'un segment entre deux poinçons, tenues à jour valeur par valeur en mémoire constante :
+    effectif, moyenne et variance (algorithme de Welford), minimum, maximum et quantiles approchés (P2Quantile).
+    """
+
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max', '_quantiles')
+
+    QUANTILES = (0.1, 0.5, 0.9)
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._quantiles = tuple(P2Quantile(p) for p in self.QUANTILES)
+
+    def __repr__(self):
+        return f"SegmentStatistics(n={self.count}, moyenne {self.mean:.0f}s, médiane {self.median:.0f}s, p10-p90 {self.p10:.0f}-{self.p90:.0f}s)"
+
+
+    def add(self, elementary_time: float):
+        self.count += 1
+        delta = elementary_time - self.mean
+        self.mean += delta/self.count
+        self._m2 += delta*(elementary_time - self.mean)
+        self.min = min(self.min, elementary_time)
+        self.max = max(self.max, elementary_time)
+        for quantile in self._quantiles:
+            quantile.add(elementary_time)
+
+
+    @property
+    def variance(self) -> float:
+        """Variance de l'échantillon (nan avec moins de deux valeurs)."""
+        return self._m2/(self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def p10(self) -> float:
+        return self._quantiles[0].value()
+
+    @property
+    def median(self) -> float:
+        return self._quantiles[1].value()
+
+    @property
+    def p90(self) -> float:
+        return self._quantiles[2].value()
+
+
+class SegmentStatisticsAccumulator:
+    """
+    Statistiques des temps entre chaque paire de poinçons consécutifs du parcours d'une course, par paire d'identifiants de poinçons (poincon_id),
+    alimentées équipe par équipe (add_course_result) au fil du calcul des temps.
+
+    Seules les paires de poinçons qui se suivent dans badgeuses_list sont comptées, y compris une pause gel -> dégel :
+    un bip manquant ne crée pas de paire, et une heure estimée (CourseResult.imputed) n'est pas comptée.
+
+    Attributes:
+        segments (dict[tuple[int, int], SegmentStatistics]): Les statistiques de chaque paire (poincon_id du premier poinçon, poincon_id du second).
+    """
+
+    def __init__(self):
+        self.segments: dict[tuple[int, int], SegmentStatistics] = {}
+        self._next_poincon_ids: dict[int, int] = {}     # poincon_id -> poincon_id du poinçon suivant dans le parcours
+        self._known_epreuves: set[EpreuveCourse] = set()
+
+
+    def reset(self):
+        """Oublie tous les temps, et les parcours (qui ont pu changer avec les badgeuses)."""
+        self.segments = {}
+        self._next_poincon_ids = {}
+        self._known_epreuves = set()
+
+
+    def add_course_result(self, course_result: CourseResult):
+        """Ajoute les temps entre poinçons consécutifs bipés par une équipe sur une course."""
+
+        epreuve = course_result.epreuve_course
+        if epreuve not in self._known_epreuves:
+            self._add_epreuve(epreuve)
+
+        poincon_ids = [poincon.poincon_id for poincon in course_result.poincons]
+        elementary_times = np.diff(course_result.bip_times).tolist()
+        imputed = course_result.imputed.tolist() if course_result.imputed.any() else None
+
+        next_poincon_ids = self._next_poincon_ids
+        for i, elementary_time in enumerate(elementary_times):
+            if next_poincon_ids.get(poincon_ids[i]) != poincon_ids[i+1] or (imputed is not None and (imputed[i] or imputed[i+1])):
+                continue
+            key = (poincon_ids[i], poincon_ids[i+1])
+            statistics = self.segments.get(key)
+            if statistics is None:
+                statistics = self.segments[key] = SegmentStatistics()
+            statistics.add(elementary_time)
+
+
+    def get(self, poincon_id_1: int, poincon_id_2: int) -> SegmentStatistics|None:
+        return self.segments.get((poincon_id_1, poincon_id_2))
+
+
+    def get_epreuve_statistics(self, epreuve: EpreuveCourse) -> list[tuple[tuple[int, int], SegmentStatistics|None]]:
+        """Renvoie les statistiques de chaque paire de poinçons consécutifs de la course, dans l'ordre du parcours (None pour une paire sans temps)."""
+
+        badgeuses_list = epreuve.badgeuses_list
+        pairs = [(badgeuses_list[k].poincon_id, badgeuses_list[k+1].poincon_id) for k in range(len(badgeuses_list) - 1)]
+        return [(pair, self.segments.get(pair)) for pair in pairs]
+
+
+    def get_mean_times(self, epreuve: EpreuveCourse) -> np.ndarray|None:
+        """Renvoie le temps moyen de chaque paire de poinçons consécutifs de la course, None s'il manque des temps pour une des paires."""
+
+        epreuve_statistics = self.get_epreuve_statistics(epreuve)
+        if any(statistics is None for _, statistics in epreuve_statistics):
+            return None
+        return np.array([statistics.mean for _, statistics in epreuve_statistics])
+
+
+    def get_nb_teams(self, epreuve: EpreuveCourse) -> int:
+        """Nombre de temps du segment le moins renseigné de la course : les équipes dont les temps ont servi sur chacun des segments."""
+        return min((statistics.count if statistics is not None else 0 for _, statistics in self.get_epreuve_statistics(epreuve)), default=0)
+
+
+    def _add_epreuve(self, epreuve: EpreuveCourse):
+        for poincon, next_poincon in zip(epreuve.badgeuses_list, epreuve.badgeuses_list[1:]):
+            self._next_poincon_ids[poincon.poincon_id] = next_poincon.poincon_id
+        self._known_epreuves.add(epreuve)
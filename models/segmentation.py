@@ -0,0 +1,162 @@
+import numpy as np
+from collections import Counter
+from dataclasses import dataclass
+from typing import ClassVar
+
+from models.epreuve import EpreuveCourse
+from models.poincon import Poincon
+from models.bips_table import seconds_to_hms
+
+
+@dataclass(slots=True, repr=False)
+class BipAnomaly:
+    """
+    Écart entre les bips d'une équipe et les parcours des épreuves, relevé pendant la segmentation.
+
+    Attributes:
+        kind (str): SKIPPED si un poinçon de l'épreuve n'a pas été bipé, EXTRA si un bip n'a pu être rattaché à aucun poinçon.
+        badgeuse (int): Numéro de la badgeuse concernée.
+        epreuve (EpreuveCourse|None): L'épreuve concernée. None pour un bip en trop sur une badgeuse d'aucune épreuve courue.
+        poincon (Poincon|None): Le poinçon sauté (SKIPPED uniquement).
+        bip_idx (int|None): Position du bip dans les bips de l'équipe (EXTRA, ou SKIPPED détecté en cours de course). None si le poinçon manque en fin de doigt.
+        bip_time (int|None): Heure du bip, en secondes.
+    """
+
+    SKIPPED: ClassVar[str] = 'skipped'
+    EXTRA: ClassVar[str] = 'extra'
+
+    kind: str
+    badgeuse: int
+    epreuve: EpreuveCourse|None = None
+    poincon: Poincon|None = None
+    bip_idx: int|None = None
+    bip_time: int|None = None
+
+    def __repr__(self):
+        if self.bip_idx is None:
+            position = "en fin de doigt"
+        else:
+            position = f"bip n°{self.bip_idx} à {seconds_to_hms(self.bip_time) if self.bip_time is not None else 'heure inconnue'}"
+        return f"BipAnomaly({self.kind}, badgeuse {self.badgeuse}, {self.epreuve}, {position})"
+
+
+class SegmentationResult:
+    """
+    Résultat de la segmentation des bips d'une équipe.
+
+    Attributes:
+        poincons_times (dict[int, list[tuple[Poincon, int]]]): Pour chaque indice d'épreuve courue (dans SegmentationEngine.epreuves_list), les couples (poinçon, heure du bip) dans l'ordre du parcours.
+        anomalies (list[BipAnomaly]): Les badgeuses sautées et les bips en trop.
+    """
+
+    def __init__(self, poincons_times: dict[int, list[tuple[Poincon, int]]], anomalies: list[BipAnomaly]):
+        self.poincons_times = poincons_times
+        self.anomalies = anomalies
+
+
+class SegmentationEngine:
+    """
+    Rattache chaque bip d'une équipe au poinçon de l'épreuve correspondante, en un seul parcours des bips.
+
+    S'appuie sur un index inversé badgeuse -> [(indice de l'épreuve, position dans badgeuses_list)],
+    qui sert aussi à trouver les épreuves courues par une équipe et les poinçons qu'elle n'a pas bipés (get_runned_epreuves_idx, get_missing_poincons).
+    Chaque épreuve a un curseur sur le prochain poinçon attendu :
+    - un bip sur la badgeuse attendue est rattaché et fait avancer le curseur ;
+    - un bip sur une badgeuse plus loin dans le parcours fait sauter les poinçons intermédiaires, relevés comme SKIPPED ;
+    - un bip qui ne correspond à aucun poinçon restant d'une épreuve courue est relevé comme EXTRA.
+
+    À construire une fois que les badgeuses_list des épreuves sont définitives (après add_badgeuses_to_epreuves).
+    """
+
+    def __init__(self, epreuves_list: list[EpreuveCourse]):
+        self.epreuves_list = epreuves_list
+        self._epreuve_idx: dict[EpreuveCourse, int] = {epreuve: epreuve_idx for epreuve_idx, epreuve in enumerate(epreuves_list)}
+
+        self.badgeuse_index: dict[int, list[tuple[int, int]]] = {}
+        for epreuve_idx, epreuve in enumerate(epreuves_list):
+            for position, poincon in enumerate(epreuve.badgeuses_list):
+                self.badgeuse_index.setdefault(poincon.badgeuse, []).append((epreuve_idx, position))
+
+        # Nombre de passages demandés à chaque badgeuse de chaque épreuve, sans la badgeuse -1 du mass start
+        self.required_badgeuses: list[Counter] = [Counter(poincon.badgeuse for poincon in epreuve.badgeuses_list if poincon.badgeuse != -1) for epreuve in epreuves_list]
+
+
+    def get_epreuve_idx(self, epreuve: EpreuveCourse) -> int:
+        return self._epreuve_idx[epreuve]
+
+
+    def get_runned_epreuves_idx(self, bips_counts: Counter) -> list[int]:
+        """Renvoie les indices des épreuves dont l'équipe a bipé au moins une badgeuse, dans l'ordre de epreuves_list. bips_counts compte les bips de l'équipe par badgeuse."""
+        return sorted({epreuve_idx for badgeuse in bips_counts for epreuve_idx, _ in self.badgeuse_index.get(badgeuse, ())})
+
+
+    def get_missing_poincons(self, epreuve_idx: int, bips_counts: Counter) -> list[Poincon]:
+        """
+        Renvoie les poinçons de l'épreuve sans bip de l'équipe, dans l'ordre du parcours (ignore la badgeuse -1 du mass start).
+
+        Une badgeuse à biper n fois mais bipée k < n fois manque pour ses n-k derniers poinçons.
+        """
+
+        missing = self.required_badgeuses[epreuve_idx] - bips_counts
+        if not missing:
+            return []
+
+        missing_poincons = []
+        occurrences = Counter()
+        for poincon in self.epreuves_list[epreuve_idx].badgeuses_list:
+            if poincon.badgeuse in missing:
+                occurrences[poincon.badgeuse] += 1
+                if occurrences[poincon.badgeuse] > bips_counts[poincon.badgeuse]:
+                    missing_poincons.append(poincon)
+        return missing_poincons
+
+
+    def segment(self, bips_CN: np.ndarray, bips_times: np.ndarray, runned_epreuves: list[EpreuveCourse]) -> SegmentationResult:
+        """Segmente les bips d'une équipe entre les épreuves runned_epreuves, en temps linéaire en le nombre de bips."""
+
+        cursors: dict[int, int] = {self.get_epreuve_idx(epreuve): 0 for epreuve in runned_epreuves}
+        poincons_times: dict[int, list[tuple[Poincon, int]]] = {epreuve_idx: [] for epreuve_idx in cursors}
+        anomalies: list[BipAnomaly] = []
+
+        for bip_idx, (badgeuse, bip_time) in enumerate(zip(bips_CN.tolist(), bips_times.tolist())):
+
+            jump = None     # Premier poinçon plus loin dans un parcours, au cas où aucun poinçon attendu ne correspond
+            runned_epreuve_idx = None   # Première épreuve courue contenant la badgeuse, pour situer un éventuel bip en trop
+            matched = False
+
+            for epreuve_idx, position in self.badgeuse_index.get(badgeuse, ()):
+                cursor = cursors.get(epreuve_idx)
+                if cursor is None:  # Épreuve non courue par l'équipe
+                    continue
+                if runned_epreuve_idx is None:
+                    runned_epreuve_idx = epreuve_idx
+                if position == cursor:
+                    poincons_times[epreuve_idx].append((self.epreuves_list[epreuve_idx].badgeuses_list[position], bip_time))
+                    cursors[epreuve_idx] = cursor + 1
+                    matched = True
+                    break
+                if position > cursor and jump is None:
+                    jump = (epreuve_idx, position)
+
+            if matched:
+                continue
+
+            if jump is not None:
+                epreuve_idx, position = jump
+                epreuve = self.epreuves_list[epreuve_idx]
+                for skipped_position in range(cursors[epreuve_idx], position):
+                    skipped_poincon = epreuve.badgeuses_list[skipped_position]
+                    anomalies.append(BipAnomaly(BipAnomaly.SKIPPED, skipped_poincon.badgeuse, epreuve, skipped_poincon, bip_idx, bip_time))
+                poincons_times[epreuve_idx].append((epreuve.badgeuses_list[position], bip_time))
+                cursors[epreuve_idx] = position + 1
+            else:
+                epreuve = self.epreuves_list[runned_epreuve_idx] if runned_epreuve_idx is not None else None
+                anomalies.append(BipAnomaly(BipAnomaly.EXTRA, badgeuse, epreuve, bip_idx=bip_idx, bip_time=bip_time))
+
+        # Poinçons jamais atteints en fin de doigt
+        for epreuve_idx, cursor in cursors.items():
+            epreuve = self.epreuves_list[epreuve_idx]
+            for skipped_poincon in epreuve.badgeuses_list[cursor:]:
+                anomalies.append(BipAnomaly(BipAnomaly.SKIPPED, skipped_poincon.badgeuse, epreuve, skipped_poincon))
+
+        return SegmentationResult(poincons_times, anomalies)
@@ -0,0 +1,198 @@
+import random
+import itertools
+
+from models.results import TeamDayResult, TeamEventResult
+
+
+class SortedKeys:
+    """
+    Clés triées (sans doublon) dans une liste à enjambées indexable (skip list) : ajout, retrait et rang d'une clé en O(log n) en moyenne,
+    là où une liste triée décale tous les éléments suivants à chaque insertion ou suppression.
+
+    Chaque niveau de liens saute par-dessus un nombre aléatoire de clés (un lien du niveau i sur deux en moyenne monte au niveau i+1),
+    et garde le nombre de clés sautées (width) pour calculer le rang d'une clé en descendant les niveaux.
+    """
+
+    MAX_LEVEL = 24      # Assez pour plusieurs millions de clés
+
+    class _Node:
+        __slots__ = ('key', 'next', 'width')
+
+        def __init__(self, key, level: int):
+            self.key = key
+            self.next: list['SortedKeys._Node|None'] = [None]*level
+            self.width: list[int] = [1]*level    # Nombre de clés entre ce nœud (exclu) et le suivant de chaque niveau (inclus)
+
+    def __init__(self, keys=()):
+        self._head = SortedKeys._Node(None, self.MAX_LEVEL)
+        self._size = 0
+        self._random = random.Random(0)
+        for key in keys:
+            self.add(key)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    def __reduce__(self):
+        # Picklée comme la liste de ses clés, sans récursion sur la chaîne des nœuds
+        return (SortedKeys, (list(self),))
+
+
+    def add(self, key):
+        """Insère key, qui ne doit pas déjà être présente."""
+
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+
+        # Dernier nœud avant key et son rang, à chaque niveau
+        previous_nodes, previous_ranks = self._find_previous(key)
+        node = SortedKeys._Node(key, level)
+        rank = previous_ranks[0] + 1    # Rang du nouveau nœud
+        for i in range(self.MAX_LEVEL):
+            previous = previous_nodes[i]
+            if i < level:
+                node.next[i] = previous.next[i]
+                previous.next[i] = node
+                # Le lien du précédent est coupé en deux au niveau du nouveau nœud
+                node.width[i] = previous.width[i] - (rank - previous_ranks[i]) + 1
+                previous.width[i] = rank - previous_ranks[i]
+            else:
+                previous.width[i] += 1
+        self._size += 1
+
+
+    def remove(self, key):
+        """Retire key, qui doit être présente."""
+
+        previous_nodes, _ = self._find_previous(key)
+        node = previous_nodes[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+
+        for i in range(self.MAX_LEVEL):
+            previous = previous_nodes[i]
+            if i < len(node.next):
+                previous.width[i] += node.width[i] - 1
+                previous.next[i] = node.next[i]
+            else:
+                previous.width[i] -= 1
+        self._size -= 1
+
+
+    def bisect_left(self, key) -> int:
+        """Nombre de clés strictement inférieures à key."""
+        _, previous_ranks = self._find_previous(key)
+        return previous_ranks[0]
+
+
+    def _find_previous(self, key) -> tuple[list['SortedKeys._Node'], list[int]]:
+        """Renvoie, pour chaque niveau, le dernier nœud dont la clé est inférieure à key (ou la tête) et son rang (0 pour la tête)."""
+
+        previous_nodes = [self._head]*self.MAX_LEVEL
+        previous_ranks = [0]*self.MAX_LEVEL
+        node, rank = self._head, 0
+        for i in reversed(range(self.MAX_LEVEL)):
+            next_node = node.next[i]
+            while next_node is not None and next_node.key < key:
+                rank += node.width[i]
+                node = next_node
+                next_node = node.next[i]
+            previous_nodes[i] = node
+            previous_ranks[i] = rank
+        return previous_nodes, previous_ranks
+
+
+class Standings:
+    """
+    Classement des équipes, maintenu trié au fil des mises à jour.
+
+    Les équipes sont classées par total_points décroissant, puis par courses_total_time croissant (départage), puis par dossard.
+    Chaque vue (classement général, par mixité, entreprise ou non, et mixité x entreprise) garde ses clés
+    (-total_points, courses_total_time, dossard) triées dans une SortedKeys : une mise à jour retire l'ancienne clé de l'équipe et insère la nouvelle
+    dans les seules vues de l'équipe, en O(log n) chacune, et le rang d'une équipe se lit aussi en O(log n).
+
+    Les entrées sont des TeamDayResult (classement d'une journée) ou des TeamEventResult (classement cumulé),
+    figés au moment de update() : modifier une équipe ensuite ne désordonne pas le classement.
+    """
+
+    def __init__(self, entries: list[TeamDayResult|TeamEventResult]|None = None):
+        self.entries_by_dossard: dict[int, TeamDayResult|TeamEventResult] = {}
+        self._keys: dict[int, tuple[float, float, int]] = {}
+        # (mixite|None, ent|None) -> clés triées. None : pas de filtre sur ce critère
+        self._views: dict[tuple[str|None, bool|None], SortedKeys] = {}
+
+        for entry in entries or []:
+            self.update(entry)
+
+
+    def __len__(self):
+        return len(self.entries_by_dossard)
+
+
+    def update(self, entry: TeamDayResult|TeamEventResult):
+        """Ajoute une équipe au classement, ou remplace son résultat précédent."""
+
+        if entry.dossard in self.entries_by_dossard:
+            self.remove(entry.dossard)
+
+        key = (-entry.total_points, entry.courses_total_time, entry.dossard)
+        self.entries_by_dossard[entry.dossard] = entry
+        self._keys[entry.dossard] = key
+        for view in self._get_entry_views(entry):
+            if view not in self._views:
+                self._views[view] = SortedKeys()
+            self._views[view].add(key)
+
+
+    def remove(self, dossard: int):
+        """Retire une équipe du classement."""
+
+        entry = self.entries_by_dossard.pop(dossard)
+        key = self._keys.pop(dossard)
+        for view in self._get_entry_views(entry):
+            self._views[view].remove(key)
+
+
+    def get_rank(self, dossard: int, mixite: str|None = None, ent: bool|None = None) -> int:
+        """
+        Rang de l'équipe (à partir de 1) dans la vue demandée. Les équipes à égalité de points et de temps ont le même rang.
+        La vue doit contenir l'équipe : mixite et ent à None, ou égaux à ceux de l'équipe.
+        """
+
+        points, time, _ = self._keys[dossard]
+        return self._views[(mixite, ent)].bisect_left((points, time)) + 1
+
+
+    def get_top(self, k: int, mixite: str|None = None, ent: bool|None = None) -> list[TeamDayResult|TeamEventResult]:
+        """Renvoie les k premières équipes de la vue demandée, dans l'ordre du classement."""
+        return [self.entries_by_dossard[dossard] for _, _, dossard in itertools.islice(self._views.get((mixite, ent), ()), k)]
+
+
+    def get_ranking(self, mixite: str|None = None, ent: bool|None = None) -> list[tuple[int, TeamDayResult|TeamEventResult]]:
+        """Renvoie le classement complet de la vue demandée, en couples (rang, équipe)."""
+
+        ranking = []
+        previous_points_time = None
+        for position, (points, time, dossard) in enumerate(self._views.get((mixite, ent), ()), start=1):
+            if (points, time) != previous_points_time:
+                rank = position
+                previous_points_time = (points, time)
+            ranking.append((rank, self.entries_by_dossard[dossard]))
+        return ranking
+
+
+    def get_views(self) -> list[tuple[str|None, bool|None]]:
+        """Renvoie les couples (mixite, ent) des vues non vides."""
+        return [view for view, view_keys in self._views.items() if view_keys]
+
+
+    @staticmethod
+    def _get_entry_views(entry: TeamDayResult|TeamEventResult) -> tuple[tuple[str|None, bool|None], ...]:
+        return ((None, None), (entry.mixite, None), (None, entry.ent), (entry.mixite, entry.ent))
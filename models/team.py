@@ -1,13 +1,39 @@
-from copy import deepcopy
-import pandas
+import numpy as np
 import logging
-from datetime import datetime
+from collections import Counter
+from dataclasses import dataclass
 
 from models.epreuve import EpreuveCourse
 from models.poincon import Poincon
+from models.bips_table import seconds_to_hms
+from models.segmentation import SegmentationEngine, BipAnomaly
+from models.scoring import CourseScoringParameters, CoursePoints, score_courses
+from models.results import CourseResult, ActiResult, TeamDayResult, ImputedBip
+
+
+@dataclass(frozen=True, slots=True)
+class TeamIdentity:
+    """
+    Identité d'une équipe telle que lue dans le fichier d'équipes, identique d'une journée à l'autre.
+    Partagée par les Team de chaque journée (voir SharedRosters), qui ne portent que les résultats de leur journée.
+    """
+
+    puce: int
+    dossard: int
+    ent: bool
+    mixite: str
+    team_name: str
+    concs_list: tuple[tuple[str, str], ...]
+    contact: str
+
 
 class Team:
 
+    __slots__ = ('puce', 'dossard', 'team_name', 'concs_list', 'ent', 'mixite', 'contact', 'identity',
+                 'bips_CN', 'bips_times', 'nb_records_declared',
+                 'runned_epreuve_courses_list', 'epreuve_actis_list', 'missing_bips', 'bip_anomalies', 'imputed_bips',
+                 'courses_total_time', 'courses_points', 'mg_time', 'mg_points', 'actis_points', 'total_points')
+
     def __init__(self, puce: int, dossard: int, ent: bool, mixite: str, team_name: str, concs_list: list[tuple], contact: str):
         self.puce = puce
         self.dossard = dossard
@@ -16,12 +42,17 @@ class Team:
         self.ent = ent
         self.mixite = mixite
         self.contact = contact
-        self.transit_times = pandas.Series()
-        self.runned_epreuve_courses_list: list[dict] = []   # De la forme [{'epreuve_course': Epreuve1, 'times': [{'badgeuse_num': 52, 'signaleur': 'S1', ... , 'bip_time': 11:52:34}], 'points': 0.0, 'elementary_times': [], 'total_time': 0.0, 'points_dict': {}, 'total_points': 150}, ...]
-                                                            # A CHANGER, pour rendre plus lisible qu'une liste de dict de dict
-        self.epreuve_actis_list: list = []    # De la forme [{'epreuve_acti': Epreuve1, 'medal': 'or', 'points': 5}]
+        self.identity: TeamIdentity|None = None     # Identité partagée entre journées, si l'équipe a été créée par from_identity()
+        # Vues sur la BipsTable de DatasGraidCollector, attribuées par set_bips()
+        self.bips_CN: np.ndarray = np.zeros(0, dtype='int32')
+        self.bips_times: np.ndarray = np.zeros(0, dtype='int32')    # En secondes depuis minuit du jour de course
+        self.nb_records_declared: int|None = None
+        self.runned_epreuve_courses_list: list[CourseResult] = []   # Un CourseResult par course courue
+        self.epreuve_actis_list: list[ActiResult] = []    # Un ActiResult par acti
         
-        self.missing_bips: list = []
+        self.missing_bips: set[EpreuveCourse] = set()    # Épreuves courues dont au moins une badgeuse n'a pas été bipée
+        self.bip_anomalies: list[BipAnomaly] = []   # Rempli par aggregate_transit_times_by_epreuves()
+        self.imputed_bips: list[ImputedBip] = []    # Heures de bip estimées faute de bip (voir MissingBipsImputer)
 
         self.courses_total_time: float = 0.0
         self.courses_points: float = 0.0
@@ -30,8 +61,14 @@ class Team:
         self.actis_points: float = 0.0
         self.total_points: float = 0.0
 
-        self.CN_columns = []
-        self.times_columns = []
+
+    @classmethod
+    def from_identity(cls, identity: TeamIdentity) -> 'Team':
+        """Crée l'équipe d'une journée, sans résultats, à partir de son identité."""
+
+        team = cls(identity.puce, identity.dossard, identity.ent, identity.mixite, identity.team_name, identity.concs_list, identity.contact)
+        team.identity = identity
+        return team
 
 
     def __repr__(self):
@@ -46,64 +83,77 @@ class Team:
         return False
 
 
+    def set_bips(self, bips_CN: np.ndarray, bips_times: np.ndarray, nb_records_declared: int|None = None):
+        """Attribue à l'équipe ses bips, sous forme de vues sur la BipsTable (numéros de badgeuses et heures en secondes)."""
+        self.bips_CN = bips_CN
+        self.bips_times = bips_times
+        if nb_records_declared is not None:
+            self.nb_records_declared = nb_records_declared
+
+
+    def reset_courses_results(self):
+        """Efface les résultats de courses de l'équipe (épreuves courues, bips manquants, temps et points), avant de les recalculer avec de nouveaux bips. Les actis sont gardées."""
+
+        self.runned_epreuve_courses_list = []
+        self.missing_bips = set()
+        self.bip_anomalies = []
+        self.imputed_bips = []
+        self.courses_total_time = 0.0
+        self.courses_points = 0.0
+        self.mg_time = 0.0
+        self.mg_points = 0.0
+        self.total_points = self.actis_points
+
+
     def get_CN_columns(self) -> list[int]:
         """
-        Filter and keep only the columns in the transit_times DataFrame that contain 'CN' in their index.\n
+        Renvoie la liste des badgeuses bipées par l'équipe, dans l'ordre des bips.\n
         Returns a list.
         """
-        try:
-            CN_columns: list[int] = self.transit_times.loc[self.transit_times.index.str.contains('CN')].astype('int64').to_list()
-        except AttributeError as error:
-            logging.error("self.transit_times n'a peut-être pas été initialisé...")
-            raise error
-        return CN_columns
+        return self.bips_CN.tolist()
+
+
+    def get_bips_counts(self) -> Counter:
+        """Renvoie le nombre de bips de l'équipe sur chaque badgeuse."""
+        return Counter(self.bips_CN.tolist())
 
 
-    def get_time_columns(self) -> list[str]:
+    def get_time_columns(self) -> list[int]:
         """
-        Filter and keep only the values in the transit_times DataFrame that contain 'time' in their index.
-        Returns a list of datetime objects.
+        Renvoie la liste des heures de bip de l'équipe, en secondes depuis minuit du jour de course.
+        Returns a list.
         """
-        try:
-            time_columns: list[str] = self.transit_times.loc[self.transit_times.index.str.contains('time')].to_list()
-        except AttributeError as error:
-            logging.error("self.transit_times n'a peut-être pas été initialisé...")
-            raise error
-        return time_columns
+        return self.bips_times.tolist()
 
 
     def check_nb_records_is_coherent(self):
         """"
-        Lit transit_times et vérifie que 'No. of records' est cohérent avec le nombre de colonnes 'Record x CN'.\n
-        Sinon renvoie une exception NoOfRecordsNotCoherentError.
+        Vérifie que 'No. of records' est cohérent avec le nombre de bips lus sur le doigt (sans le mass start).\n
+        Sinon affiche un avertissement.
         """
 
-        if len(self.transit_times.loc[self.transit_times.index.str.contains('CN')]) != self.transit_times['No. of records']:
-            print(f"/!\\ Le nombre de colonnes 'Record x CN' de {self.team_name} ({self.puce}) n'est pas cohérent avec 'No. of records' ({self.transit_times['No. of records']} attendus)!")
+        nb_records = int(np.count_nonzero(self.bips_CN != -1))
+        if nb_records != self.nb_records_declared:
+            logging.warning("Le nombre de colonnes 'Record x CN' de %s (%s) n'est pas cohérent avec 'No. of records' (%s attendus) !", self.team_name, self.puce, self.nb_records_declared)
 
 
-    def check_all_epreuve_badgeuses_are_present(self):
-        """Pour chaque épreuve dans team.runned_epreuve_courses_list, vérifie que toutes les badgeuses de l'épreuves sont présentes dans team.transit_times, le bon nombre de fois (ignore la badgeuse -1 de mass_start).\n
-        Retourne True si une badgeuse n'a pas été bipée, False sinon."""
-        
+    def check_all_epreuve_badgeuses_are_present(self, segmentation_engine: SegmentationEngine, bips_counts: Counter|None = None) -> bool:
+        """
+        Pour chaque épreuve dans team.runned_epreuve_courses_list, vérifie que toutes les badgeuses de l'épreuve sont présentes dans team.bips_CN, le bon nombre de fois (ignore la badgeuse -1 de mass_start).\n
+        bips_counts (voir get_bips_counts) évite de recompter les bips s'il est déjà calculé.\n
+        Retourne True si une badgeuse n'a pas été bipée, False sinon.
+        """
+
+        if bips_counts is None:
+            bips_counts = self.get_bips_counts()
         missing_bip = False
-        
-        for epreuve_dict in self.runned_epreuve_courses_list:
 
-            # Récupération des badgeuses bipées par l'équipe, avec répétition si badgées plusieurs fois
-            transit_times_list = self.get_CN_columns()
-            
-            epreuve: EpreuveCourse = epreuve_dict['epreuve_course']
-            for poincon in epreuve.badgeuses_list:
-                # Ignore la badgeuse -1 (mass_start), qui n'a pas encore été ajoutée avec son temps aux données de l'équipe au moment de l'appel de cette méthode.
-                if poincon.badgeuse == -1: continue
-
-                if poincon.badgeuse in transit_times_list:
-                    transit_times_list.remove(poincon.badgeuse)
-                else:
-                    missing_bip = True
-                    self.missing_bips.append(epreuve)
-                    print(f"/!\\ {self.team_name} ({self.puce}) a couru l'épreuve {epreuve.name} mais n'a pas (re?)bipé la badgeuse {poincon.badgeuse} !")
+        for course_result in self.runned_epreuve_courses_list:
+            epreuve: EpreuveCourse = course_result.epreuve_course
+            for poincon in segmentation_engine.get_missing_poincons(segmentation_engine.get_epreuve_idx(epreuve), bips_counts):
+                missing_bip = True
+                self.missing_bips.add(epreuve)
+                logging.warning("%s (%s) a couru l'épreuve %s mais n'a pas (re?)bipé la badgeuse %s !", self.team_name, self.puce, epreuve.name, poincon.badgeuse)
 
         # Permet de stopper le programme si une équipe n'a pas bipé une badgeuse de l'épreuve, une fois que toutes les badgeuses manquantes de toutes les équipes ont été détectées.
         return missing_bip
@@ -114,86 +164,71 @@ class Team:
         pass
     
 
-    def aggregate_transit_times_by_epreuve(self, epreuve_to_aggregate: EpreuveCourse):
+    def aggregate_transit_times_by_epreuves(self, segmentation_engine: SegmentationEngine):
         """
-        Affecte les temps de transit_times aux épreuves correspondantes.
-
-        /!\ BUG S'IL Y A DES BADGEUSES NO BIPEES SUR LE PARCOURS. IL FAUT AJOUTER LES TEMPS NON BIPES AU BON ENDROIT ET PAS EN FIN DE LIGNE DU CSV.
+        Affecte les temps de bips_times aux épreuves courues, en un seul parcours des bips (voir SegmentationEngine).\n
+        Remplit les poinçons et heures de bip de chaque CourseResult de runned_epreuve_courses_list et garde les badgeuses sautées et bips en trop dans bip_anomalies.
         """
+        logging.debug("%s: Regroupement des poinçons par épreuve...", self)
+
+        runned_epreuves = [course_result.epreuve_course for course_result in self.runned_epreuve_courses_list]
+        segmentation = segmentation_engine.segment(self.bips_CN, self.bips_times, runned_epreuves)
+
+        for course_result in self.runned_epreuve_courses_list:
+            epreuve_idx = segmentation_engine.get_epreuve_idx(course_result.epreuve_course)
+            course_result.set_poincons_times(segmentation.poincons_times[epreuve_idx])
 
-        for epreuve_dict in self.runned_epreuve_courses_list:
-            if epreuve_dict['epreuve_course'] == epreuve_to_aggregate:
-                logging.debug(f"{self}: Regroupement des poinçons de {epreuve_to_aggregate.name}...")
-                
-                epreuve_dict['poincons_times']: list[tuple[Poincon, str]] = []
-
-                epreuve: EpreuveCourse = epreuve_dict['epreuve_course']
-
-                CN_list = self.get_CN_columns()
-                bip_time_list = self.get_time_columns()
-
-                badgeuse_idx = 0
-                while badgeuse_idx < len(epreuve.badgeuses_list):
-
-                    if CN_list[0] == epreuve.badgeuses_list[badgeuse_idx].badgeuse:
-                        CN_list.pop(0)
-                        bip_time = bip_time_list.pop(0)
-                        epreuve_dict['poincons_times'].append((epreuve.badgeuses_list[badgeuse_idx], bip_time))
-                        logging.debug(f"[{self.dossard}] a bipé {epreuve.badgeuses_list[badgeuse_idx]} à {bip_time}")
-                        badgeuse_idx += 1
-                    else:
-                        CN_list.pop(0)
-                        bip_time_list.pop(0)
+            # Boucle uniquement pour les logs : sautée si le niveau DEBUG n'est pas affiché
+            if logging.root.isEnabledFor(logging.DEBUG):
+                for poincon, bip_time in segmentation.poincons_times[epreuve_idx]:
+                    logging.debug("[%s] a bipé %s à %s", self.dossard, poincon, seconds_to_hms(bip_time))
+
+        self.bip_anomalies = segmentation.anomalies
+        for anomaly in self.bip_anomalies:
+            logging.warning("[%s] %s", self.dossard, anomaly)
         
         self.check_depart_gel_degel_fin()
 
 
-    def calculate_epreuve_course_times(self, epreuve_to_calculate: EpreuveCourse):
-        """Calcule les temps mis par l'équipe sur une course."""
+    def calculate_courses_times(self):
+        """Calcule les temps mis par l'équipe sur chacune de ses courses courues, en un seul parcours de runned_epreuve_courses_list."""
+        for course_result in self.runned_epreuve_courses_list:
+            self.calculate_course_result_times(course_result)
+
 
-        for epreuve_course_dict in self.runned_epreuve_courses_list:
-            if epreuve_course_dict['epreuve_course'] == epreuve_to_calculate:
-                logging.debug(f"{self}: Calcul des temps courus sur {epreuve_to_calculate.name}...")
+    def calculate_course_result_times(self, course_result: CourseResult):
+        """Calcule les segments, le temps total et le temps MG d'une course courue, à partir de ses poinçons et heures de bip."""
 
-                epreuve_course_dict['elementary_times']: list[tuple[float, Poincon,  Poincon]] = []    # Stocke les temps mis entre deux badgeuses sous la forme
-                
-                poincon_time_list: list[tuple[Poincon, str]] = epreuve_course_dict['poincons_times']
-                # Sécurité non nécessaire après le check_depart_gel_degel_fin() mais qui a le mérite d'exister 
-                # if (len(times_dict_list) % 2) != 0: raise OddNumberOfBipsError(self.team_name, epreuve_course_dict['epreuve_course'].name)
+        epreuve_to_calculate = course_result.epreuve_course
+        logging.debug("%s: Calcul des temps courus sur %s...", self, epreuve_to_calculate.name)
 
-                for i in range(0, len(poincon_time_list)):
+        # Sécurité non nécessaire après le check_depart_gel_degel_fin() mais qui a le mérite d'exister 
+        # if (len(times_dict_list) % 2) != 0: raise OddNumberOfBipsError(self.team_name, course_result.epreuve_course.name)
 
-                    poincon, time = poincon_time_list[i]
-                    if poincon.role != 'fin':   # Evite une erreur d'indice out of bound
-                        poincon_next, time_next = poincon_time_list[i+1]
+        poincons = course_result.poincons
 
-                    if poincon.role in ['gel', 'fin']:
-                        continue
-                    
-                    else:
-                        first_time = datetime.strptime(time, "%H:%M:%S")
-                        second_time = datetime.strptime(time_next, "%H:%M:%S")
+        # Un segment part de chaque poinçon qui n'est ni un gel ni une fin et va jusqu'au poinçon suivant
+        course_result.segment_starts = np.array([i for i, poincon in enumerate(poincons[:-1]) if poincon.role not in ('gel', 'fin')], dtype='int32')
+        course_result.elementary_times = np.diff(course_result.bip_times)[course_result.segment_starts]
 
-                        elementary_time = second_time - first_time
-                        
-                        # Stocke sous la forme (temps entre P1 et P2, P1, P2)
-                        epreuve_course_dict['elementary_times'].append((elementary_time.total_seconds(), poincon, poincon_next))
-                        logging.debug(f"[{self.dossard}] a mis {elementary_time.total_seconds()}s entre {poincon} et {poincon_next}.")
+        if logging.root.isEnabledFor(logging.DEBUG):
+            for i, elementary_time in zip(course_result.segment_starts.tolist(), course_result.elementary_times.tolist()):
+                logging.debug("[%s] a mis %ss entre %s et %s.", self.dossard, elementary_time, poincons[i], poincons[i+1])
 
 
-                # Calcul du temps total sur l'épreuve
-                epreuve_course_dict['total_time']: float = sum([elementary_time[0] for elementary_time in epreuve_course_dict['elementary_times']])
-                logging.info(f"[{self.dossard}] a mis {epreuve_course_dict['total_time']}s sur {epreuve_to_calculate.name}.")
+        # Calcul du temps total sur l'épreuve
+        course_result.total_time = int(course_result.elementary_times.sum())
+        logging.info("[%s] a mis %ss sur %s.", self.dossard, course_result.total_time, epreuve_to_calculate.name)
 
-                # Calcul du temps meilleur grimpeur
-                if epreuve_to_calculate.meilleur_grimpeur:
+        # Calcul du temps meilleur grimpeur
+        if epreuve_to_calculate.meilleur_grimpeur:
 
-                    for elementary_time_tuple in epreuve_course_dict['elementary_times']:
-                        
-                        elementary_time, poincon_1, poincon_2 = elementary_time_tuple
-                        if poincon_1.is_debut_mg and poincon_2.is_fin_mg:
-                            epreuve_course_dict['mg_time'] = elementary_time
-                            logging.info(f"[{self.dossard}] a mis {elementary_time}s sur le MG.")
+            for segment in course_result.get_segments():
+                if segment.poincon_1.is_debut_mg and segment.poincon_2.is_fin_mg:
+                    course_result.mg_time = segment.elementary_time
+                    logging.info("[%s] a mis %ss sur le MG.", self.dossard, segment.elementary_time)
+            if course_result.mg_time is None:
+                logging.warning("[%s] n'a pas de segment début MG -> fin MG sur %s : pas de points MG, rapidité sur le temps total.", self.dossard, epreuve_to_calculate.name)
 
     
     def calculate_epreuves_course_points(self, show_log=False):
@@ -202,69 +237,74 @@ class Team:
         - Points bonus par badgeuse bipée
         - Points de participation à la course
         - Points de rapidité
+
+        Pour noter toutes les équipes d'un coup, voir OneDayController.calculate_scores().
         """
 
-        for epreuve_course_dict in self.runned_epreuve_courses_list:
-            epreuve: EpreuveCourse = epreuve_course_dict['epreuve_course']
-            if show_log: print(f"{self.team_name}: Calcul des points de l'épreuve {epreuve}")
-            epreuve_course_dict['points_dict'] = {}  # Stocke les points de l'épreuve
-
-            # Calcul des points de rapidité
-            points_rapidite = 0
-            ref_time = epreuve.reference_time*60    # Conversion min -> s
-
-            if not epreuve.meilleur_grimpeur:
-                # Ajout des bonus
-                if epreuve_course_dict['total_time'] < ref_time:
-                    points_rapidite += (ref_time - epreuve_course_dict['total_time'])/60 * epreuve.gain_per_minute
-                # Ajout des malus
-                if epreuve_course_dict['total_time'] > ref_time:
-                    points_rapidite -= (epreuve_course_dict['total_time'] - ref_time)/60 * epreuve.loss_per_minute
-            
-            else:
-                without_mg_time = epreuve_course_dict['total_time'] - epreuve_course_dict['mg_time']
-                # Ajout des bonus
-                if without_mg_time < ref_time:
-                    points_rapidite += (ref_time - without_mg_time)/60 * epreuve.gain_per_minute
-                # Ajout des malus
-                if without_mg_time > ref_time:
-                    points_rapidite -= (without_mg_time - ref_time)/60 * epreuve.loss_per_minute
-
-                # Ajout des points meilleur grimpeur
-                points_mg = 0
-                mg_ref_time, mg_gain_per_minute , mg_loss_per_minute = epreuve.meilleur_grimpeur['reference_time']*60, epreuve.meilleur_grimpeur['gain_per_minute'], epreuve.meilleur_grimpeur['loss_per_minute']
-                
-                if epreuve_course_dict['mg_time'] < mg_ref_time:
-                    points_mg += (mg_ref_time - epreuve_course_dict['mg_time'])/60 * mg_gain_per_minute
-                if epreuve_course_dict['mg_time'] > mg_ref_time:
-                    points_mg -= (epreuve_course_dict['mg_time'] - mg_ref_time)/60 * mg_loss_per_minute
-                
-                epreuve_course_dict['points_dict']['points_mg'] = points_mg
-
-            # Ajout des différents types de points
-            epreuve_course_dict['points_dict']['points_bip'] = sum([badgeuse[0].bonus_points for badgeuse in epreuve_course_dict['poincons_times']])
-            epreuve_course_dict['points_dict']['points_participation'] = epreuve.participation_points
-            epreuve_course_dict['points_dict']['points_rapidite'] = points_rapidite
+        epreuves_courses = [course_result.epreuve_course for course_result in self.runned_epreuve_courses_list]
+        if show_log: logging.info("%s: Calcul des points des épreuves %s", self.team_name, epreuves_courses)
+
+        # Une ligne (l'équipe), une colonne par course courue
+        total_times, mg_times, bip_points = self.get_courses_scoring_inputs()
+        course_points = score_courses(total_times[np.newaxis, :], mg_times[np.newaxis, :], bip_points[np.newaxis, :], np.ones((1, len(epreuves_courses)), dtype=bool),
+                                      CourseScoringParameters.from_epreuves(epreuves_courses))
+
+        self.store_courses_points(course_points, 0, list(range(len(epreuves_courses))))
+
+
+    def get_courses_scoring_inputs(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Renvoie les vecteurs (temps total, temps MG, points de bips) des courses courues, dans l'ordre de runned_epreuve_courses_list.
+        Le temps MG vaut 0 pour une course sans MG, et NaN pour une course avec MG dont l'équipe n'a pas de temps MG (voir score_courses).
+        """
+
+        total_times = np.array([course_result.total_time for course_result in self.runned_epreuve_courses_list], dtype='float64')
+        mg_times = np.array([(np.nan if course_result.mg_time is None else course_result.mg_time) if course_result.epreuve_course.meilleur_grimpeur else 0.0
+                             for course_result in self.runned_epreuve_courses_list], dtype='float64')
+        bip_points = np.array([course_result.get_bip_points() for course_result in self.runned_epreuve_courses_list], dtype='float64')
+        return total_times, mg_times, bip_points
+
+
+    def store_courses_points(self, course_points: CoursePoints, row: int, columns: list[int]):
+        """
+        Recopie dans les CourseResult de runned_epreuve_courses_list les points calculés par score_courses().\n
+        row est la ligne de l'équipe dans les matrices de course_points, columns la colonne de chaque course de runned_epreuve_courses_list.
+        """
+
+        for course_result, column in zip(self.runned_epreuve_courses_list, columns):
+            course_result.points_mg = float(course_points.points_mg[row, column])
+            course_result.points_bip = float(course_points.points_bip[row, column])
+            course_result.points_participation = float(course_points.points_participation[row, column])
+            course_result.points_rapidite = float(course_points.points_rapidite[row, column])
 
             # Points totaux sur la course
-            epreuve_course_dict['total_points'] = sum(epreuve_course_dict['points_dict'].values())
+            course_result.total_points = float(course_points.total_points[row, column])
 
 
     def calculate_total_points(self):
         
-        self.courses_total_time = sum([course['total_time'] for course in self.runned_epreuve_courses_list])
-        self.courses_points = sum([course['total_points'] for course in self.runned_epreuve_courses_list])
+        self.courses_total_time = sum([course.total_time for course in self.runned_epreuve_courses_list])
+        self.courses_points = sum([course.total_points for course in self.runned_epreuve_courses_list])
 
         # Dont points de MG, qui sont en réalité déjà comptés dans les points totaux
-        for epreuve_course_dict in self.runned_epreuve_courses_list:
-            if epreuve_course_dict['epreuve_course'].meilleur_grimpeur:
-                self.mg_time += epreuve_course_dict['mg_time']
-                self.mg_points += epreuve_course_dict['points_dict']['points_mg']
+        self.mg_time = 0.0
+        self.mg_points = 0.0
+        for course_result in self.runned_epreuve_courses_list:
+            # Course avec MG sans temps MG (pas de segment début MG -> fin MG) : rien à ajouter
+            if course_result.epreuve_course.meilleur_grimpeur and course_result.mg_time is not None:
+                self.mg_time += course_result.mg_time
+                self.mg_points += course_result.points_mg
         
-        self.actis_points = sum([acti['participation_points']+acti['ranking_points'] for acti in self.epreuve_actis_list])
+        self.actis_points = sum([acti.participation_points+acti.ranking_points for acti in self.epreuve_actis_list])
         self.total_points = self.courses_points + self.actis_points
 
 
+    def get_day_result(self) -> TeamDayResult:
+        """Renvoie les totaux de l'équipe sur la journée, une fois calculate_total_points() appelée."""
+        return TeamDayResult(self.dossard, self.puce, self.team_name, self.mixite, self.ent,
+                             self.courses_total_time, self.courses_points, self.mg_time, self.mg_points, self.actis_points, self.total_points, len(self.imputed_bips))
+
+
     def check_depart_gel_degel_fin(self):
         pass
     
@@ -273,10 +313,9 @@ class Team:
     # DEPRECATED
     def get_badgeuses(self):
         """
-        Renvoie la liste des badgeuses bipées par l'équipe, d'après team.transit_times.\n
-        Garde les colonnes 'Record x CN' de team.transit_times.
+        Renvoie les badgeuses bipées par l'équipe, d'après team.bips_CN.
         """
-        return self.transit_times.loc[self.transit_times.index.str.contains('CN')].astype('int64')
+        return self.bips_CN
 
 
 
@@ -0,0 +1,169 @@
+import numpy as np
+
+from models.scoring import CourseScoringParameters, score_courses
+
+
+class ParameterScenario:
+    """
+    Jeu de paramètres de notation à tester, décrit par ses différences avec les paramètres de la journée.
+
+    Attributes:
+        name (str): Nom du scénario.
+        overrides (list[tuple[str, str, float]]): Triplets (nom de la course, paramètre, valeur). Le paramètre est une colonne du fichier d'épreuves
+            (voir PARAMETERS) ; pour la portion meilleur grimpeur d'une course, le nom de la course est suivi de " meilleur grimpeur", comme dans le fichier d'épreuves.
+    """
+
+    # Colonne du fichier d'épreuves -> (attribut de CourseScoringParameters pour la course, attribut pour sa portion MG)
+    PARAMETERS = {
+        'temps_ref': ('reference_times', 'mg_reference_times'),
+        'points_gain_min': ('gains_per_minute', 'mg_gains_per_minute'),
+        'points_perte_min': ('losses_per_minute', 'mg_losses_per_minute'),
+        'points': ('participation_points', None),
+    }
+    MG_SUFFIX = " meilleur grimpeur"
+
+    def __init__(self, name: str, overrides: list[tuple[str, str, float]]|None = None):
+        self.name = name
+        self.overrides = overrides or []
+
+    def __repr__(self):
+        return f"ParameterScenario({self.name}, {len(self.overrides)} paramètre(s) modifié(s))"
+
+
+    def apply(self, parameters: CourseScoringParameters, courses_names: list[str]) -> CourseScoringParameters:
+        """Renvoie une copie de parameters (alignés sur courses_names) avec les valeurs du scénario."""
+
+        scenario_parameters = parameters.copy()
+        columns = {name: column for column, name in enumerate(courses_names)}
+
+        for course_name, parameter, value in self.overrides:
+            if parameter not in self.PARAMETERS:
+                raise UnknownScenarioParameterError(self.name, parameter, list(self.PARAMETERS))
+
+            is_mg = course_name.endswith(self.MG_SUFFIX)
+            if is_mg:
+                course_name = course_name[:-len(self.MG_SUFFIX)]
+            if course_name not in columns:
+                raise ScenarioCourseNotFoundError(self.name, course_name, courses_names)
+            column = columns[course_name]
+
+            attribute = self.PARAMETERS[parameter][1 if is_mg else 0]
+            if is_mg and (attribute is None or not scenario_parameters.has_mg[column]):
+                raise ScenarioCourseNotFoundError(self.name, course_name+self.MG_SUFFIX, courses_names)
+            getattr(scenario_parameters, attribute)[column] = value
+
+        return scenario_parameters
+
+
+class RankStability:
+    """
+    Stabilité du classement général d'un ensemble de scénarios par rapport au classement de référence.
+
+    Attributes:
+        spearman (np.ndarray): Corrélation de rang de Spearman de chaque scénario avec la référence.
+        changed_ranks (np.ndarray[int]): Nombre d'équipes dont le rang change, par scénario.
+        max_displacement (np.ndarray[int]): Plus grand écart de rang d'une équipe, par scénario.
+        top_k_overlap (np.ndarray[int]): Nombre d'équipes du top k de référence encore dans le top k, par scénario.
+        best_ranks, worst_ranks (np.ndarray[int]): Meilleur et pire rang de chaque équipe sur tous les scénarios.
+        mean_ranks (np.ndarray): Rang moyen de chaque équipe sur tous les scénarios.
+    """
+
+    def __init__(self, reference_ranks: np.ndarray, ranks: np.ndarray, k: int):
+        nb_teams = reference_ranks.shape[0]
+        displacement = ranks - reference_ranks
+
+        # Rangs sans ex aequo : formule de Spearman directe
+        self.spearman = 1 - 6*np.sum(displacement.astype('float64')**2, axis=1) / (nb_teams*(nb_teams**2 - 1)) if nb_teams > 1 else np.ones(ranks.shape[0])
+        self.changed_ranks = np.count_nonzero(displacement, axis=1)
+        self.max_displacement = np.abs(displacement).max(axis=1, initial=0)
+        self.top_k_overlap = np.count_nonzero((ranks <= k) & (reference_ranks <= k), axis=1)
+        self.best_ranks = ranks.min(axis=0, initial=nb_teams)
+        self.worst_ranks = ranks.max(axis=0, initial=0)
+        self.mean_ranks = ranks.mean(axis=0)
+
+
+class WhatIfScorer:
+    """
+    Renote une journée avec d'autres paramètres de notation, sans recalculer les temps.
+
+    Garde en mémoire les matrices (équipes x courses) de temps totaux, temps MG, points des bips et courses courues calculées par la journée,
+    et les points d'actis de chaque équipe. Tous les scénarios sont notés en une seule opération vectorisée (score_courses sur des paramètres empilés),
+    puis classés par points totaux décroissants, départagés par le temps total de course puis par dossard, comme Standings.
+
+    Attributes:
+        dossards (np.ndarray[int]): Dossard de chaque ligne des matrices.
+        courses_names (list[str]): Nom de la course de chaque colonne.
+        parameters (CourseScoringParameters): Les paramètres de la journée.
+    """
+
+    def __init__(self, dossards, courses_names: list[str], total_times: np.ndarray, mg_times: np.ndarray, bip_points: np.ndarray, has_run: np.ndarray,
+                 actis_points, courses_total_times, parameters: CourseScoringParameters):
+        self.dossards = np.asarray(dossards)
+        self.courses_names = courses_names
+        self.total_times = total_times
+        self.mg_times = mg_times
+        self.bip_points = bip_points
+        self.has_run = has_run
+        self.actis_points = np.asarray(actis_points, dtype='float64')
+        self.courses_total_times = np.asarray(courses_total_times, dtype='float64')
+        self.parameters = parameters
+
+        # Ordre de départage, indépendant des paramètres : temps total de course croissant, puis dossard
+        self._tie_break_order = np.lexsort((self.dossards, self.courses_total_times))
+
+
+    def score(self, scenarios: list[ParameterScenario]) -> np.ndarray:
+        """Renvoie les points totaux de chaque équipe (colonnes) pour chaque scénario (lignes)."""
+
+        if not scenarios:
+            return np.zeros((0, len(self.dossards)))
+
+        stacked_parameters = CourseScoringParameters.stack([scenario.apply(self.parameters, self.courses_names) for scenario in scenarios])
+        course_points = score_courses(self.total_times, self.mg_times, self.bip_points, self.has_run, stacked_parameters)
+        return course_points.total_points.sum(axis=2) + self.actis_points
+
+
+    def rank(self, total_points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Classe les équipes pour chaque ligne de total_points.\n
+        Renvoie (orders, ranks) : orders[s] donne les indices des équipes dans l'ordre du classement, ranks[s, i] le rang (à partir de 1) de l'équipe i.
+        """
+
+        total_points = np.atleast_2d(total_points)
+        # Tri stable sur les points, après tri sur le départage : les ex aequo restent dans l'ordre de départage
+        orders = self._tie_break_order[np.argsort(-total_points[:, self._tie_break_order], axis=1, kind='stable')]
+        ranks = np.empty_like(orders)
+        np.put_along_axis(ranks, orders, np.arange(1, orders.shape[1]+1), axis=1)
+        return orders, ranks
+
+
+    def get_rankings(self, scenarios: list[ParameterScenario]) -> dict[str, list[tuple[int, float]]]:
+        """Renvoie le classement général de chaque scénario, en couples (dossard, points totaux), par nom de scénario."""
+
+        total_points = self.score(scenarios)
+        orders, _ = self.rank(total_points)
+        return {scenario.name: list(zip(self.dossards[order].tolist(), total_points[s, order].tolist())) for s, (scenario, order) in enumerate(zip(scenarios, orders))}
+
+
+    def get_rank_stability(self, scenarios: list[ParameterScenario], k: int = 10) -> RankStability:
+        """Compare le classement de chaque scénario à celui des paramètres de la journée."""
+
+        total_points = self.score([ParameterScenario('reference')] + scenarios)
+        _, ranks = self.rank(total_points)
+        return RankStability(ranks[0], ranks[1:], k)
+
+
+
+#########################
+### Classes d'Erreurs ###
+#########################
+
+class UnknownScenarioParameterError(Exception):
+    def __init__(self, scenario_name, parameter, parameters, *args, **kwargs):
+        message = f"Scénario {scenario_name} : le paramètre {parameter} n'existe pas. Paramètres modifiables : {parameters}"
+        super().__init__(message, *args, **kwargs)
+
+class ScenarioCourseNotFoundError(Exception):
+    def __init__(self, scenario_name, course_name, courses_names, *args, **kwargs):
+        message = f"Scénario {scenario_name} : la course {course_name} n'existe pas (ou n'a pas de portion meilleur grimpeur). Courses de la journée : {courses_names}"
+        super().__init__(message, *args, **kwargs)
@@ -0,0 +1,18 @@
+import json
+import shutil
+
+import pytest
+
+
+@pytest.fixture
+def day_repository(tmp_path) -> str:
+    """Copie de la journée J1 dans tmp_path, avec un initialisation.json qui pointe vers la copie."""
+
+    shutil.copytree('DAYS/J1', tmp_path / 'J1')
+    with open('DAYS/J1/initialisation.json') as json_file:
+        initialisation = json.load(json_file)
+    for key in ('teams_excel', 'doigts_csv', 'actis_excel', 'epreuves_excel', 'badgeuses_excel'):
+        initialisation[key] = str(tmp_path / initialisation[key].replace('DAYS/', '', 1))
+    with open(tmp_path / 'J1' / 'initialisation.json', 'w') as json_file:
+        json.dump(initialisation, json_file)
+    return str(tmp_path / 'J1') + '/'
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas
+import pytest
+
+from models.bips_table import (BipsTable, parse_hms_to_seconds, parse_dow_to_numbers, find_race_day, dow_numbers_to_days, seconds_to_hms,
+                               DOW_NUMBERS, SECONDS_PER_DAY)
+
+
+def test_parse_hms_fixed_width():
+    seconds = parse_hms_to_seconds(['00:00:00', '08:05:03', '23:59:59'])
+    assert seconds.dtype == np.int32
+    assert seconds.tolist() == [0, 8*3600 + 5*60 + 3, SECONDS_PER_DAY - 1]
+
+
+def test_parse_hms_variable_width():
+    # Heures sans zéro en tête : lecture par découpage plutôt que par codes de caractères
+    assert parse_hms_to_seconds(['8:05:03', '10:00:00']).tolist() == [8*3600 + 5*60 + 3, 36000]
+
+
+def test_parse_hms_rejects_non_digits():
+    # Huit caractères avec les ':' en place, mais pas que des chiffres : lecture par pandas, pas une heure fausse
+    assert parse_hms_to_seconds([' 9:05:03', '10:00:00']).tolist() == [9*3600 + 5*60 + 3, 36000]
+    with pytest.raises(ValueError):
+        parse_hms_to_seconds(['1a:05:03'])
+
+
+def test_parse_hms_empty():
+    seconds = parse_hms_to_seconds([])
+    assert len(seconds) == 0 and seconds.dtype == np.int32
+
+
+def test_parse_dow_single_day():
+    dow_numbers = parse_dow_to_numbers(['Sa', 'Sa'])
+    assert find_race_day(dow_numbers) == DOW_NUMBERS['Sa']
+    assert dow_numbers_to_days(dow_numbers, DOW_NUMBERS['Sa']).tolist() == [0, 0]
+
+
+def test_parse_dow_after_midnight():
+    dow_numbers = parse_dow_to_numbers(['Sa', 'Sa', 'Su', 'Su'])
+    assert find_race_day(dow_numbers) == DOW_NUMBERS['Sa']
+    assert dow_numbers_to_days(dow_numbers, DOW_NUMBERS['Sa']).tolist() == [0, 0, 1, 1]
+
+
+def test_parse_dow_across_the_end_of_the_week():
+    # Dimanche -> lundi : le jour de course est le dimanche, même si lundi vient avant dans la semaine
+    dow_numbers = parse_dow_to_numbers(['Mo', 'Su', 'Mo'])
+    assert find_race_day(dow_numbers) == DOW_NUMBERS['Su']
+    assert dow_numbers_to_days(dow_numbers, DOW_NUMBERS['Su']).tolist() == [1, 0, 1]
+
+
+def test_parse_dow_known_race_day():
+    # Doigts déchargés après minuit, lus seuls en mode incrémental : le jour de course vient de la lecture complète
+    dow_numbers = parse_dow_to_numbers(['Su', 'Su'])
+    assert dow_numbers_to_days(dow_numbers, DOW_NUMBERS['Sa']).tolist() == [1, 1]
+
+
+def test_parse_dow_unreadable_and_lowercase():
+    dow_numbers = parse_dow_to_numbers(['sat', None, '', 'Sunday'])
+    assert dow_numbers.tolist() == [DOW_NUMBERS['Sa'], -1, -1, DOW_NUMBERS['Su']]
+    assert dow_numbers_to_days(dow_numbers, find_race_day(dow_numbers)).tolist() == [0, 0, 0, 1]
+
+    unreadable = parse_dow_to_numbers(['??'])
+    assert find_race_day(unreadable) is None
+    assert dow_numbers_to_days(unreadable, None).tolist() == [0]
+
+
+def test_parse_dow_empty():
+    dow_numbers = parse_dow_to_numbers([])
+    assert find_race_day(dow_numbers) is None
+    assert len(dow_numbers_to_days(dow_numbers, None)) == 0
+
+
+def test_seconds_to_hms():
+    assert seconds_to_hms(3723) == '01:02:03'
+    assert seconds_to_hms(SECONDS_PER_DAY + 3600) == '01:00:00+1'
+
+
+def make_datas_graid(rows: list[tuple[int, list[tuple[int, str, str]]]], nb_records: int = 3) -> pandas.DataFrame:
+    """DataFrame au format large de datas_graid.csv : (SIID, [(CN, DOW, time), ...]) par ligne."""
+
+    records = []
+    for no, (siid, bips) in enumerate(rows, start=1):
+        record = {'No': no, 'SIID': siid, 'No. of records': len(bips)}
+        for x in range(1, nb_records+1):
+            cn, dow, time = bips[x-1] if x <= len(bips) else (np.nan, None, None)
+            record.update({f'Record {x} CN': cn, f'Record {x} DOW': dow, f'Record {x} time': time})
+        records.append(record)
+    return pandas.DataFrame(records)
+
+
+def test_from_datas_graid_keeps_times_increasing_past_midnight():
+    df = make_datas_graid([(20, [(31, 'Sa', '23:50:00'), (32, 'Su', '00:10:00')]), (10, [(31, 'Sa', '22:00:00')])])
+    bips = BipsTable.from_datas_graid(df)
+
+    assert bips.siids.tolist() == [10, 20]
+    CN, seconds = bips.get_bips(20)
+    assert CN.tolist() == [31, 32]
+    assert seconds.tolist() == [23*3600 + 50*60, SECONDS_PER_DAY + 10*60]
+    assert bips.get_nb_records_declared(10) == 1
+    assert bips.get_bips(99) is None
+
+
+def test_from_datas_graid_keeps_last_read_of_a_doigt():
+    df = make_datas_graid([(10, [(31, 'Sa', '10:00:00')]), (10, [(31, 'Sa', '10:00:00'), (32, 'Sa', '10:30:00')])])
+    CN, _ = BipsTable.from_datas_graid(df).get_bips(10)
+    assert CN.tolist() == [31, 32]
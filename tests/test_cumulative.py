@@ -0,0 +1,44 @@
+import logging
+
+from models.cumulative import CumulativeStandings
+from models.results import DayResult, TeamDayResult
+
+
+def make_result(dossard: int, puce: int, team_name: str, total_points: float) -> TeamDayResult:
+    return TeamDayResult(dossard, puce, team_name, 'H', False, 3600.0, total_points, 0.0, 0.0, 0.0, total_points)
+
+
+def test_teams_are_summed_by_dossard():
+    cumulative = CumulativeStandings([
+        DayResult(1, [make_result(1, 100, 'Alpha', 10), make_result(2, 200, 'Beta', 20)]),
+        DayResult(2, [make_result(1, 100, 'Alpha', 5)]),
+    ])
+
+    assert cumulative.teams[1].total_points == 15
+    assert cumulative.teams[1].days == [1, 2]
+    assert cumulative.teams[2].days == [1]
+
+    cumulative.set_day(DayResult(2, [make_result(1, 100, 'Alpha', 30)]))
+    assert cumulative.teams[1].total_points == 40
+    assert cumulative.standings.get_rank(1) == 1
+
+
+def test_reassigned_puce_does_not_merge_teams(caplog):
+    cumulative = CumulativeStandings([DayResult(1, [make_result(1, 100, 'Alpha', 10)])])
+
+    with caplog.at_level(logging.WARNING):
+        cumulative.set_day(DayResult(2, [make_result(7, 100, 'Gamma', 25)]))
+        cumulative.set_day(DayResult(2, [make_result(7, 100, 'Gamma', 25)]))
+
+    assert cumulative.teams[1].total_points == 10
+    assert cumulative.teams[7].total_points == 25
+    assert cumulative.teams[7].team_name == 'Gamma'
+    assert sum('puce 100' in record.getMessage() for record in caplog.records) == 1
+
+
+def test_removed_day_drops_its_teams():
+    cumulative = CumulativeStandings([DayResult(1, [make_result(1, 100, 'Alpha', 10)]), DayResult(2, [make_result(2, 200, 'Beta', 20)])])
+
+    cumulative.remove_day(2)
+    assert 2 not in cumulative.teams
+    assert len(cumulative.standings) == 1
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from controllers.onedaycontroller import OneDayController
+from models.epreuve import EpreuveCourse
+from models.imputation import MissingBipsImputer
+from models.poincon import Poincon
+from models.results import CourseResult
+from models.segment_statistics import SegmentStatisticsAccumulator
+from models.team import Team
+
+
+def make_epreuve(nb_poincons: int) -> EpreuveCourse:
+    epreuve = EpreuveCourse(0, 'Obli 1', 10.0, 60.0, 0.5, 0.25, 'Obli')
+    epreuve.badgeuses_list = [Poincon(i, epreuve, f'S{i}', 30 + i, '', 0.0) for i in range(nb_poincons)]
+    return epreuve
+
+
+def make_course_result(epreuve: EpreuveCourse, positions: list[int], bip_times: list[int]) -> CourseResult:
+    return CourseResult(epreuve, [epreuve.badgeuses_list[position] for position in positions], np.array(bip_times, dtype='int32'))
+
+
+def make_statistics(epreuve: EpreuveCourse, elementary_times: list[int]) -> SegmentStatisticsAccumulator:
+    statistics = SegmentStatisticsAccumulator()
+    statistics.add_course_result(make_course_result(epreuve, list(range(len(epreuve.badgeuses_list))), np.cumsum([0] + elementary_times)))
+    return statistics
+
+
+def test_gap_is_split_by_segment_means():
+    epreuve = make_epreuve(4)
+    course_result = make_course_result(epreuve, [0, 3], [1000, 1600])
+
+    imputed = MissingBipsImputer(make_statistics(epreuve, [100, 200, 300])).impute_course(course_result)
+
+    assert imputed == [(1, 1100, MissingBipsImputer.SEGMENT_MEANS), (2, 1300, MissingBipsImputer.SEGMENT_MEANS)]
+    assert course_result.bip_times.tolist() == [1000, 1100, 1300, 1600]
+    assert course_result.imputed.tolist() == [False, True, True, False]
+
+
+def test_without_means_gaps_are_linear_and_ends_anchored():
+    epreuve = make_epreuve(5)
+    course_result = make_course_result(epreuve, [1, 3], [1000, 1400])
+
+    imputed = MissingBipsImputer(SegmentStatisticsAccumulator()).impute_course(course_result)
+
+    assert imputed == [(0, 1000, MissingBipsImputer.ANCHOR), (2, 1200, MissingBipsImputer.LINEAR), (4, 1400, MissingBipsImputer.ANCHOR)]
+
+
+def test_ends_are_extrapolated_with_segment_means():
+    epreuve = make_epreuve(4)
+    course_result = make_course_result(epreuve, [1, 2], [1000, 1150])
+
+    imputed = MissingBipsImputer(make_statistics(epreuve, [100, 200, 300])).impute_course(course_result)
+
+    assert imputed == [(0, 900, MissingBipsImputer.SEGMENT_MEANS), (3, 1450, MissingBipsImputer.SEGMENT_MEANS)]
+
+
+def test_statistics_only_use_complete_courses():
+    epreuve = make_epreuve(3)
+    complete_team = Team(1, 1, False, 'H', 'Complète', [], '')
+    complete_team.runned_epreuve_courses_list = [make_course_result(epreuve, [0, 1, 2], [0, 100, 300])]
+    incomplete_team = Team(2, 2, False, 'H', 'Incomplète', [], '')
+    incomplete_team.runned_epreuve_courses_list = [make_course_result(epreuve, [0, 1], [0, 900])]
+    incomplete_team.missing_bips = {epreuve}
+
+    controller = SimpleNamespace(teams_list=[complete_team, incomplete_team], segment_statistics=SegmentStatisticsAccumulator())
+    OneDayController.collect_segment_statistics(controller)
+
+    assert controller.segment_statistics.get_mean_times(epreuve).tolist() == [100.0, 200.0]
+    assert controller.segment_statistics.get_nb_teams(epreuve) == 1
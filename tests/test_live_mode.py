@@ -0,0 +1,116 @@
+import csv
+import io
+
+from controllers.onedaycontroller import OneDayController
+from data_collectors.datas_graid_collector import DatasGraidCollector
+from models.bips_table import SECONDS_PER_DAY
+
+
+GRAID_HEADER = ['No', 'SIID', 'No. of records'] + [f'Record {x} {field}' for x in (1, 2) for field in ('CN', 'DOW', 'time')]
+
+
+def write_graid_rows(path, rows: list[list], mode: str = 'w'):
+    with open(path, mode, newline='') as file:
+        writer = csv.writer(file, delimiter=';', lineterminator='\n')
+        if mode == 'w':
+            writer.writerow(GRAID_HEADER)
+        writer.writerows(rows)
+
+
+def test_rows_downloaded_after_midnight_keep_the_race_day(tmp_path):
+    path = tmp_path / 'datas_graid.csv'
+    write_graid_rows(path, [[1, 101, 2, 31, 'Sa', '23:50:00', 32, 'Su', '00:20:00'],
+                            [2, 102, 1, 31, 'Sa', '22:00:00', '', '', '']])
+    collector = DatasGraidCollector(str(path))
+
+    # Doigt déchargé après minuit : tous ses bips sont du dimanche, le lendemain du jour de course
+    write_graid_rows(path, [[3, 103, 2, 31, 'Su', '00:05:00', 32, 'Su', '00:40:00']], mode='a')
+    new_bips = collector.read_new_rows()
+    _, live_seconds = new_bips.get_bips(103)
+
+    assert live_seconds.tolist() == [SECONDS_PER_DAY + 5*60, SECONDS_PER_DAY + 40*60]
+    _, full_seconds = DatasGraidCollector(str(path)).bips.get_bips(103)
+    assert live_seconds.tolist() == full_seconds.tolist()
+
+
+def test_race_day_comes_from_the_first_rows_of_an_empty_file(tmp_path):
+    path = tmp_path / 'datas_graid.csv'
+    write_graid_rows(path, [])
+    collector = DatasGraidCollector(str(path))
+    assert collector.race_day is None
+
+    write_graid_rows(path, [[1, 101, 2, 31, 'Sa', '23:50:00', 32, 'Su', '00:20:00']], mode='a')
+    collector.read_new_rows()
+    write_graid_rows(path, [[2, 102, 1, 31, 'Su', '00:30:00', '', '', '']], mode='a')
+    _, seconds = collector.read_new_rows().get_bips(102)
+    assert seconds.tolist() == [SECONDS_PER_DAY + 30*60]
+
+
+def read_graid_lines(day_repository: str) -> tuple[str, list[str]]:
+    path = day_repository + 'TDJ2024_datas_graid.csv'
+    with open(path, encoding='latin-1') as file:
+        lines = file.read().splitlines()
+    return path, lines
+
+
+def get_results(odc: OneDayController) -> dict[int, tuple[float, float]]:
+    return {team.dossard: (round(team.total_points, 6), team.courses_total_time) for team in odc.get_day_result().teams}
+
+
+def test_live_updates_match_a_full_recompute(day_repository):
+    path, lines = read_graid_lines(day_repository)
+    header, rows = lines[0], lines[1:]
+
+    # Début de journée : la moitié des doigts déchargés
+    with open(path, 'w', encoding='latin-1') as file:
+        file.write('\n'.join([header] + rows[:60]) + '\n')
+    odc = OneDayController(day_repository, 1)
+    odc.run()
+
+    # Le reste des doigts, puis un doigt redéchargé
+    with open(path, 'a', encoding='latin-1') as file:
+        file.write('\n'.join(rows[60:] + rows[:1]) + '\n')
+    updated_teams = odc.update_from_new_doigts()
+    assert len(updated_teams) == len(rows) - 60 + 1
+
+    full = OneDayController(day_repository, 1)
+    full.run()
+    assert get_results(odc) == get_results(full)
+    assert [(rank, entry.dossard) for rank, entry in odc.standings.get_ranking()] == [(rank, entry.dossard) for rank, entry in full.standings.get_ranking()]
+
+
+def test_incomplete_redownload_removes_the_team_from_the_standings(day_repository):
+    path, lines = read_graid_lines(day_repository)
+    odc = OneDayController(day_repository, 1)
+    odc.run()
+
+    # Même doigt redéchargé sans son premier bip
+    row = next(csv.reader(io.StringIO(lines[1]), delimiter=';'))
+    header = next(csv.reader(io.StringIO(lines[0]), delimiter=';'))
+    for field in ('CN', 'DOW', 'time'):
+        row[header.index(f'Record 1 {field}')] = ''
+    team = odc.registry.find_team_from_puce(int(row[header.index('SIID')]))
+    assert team.dossard in odc.standings.entries_by_dossard
+
+    # La dernière ligne du fichier, sans retour à la ligne, est relue une fois terminée
+    with open(path, 'a', encoding='latin-1', newline='') as file:
+        file.write('\n')
+        csv.writer(file, delimiter=';', lineterminator='\n').writerow(row)
+    assert team in odc.update_from_new_doigts()
+
+    assert team.dossard not in odc.standings.entries_by_dossard
+    assert team.dossard not in get_results(odc)
+    assert odc.ignored_teams[team.puce] is team
+
+
+def test_redownloaded_doigt_is_not_counted_twice_in_segment_statistics(day_repository):
+    path, lines = read_graid_lines(day_repository)
+    odc = OneDayController(day_repository, 1, impute_missing_bips=True)
+    odc.run()
+    counts = {pair: statistics.count for pair, statistics in odc.segment_statistics.segments.items()}
+
+    with open(path, 'a', encoding='latin-1') as file:
+        file.write('\n' + lines[1] + '\n')
+    odc.update_from_new_doigts()
+
+    assert {pair: statistics.count for pair, statistics in odc.segment_statistics.segments.items()} == counts
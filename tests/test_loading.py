@@ -0,0 +1,60 @@
+import os
+
+from controllers.onedaycontroller import OneDayController
+
+
+def test_changed_inputs_are_read_in_threads(day_repository, monkeypatch):
+    monkeypatch.setattr(os, 'cpu_count', lambda: 4)
+    odc = OneDayController(day_repository, 1)
+
+    odc.get_input_keys()
+    assert set(odc.loading) == set(OneDayController.COLLECTORS)
+
+    sequential = OneDayController(day_repository, 1, concurrent_loading=False).run()
+    assert odc.run() == sequential
+    assert odc.loading == {}
+
+
+def test_no_concurrent_loading_in_calculation_processes(day_repository, monkeypatch):
+    monkeypatch.setattr(os, 'cpu_count', lambda: 4)
+    odc = OneDayController(day_repository, 1, concurrent_loading=False)
+
+    odc.get_input_keys()
+    assert odc.loading == {}
+
+
+def replace_in_file(path: str, old: str, new: str):
+    with open(path) as file:
+        content = file.read()
+    assert old in content
+    with open(path, 'w') as file:
+        file.write(content.replace(old, new))
+
+
+def test_parameter_change_reuses_unchanged_collectors(day_repository):
+    odc = OneDayController(day_repository, 1)
+    odc.run()
+    collectors = (odc.data_actis, odc.datas_graid, odc.polis_badgeuses, odc.teams_gen)
+
+    epreuves_file = day_repository + 'epreuves.csv'
+    replace_in_file(epreuves_file, 'Parcours enquete,40,', 'Parcours enquete,45,')
+    replace_in_file(epreuves_file, 'Obli 1 trail,0,91,', 'Obli 1 trail,0,85,')
+    replace_in_file(epreuves_file, 'Obli 2 VTT meilleur grimpeur,0,8,', 'Obli 2 VTT meilleur grimpeur,0,9,')
+    day_result = odc.run()
+
+    assert all(new is old for new, old in zip((odc.data_actis, odc.datas_graid, odc.polis_badgeuses, odc.teams_gen), collectors))
+    assert day_result == OneDayController(day_repository, 1).run()
+
+
+def test_new_teams_file_keeps_the_doigts_collector(day_repository):
+    odc = OneDayController(day_repository, 1)
+    day_result = odc.run()
+    datas_graid = odc.datas_graid
+
+    # Même contenu, autre hash : les étapes des équipes et des doigts sont relancées
+    with open(day_repository + 'teams.csv', 'a') as file:
+        file.write('\n')
+
+    assert odc.run() == day_result
+    assert odc.datas_graid is datas_graid
+    assert odc.bips.seconds.size == datas_graid.bips.seconds.size + len(datas_graid.bips.siids)
@@ -0,0 +1,86 @@
+import os
+import pytest
+
+from data_collectors.parsed_inputs_cache import ParsedInputsCache
+
+
+class CountingParser:
+    """Lecture factice : renvoie le contenu du fichier et compte ses appels."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        with open(self.file_path) as file:
+            return file.read()
+
+
+@pytest.fixture
+def cache(tmp_path) -> ParsedInputsCache:
+    return ParsedInputsCache(str(tmp_path / 'CACHE'))
+
+
+def write(path, content: str) -> str:
+    path.write_text(content)
+    return str(path)
+
+
+def get_entries(cache: ParsedInputsCache) -> list[str]:
+    return sorted(os.listdir(cache.cache_directory))
+
+
+def test_unchanged_file_is_read_from_cache(cache, tmp_path):
+    file_path = write(tmp_path / 'teams.csv', 'a;b\n1;2\n')
+    parse = CountingParser(file_path)
+
+    assert cache.load_or_parse(file_path, 'teams_gen', parse) == 'a;b\n1;2\n'
+    assert cache.load_or_parse(file_path, 'teams_gen', parse) == 'a;b\n1;2\n'
+    assert parse.calls == 1
+
+
+def test_changed_file_is_parsed_again_and_replaces_its_entry(cache, tmp_path):
+    file_path = write(tmp_path / 'datas_graid.csv', 'SIID\n1\n')
+    parse = CountingParser(file_path)
+    cache.load_or_parse(file_path, 'datas_graid', parse)
+
+    write(tmp_path / 'datas_graid.csv', 'SIID\n1\n2\n')
+    assert cache.load_or_parse(file_path, 'datas_graid', parse) == 'SIID\n1\n2\n'
+    assert parse.calls == 2
+    # Une seule entrée par fichier et par lecture : le contenu précédent est évincé
+    assert get_entries(cache) == [os.path.basename(cache.get_entry_path(file_path, 'datas_graid'))]
+
+
+def test_entries_are_kept_per_file_and_per_reader(cache, tmp_path):
+    first = write(tmp_path / 'J1.csv', 'x\n')
+    second = write(tmp_path / 'J2.csv', 'x\n')
+    cache.load_or_parse(first, 'teams_gen', CountingParser(first))
+    cache.load_or_parse(second, 'teams_gen', CountingParser(second))
+    cache.load_or_parse(first, 'polis_badgeuses', CountingParser(first))
+
+    assert len(get_entries(cache)) == 3
+
+
+def test_known_hash_is_not_computed_again(cache, tmp_path, monkeypatch):
+    file_path = write(tmp_path / 'epreuves.csv', 'nom\nObli 1\n')
+    file_hash = ParsedInputsCache.get_file_hash(file_path)
+
+    def fail(_):
+        raise AssertionError("hash recalculé")
+    monkeypatch.setattr(ParsedInputsCache, 'get_file_hash', staticmethod(fail))
+
+    parse = CountingParser(file_path)
+    cache.load_or_parse(file_path, 'polis_parcours', parse, file_hash)
+    cache.load_or_parse(file_path, 'polis_parcours', parse, file_hash)
+    assert parse.calls == 1
+
+
+def test_unreadable_entry_is_parsed_again(cache, tmp_path):
+    file_path = write(tmp_path / 'badgeuses.csv', 'numero\n31\n')
+    with open(cache.get_entry_path(file_path, 'polis_badgeuses'), 'wb') as entry_file:
+        entry_file.write(b'pas un pickle')
+
+    parse = CountingParser(file_path)
+    assert cache.load_or_parse(file_path, 'polis_badgeuses', parse) == 'numero\n31\n'
+    assert parse.calls == 1
@@ -0,0 +1,20 @@
+import pytest
+
+from data_collectors.scenarios_collector import ScenariosCollector
+
+
+@pytest.mark.parametrize('separator', [';', ','])
+def test_scenarios_are_read_with_the_sniffed_separator(tmp_path, separator):
+    path = tmp_path / 'scenarios.csv'
+    rows = [['scenario', 'nom', 'temps_ref', 'points'],
+            ['Plus court', 'Obli 1', '50', ''],
+            ['Plus court', 'Obli 1 meilleur grimpeur', '', '12'],
+            ['', '', '', ''],
+            ['Bonus', 'BO 1', '', '20']]
+    path.write_text(''.join(separator.join(row) + '\n' for row in rows), encoding='utf-8')
+
+    scenarios = ScenariosCollector(str(path)).create_scenarios()
+
+    assert [scenario.name for scenario in scenarios] == ['Plus court', 'Bonus']
+    assert scenarios[0].overrides == [('Obli 1', 'temps_ref', 50.0), ('Obli 1 meilleur grimpeur', 'points', 12.0)]
+    assert scenarios[1].overrides == [('BO 1', 'points', 20.0)]
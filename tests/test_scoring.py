@@ -0,0 +1,82 @@
+import numpy as np
+
+from models.epreuve import EpreuveCourse
+from models.scoring import CourseScoringParameters, score_courses
+
+
+def legacy_course_points(epreuve: EpreuveCourse, total_time: float, mg_time: float, bip_points: float) -> dict[str, float]:
+    """Calcul course par course d'origine (Team.calculate_epreuves_course_points avant la notation vectorisée)."""
+
+    points = {}
+    points_rapidite = 0
+    ref_time = epreuve.reference_time*60
+    course_time = total_time - mg_time if epreuve.meilleur_grimpeur else total_time
+    if course_time < ref_time:
+        points_rapidite += (ref_time - course_time)/60 * epreuve.gain_per_minute
+    if course_time > ref_time:
+        points_rapidite -= (course_time - ref_time)/60 * epreuve.loss_per_minute
+
+    if epreuve.meilleur_grimpeur:
+        points_mg = 0
+        mg_ref_time = epreuve.meilleur_grimpeur['reference_time']*60
+        if mg_time < mg_ref_time:
+            points_mg += (mg_ref_time - mg_time)/60 * epreuve.meilleur_grimpeur['gain_per_minute']
+        if mg_time > mg_ref_time:
+            points_mg -= (mg_time - mg_ref_time)/60 * epreuve.meilleur_grimpeur['loss_per_minute']
+        points['points_mg'] = points_mg
+
+    points['points_bip'] = bip_points
+    points['points_participation'] = epreuve.participation_points
+    points['points_rapidite'] = points_rapidite
+    points['total_points'] = sum(points.values())
+    return points
+
+
+def make_epreuves() -> list[EpreuveCourse]:
+    epreuves = [
+        EpreuveCourse(0, 'Obli 1', 10.0, 60.0, 0.5, 0.25, 'Obli'),
+        EpreuveCourse(1, 'BO 1', 5.0, 45.5, 1.0, 2.0, 'BO'),
+        EpreuveCourse(2, 'Obli 2', 20.0, 90.0, 0.3, 0.1, 'Obli'),
+    ]
+    epreuves[2].meilleur_grimpeur = {'reference_time': 12.0, 'gain_per_minute': 2.0, 'loss_per_minute': 1.5}
+    return epreuves
+
+
+def test_score_courses_matches_legacy_scorer():
+    rng = np.random.default_rng(0)
+    epreuves = make_epreuves()
+    nb_teams = 200
+    total_times = rng.integers(1800, 9000, size=(nb_teams, len(epreuves))).astype('float64')
+    mg_times = rng.integers(300, 1500, size=(nb_teams, len(epreuves))).astype('float64')
+    bip_points = rng.choice([0.0, 1.0, 2.5, 4.0], size=(nb_teams, len(epreuves)))
+    has_run = rng.random((nb_teams, len(epreuves))) < 0.8
+
+    course_points = score_courses(total_times, mg_times, bip_points, has_run, CourseScoringParameters.from_epreuves(epreuves))
+
+    for team in range(nb_teams):
+        for column, epreuve in enumerate(epreuves):
+            if not has_run[team, column]:
+                assert course_points.total_points[team, column] == 0.0
+                continue
+            legacy = legacy_course_points(epreuve, total_times[team, column], mg_times[team, column], bip_points[team, column])
+            # Même ordre de sommation : égalité exacte
+            assert course_points.total_points[team, column] == legacy['total_points']
+            assert course_points.points_rapidite[team, column] == legacy['points_rapidite']
+            assert course_points.points_mg[team, column] == legacy.get('points_mg', 0.0)
+
+
+def test_stacked_parameters_score_every_set_at_once():
+    epreuves = make_epreuves()
+    total_times = np.array([[3000.0, 2700.0, 6000.0], [4000.0, 2000.0, 5000.0]])
+    mg_times = np.array([[0.0, 0.0, 700.0], [0.0, 0.0, 800.0]])
+    bip_points = np.ones_like(total_times)
+    has_run = np.ones_like(total_times, dtype=bool)
+
+    parameters = CourseScoringParameters.from_epreuves(epreuves)
+    faster = parameters.copy()
+    faster.reference_times = faster.reference_times/2
+
+    stacked = score_courses(total_times, mg_times, bip_points, has_run, CourseScoringParameters.stack([parameters, faster]))
+    assert stacked.total_points.shape == (2, 2, 3)
+    np.testing.assert_array_equal(stacked.total_points[0], score_courses(total_times, mg_times, bip_points, has_run, parameters).total_points)
+    np.testing.assert_array_equal(stacked.total_points[1], score_courses(total_times, mg_times, bip_points, has_run, faster).total_points)
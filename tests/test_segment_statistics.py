@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+import pytest
+
+from models.segment_statistics import P2Quantile, SegmentStatistics
+
+
+@pytest.mark.parametrize('p', [0.1, 0.5, 0.9])
+def test_quantile_is_exact_below_five_values(p):
+    values = [300.0, 120.0, 480.0, 200.0]
+    quantile = P2Quantile(p)
+    assert math.isnan(quantile.value())
+
+    for n, value in enumerate(values, start=1):
+        quantile.add(value)
+        assert quantile.value() == pytest.approx(np.quantile(values[:n], p))
+
+
+@pytest.mark.parametrize('p', [0.1, 0.5, 0.9])
+def test_quantile_is_close_on_large_samples(p):
+    values = np.random.default_rng(0).lognormal(mean=6.0, sigma=0.4, size=20000)
+    quantile = P2Quantile(p)
+    for value in values:
+        quantile.add(value)
+
+    assert quantile.count == len(values)
+    assert quantile.value() == pytest.approx(np.quantile(values, p), rel=0.02)
+
+
+def test_segment_statistics_match_numpy():
+    values = np.random.default_rng(1).normal(loc=600.0, scale=90.0, size=5000)
+    statistics = SegmentStatistics()
+    for value in values:
+        statistics.add(value)
+
+    assert statistics.count == len(values)
+    assert statistics.mean == pytest.approx(values.mean())
+    assert statistics.variance == pytest.approx(values.var(ddof=1))
+    assert (statistics.min, statistics.max) == (values.min(), values.max())
+    assert statistics.p10 < statistics.median < statistics.p90
+    assert statistics.median == pytest.approx(np.median(values), rel=0.02)
+
+
+def test_variance_needs_two_values():
+    statistics = SegmentStatistics()
+    statistics.add(120.0)
+    assert statistics.mean == 120.0
+    assert math.isnan(statistics.variance)
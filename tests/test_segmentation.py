@@ -0,0 +1,15 @@
+from models.segmentation import BipAnomaly
+
+
+def test_skipped_anomaly_at_end_of_finger_has_no_position():
+    anomaly = BipAnomaly(BipAnomaly.SKIPPED, 12)
+
+    assert anomaly.bip_idx is None
+    assert repr(anomaly) == "BipAnomaly(skipped, badgeuse 12, None, en fin de doigt)"
+
+
+def test_extra_anomaly_shows_bip_position_and_time():
+    anomaly = BipAnomaly(BipAnomaly.EXTRA, 12, bip_idx=3, bip_time=3661)
+
+    assert repr(anomaly) == "BipAnomaly(extra, badgeuse 12, None, bip n°3 à 01:01:01)"
+    assert not hasattr(anomaly, '__dict__')
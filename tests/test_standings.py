@@ -0,0 +1,55 @@
+import bisect
+import pickle
+import random
+
+from models.results import TeamDayResult
+from models.standings import SortedKeys, Standings
+
+
+def make_result(dossard: int, total_points: float, time: float, mixite: str = 'H', ent: bool = False) -> TeamDayResult:
+    return TeamDayResult(dossard, 1000 + dossard, f'Equipe {dossard}', mixite, ent, time, total_points, 0.0, 0.0, 0.0, total_points)
+
+
+def test_sorted_keys_matches_sorted_list():
+    rng = random.Random(3)
+    keys = SortedKeys()
+    expected = []
+    for i in range(3000):
+        if expected and rng.random() < 0.4:
+            key = rng.choice(expected)
+            expected.remove(key)
+            keys.remove(key)
+        else:
+            key = (-rng.randint(0, 20), rng.randint(0, 50), i)
+            bisect.insort(expected, key)
+            keys.add(key)
+        probe = (-rng.randint(0, 20), rng.randint(0, 50))
+        assert keys.bisect_left(probe) == bisect.bisect_left(expected, probe)
+
+    assert list(keys) == expected
+    assert len(keys) == len(expected)
+    assert list(pickle.loads(pickle.dumps(keys))) == expected
+
+
+def test_ties_share_rank():
+    standings = Standings([make_result(1, 50, 3600), make_result(2, 60, 4000), make_result(3, 50, 3600), make_result(4, 50, 3500)])
+
+    assert [standings.get_rank(dossard) for dossard in (2, 4, 1, 3)] == [1, 2, 3, 3]
+    assert [(rank, entry.dossard) for rank, entry in standings.get_ranking()] == [(1, 2), (2, 4), (3, 1), (3, 3)]
+    assert [entry.dossard for entry in standings.get_top(2)] == [2, 4]
+
+
+def test_update_and_remove_keep_views_sorted():
+    standings = Standings([make_result(1, 50, 3600, 'H'), make_result(2, 40, 3600, 'F', ent=True), make_result(3, 30, 3600, 'F')])
+    assert standings.get_rank(3, mixite='F') == 2
+
+    standings.update(make_result(3, 70, 3600, 'F'))
+    assert standings.get_rank(3) == 1
+    assert standings.get_rank(3, mixite='F') == 1
+    assert standings.get_rank(2, mixite='F', ent=True) == 1
+
+    standings.remove(2)
+    assert len(standings) == 2
+    assert (None, True) not in standings.get_views()
+    assert standings.get_ranking(mixite='F', ent=True) == []
+    assert [entry.dossard for _, entry in standings.get_ranking()] == [3, 1]
@@ -0,0 +1,61 @@
+import math
+import numpy as np
+
+from models.epreuve import EpreuveCourse
+from models.poincon import Poincon
+from models.results import CourseResult
+from models.team import Team
+
+
+def make_mg_epreuve(with_mg_segment: bool) -> EpreuveCourse:
+    """Course avec MG : départ -> début MG -> fin MG -> fin, ou départ -> fin si with_mg_segment est False."""
+
+    epreuve = EpreuveCourse(0, 'Obli 1', 10.0, 60.0, 0.5, 0.25, 'Obli')
+    epreuve.meilleur_grimpeur = {'reference_time': 10.0, 'gain_per_minute': 2.0, 'loss_per_minute': 1.0}
+    roles = ['depart', 'mg_debut', 'mg_fin', 'fin'] if with_mg_segment else ['depart', 'fin']
+    epreuve.badgeuses_list = [Poincon(i, epreuve, f"S{i}", 31 + i, role, 0.0) for i, role in enumerate(roles)]
+    if with_mg_segment:
+        epreuve.badgeuses_list[1].is_debut_mg = True
+        epreuve.badgeuses_list[2].is_fin_mg = True
+    return epreuve
+
+
+def make_team(epreuve: EpreuveCourse, bip_times: list[int]) -> Team:
+    team = Team(1001, 1, False, 'Mixte', 'Équipe 1', [], '')
+    course_result = CourseResult(epreuve)
+    course_result.set_poincons_times(list(zip(epreuve.badgeuses_list, bip_times)))
+    team.runned_epreuve_courses_list = [course_result]
+    return team
+
+
+def test_mg_time_is_measured_on_the_mg_segment():
+    team = make_team(make_mg_epreuve(True), [0, 600, 960, 3000])
+    team.calculate_courses_times()
+    team.calculate_epreuves_course_points()
+    team.calculate_total_points()
+
+    course_result = team.runned_epreuve_courses_list[0]
+    assert course_result.total_time == 3000
+    assert course_result.mg_time == 360
+    assert team.mg_time == 360
+    # 6 min sur le MG, 4 min d'avance sur ses 10 min de référence
+    assert course_result.points_mg == 8.0
+
+
+def test_mg_course_without_mg_segment():
+    team = make_team(make_mg_epreuve(False), [0, 3000])
+    team.calculate_courses_times()
+    team.calculate_epreuves_course_points()
+    team.calculate_total_points()
+
+    course_result = team.runned_epreuve_courses_list[0]
+    assert course_result.mg_time is None
+    # Pas de points MG, rapidité sur le temps total : 50 min pour 60 min de référence
+    assert course_result.points_mg == 0.0
+    assert course_result.points_rapidite == 10*0.5
+    assert course_result.total_points == 10.0 + 5.0
+    assert team.mg_time == 0.0 and team.mg_points == 0.0
+    assert not math.isnan(team.total_points)
+
+    _, mg_times, _ = team.get_courses_scoring_inputs()
+    assert np.isnan(mg_times).tolist() == [True]
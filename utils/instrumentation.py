@@ -0,0 +1,195 @@
+import json
+import time
+import threading
+import tracemalloc
+from dataclasses import dataclass, field, asdict
+
+
+@dataclass(slots=True)
+class StageMeasure:
+    """
+    Mesures d'une étape instrumentée.
+
+    Attributes:
+        name (str): Nom de l'étape (collecteur, étape du graphe d'une journée...).
+        context (dict): Précisions sur l'étape (journée, fichier lu...).
+        wall_time (float): Temps écoulé, en s.
+        cpu_time (float): Temps CPU du processus, en s.
+        peak_memory (int|None): Mémoire allouée au pic de l'étape en plus de celle allouée à son début, en octets (tracemalloc). None si la mémoire n'est pas suivie.
+        rows (int): Nombre de lignes traitées (lignes de fichier, bips...).
+        teams (int): Nombre d'équipes traitées.
+        parent (str|None): Nom de l'étape englobante, None pour une étape de premier niveau.
+    """
+
+    name: str
+    context: dict = field(default_factory=dict)
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_memory: int|None = None
+    rows: int = 0
+    teams: int = 0
+    parent: str|None = None
+
+
+class _Measure:
+    """Mesure en cours, renvoyée par Instrumentation.measure() quand l'instrumentation est activée."""
+
+    def __init__(self, instrumentation: 'Instrumentation', name: str, context: dict):
+        self.instrumentation = instrumentation
+        self.stage_measure = StageMeasure(name, context)
+        self._child_peak = 0
+
+    def __enter__(self) -> '_Measure':
+        stack = self.instrumentation._stack
+        if stack:
+            self.stage_measure.parent = stack[-1].stage_measure.name
+            # Le pic de l'étape englobante jusqu'ici est gardé avant que reset_peak() ne l'efface
+            if tracemalloc.is_tracing():
+                stack[-1]._child_peak = max(stack[-1]._child_peak, tracemalloc.get_traced_memory()[1])
+        stack.append(self)
+
+        if tracemalloc.is_tracing():
+            self._start_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._start_cpu = time.process_time()
+        self._start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stage_measure.wall_time = time.perf_counter() - self._start_wall
+        self.stage_measure.cpu_time = time.process_time() - self._start_cpu
+
+        stack = self.instrumentation._stack
+        stack.pop()
+        if tracemalloc.is_tracing():
+            peak = max(self._child_peak, tracemalloc.get_traced_memory()[1])
+            self.stage_measure.peak_memory = peak - self._start_memory
+            if stack:
+                stack[-1]._child_peak = max(stack[-1]._child_peak, peak)
+
+        self.instrumentation.measures.append(self.stage_measure)
+        return False
+
+    def count(self, rows: int = 0, teams: int = 0):
+        self.stage_measure.rows += rows
+        self.stage_measure.teams += teams
+
+
+class _NoMeasure:
+    """Mesure vide, renvoyée quand l'instrumentation est désactivée : ne mesure rien."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoMeasure':
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def count(self, rows: int = 0, teams: int = 0):
+        pass
+
+_NO_MEASURE = _NoMeasure()
+
+
+class Instrumentation:
+    """
+    Mesure le temps (écoulé et CPU), le pic de mémoire et les lignes et équipes traitées par chaque étape instrumentée.
+
+    S'utilise via l'instance partagée `instrumentation` :
+        with instrumentation.measure('DatasGraidCollector', file=csv_file) as measure:
+            ...
+            measure.count(rows=len(df))
+
+    Désactivée par défaut : measure() renvoie alors toujours la même mesure vide, sans lire d'horloge ni suivre la mémoire.
+    Une fois activée, les étapes imbriquées sont mesurées chacune, avec le nom de leur étape englobante.
+    Chaque thread a sa propre pile d'étapes en cours ; tracemalloc suit en revanche tout le processus : le pic de mémoire
+    d'une étape mesurée en même temps qu'une autre (lecture des fichiers en parallèle) compte aussi les allocations de l'autre.
+
+    Attributes:
+        enabled (bool): True si les étapes sont mesurées.
+        measures (list[StageMeasure]): Les mesures des étapes terminées, dans l'ordre de fin.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.measures: list[StageMeasure] = []
+        self._local = threading.local()
+        self._started_tracemalloc = False
+
+
+    def enable(self, trace_memory: bool = True):
+        """Active les mesures. trace_memory suit aussi la mémoire avec tracemalloc, ce qui ralentit sensiblement le programme."""
+
+        self.enabled = True
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+
+    @property
+    def _stack(self) -> list[_Measure]:
+        """Étapes en cours du thread courant, de la plus englobante à la plus imbriquée."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+    @property
+    def traces_memory(self) -> bool:
+        """True si la mémoire est suivie par tracemalloc."""
+        return tracemalloc.is_tracing()
+
+
+    def disable(self):
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+
+    def reset(self):
+        """Oublie les mesures déjà faites."""
+        self.measures = []
+
+
+    def measure(self, name: str, **context) -> _Measure|_NoMeasure:
+        """Renvoie le gestionnaire de contexte qui mesure l'étape name."""
+        if not self.enabled:
+            return _NO_MEASURE
+        return _Measure(self, name, context)
+
+
+    def count(self, rows: int = 0, teams: int = 0):
+        """Ajoute des lignes et des équipes traitées à l'étape en cours la plus imbriquée."""
+        if self.enabled and self._stack:
+            self._stack[-1].count(rows, teams)
+
+
+    def get_report(self) -> dict:
+        """Renvoie les mesures sous forme de dictionnaire : chaque étape, et les totaux par nom d'étape."""
+
+        totals: dict[str, dict] = {}
+        for stage_measure in self.measures:
+            total = totals.setdefault(stage_measure.name, {'calls': 0, 'wall_time': 0.0, 'cpu_time': 0.0, 'peak_memory': None, 'rows': 0, 'teams': 0})
+            total['calls'] += 1
+            total['wall_time'] += stage_measure.wall_time
+            total['cpu_time'] += stage_measure.cpu_time
+            total['rows'] += stage_measure.rows
+            total['teams'] += stage_measure.teams
+            if stage_measure.peak_memory is not None:
+                total['peak_memory'] = max(total['peak_memory'] or 0, stage_measure.peak_memory)
+
+        return {'stages': [asdict(stage_measure) for stage_measure in self.measures], 'totals': totals}
+
+
+    def write_json(self, json_file_path: str):
+        """Écrit le rapport (voir get_report) dans un fichier JSON."""
+        with open(json_file_path, 'w', encoding='utf-8') as json_file:
+            json.dump(self.get_report(), json_file, indent=4, ensure_ascii=False)
+
+
+
+# Instance partagée par tout le programme
+instrumentation = Instrumentation()